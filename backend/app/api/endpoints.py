@@ -1,20 +1,53 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
+import asyncio
+import datetime
+import json
 import os
+import shutil
+import tempfile
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Body
-from app.core.config import UPLOAD_DIR
+from fastapi import APIRouter, UploadFile, File, HTTPException, Body, Form
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from app.core.config import UPLOAD_DIR, BATCH_MAX_WORKERS, BATCH_WORKER_MAX_MEMORY_MB
+from app.core.executors import run_cpu, run_io
 from app.schemas.models import LocalPathsRequest
-from app.services.extractor import (
-    save_upload_file,
-    extract_from_csv_file,
-    extract_from_excel_file,
-    extract_hyperlinks_with_versions_from_path
-)
-from app.services.comparator import compare_data
+from app.services.datasets import svn_datasets
+from app.services.parse_cache import file_sha256, run_cached
+from app.services.uploads import collect_batch_inputs, upload_store
 
 router = APIRouter()
 
+def unique_upload_path(fname: str) -> Path:
+    """A path in UPLOAD_DIR for fname that doesn't exist yet (name_1.ext, name_2.ext, ...)."""
+    dest = UPLOAD_DIR / fname
+    counter = 0
+    while dest.exists():
+        counter += 1
+        dest = UPLOAD_DIR / f"{Path(fname).stem}_{counter}{Path(fname).suffix}"
+    return dest
+
+async def read_svn_report(path: Path):
+    """Parse an SVN report in a worker process (or take it from the parse cache)."""
+    from app.services.extractor import report_parser
+
+    return await run_cached(run_cpu, report_parser(path), path)
+
+async def extract_svn_report(path: Path, filename: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse an SVN report and keep the full frame server-side.
+    Returns the usual summary (with the 100-row preview) plus a dataset_id
+    that /compare-both resolves to all rows.
+    """
+    from app.services.extractor import summarize_frame
+
+    frame = await read_svn_report(path)
+    data = await run_io(summarize_frame, frame, filename or path.name)
+    digest = await run_io(file_sha256, path)
+    data["dataset_id"] = await run_io(svn_datasets.put, frame, digest)
+    return data
+
 @router.post("/upload-excel")
 async def upload_excel(file: UploadFile = File(...)):
     fname = file.filename or ""
@@ -22,93 +55,53 @@ async def upload_excel(file: UploadFile = File(...)):
     if not fname_lower.endswith((".xls", ".xlsx", ".csv")):
         raise HTTPException(status_code=400, detail="Please upload an .xls, .xlsx or .csv file")
 
-    dest = UPLOAD_DIR / fname
-    counter = 0
-    base = dest.stem
-    ext = dest.suffix
-    while dest.exists():
-        counter += 1
-        dest = UPLOAD_DIR / f"{base}_{counter}{ext}"
-
+    stored = await run_io(upload_store.save, file)
     try:
-        save_upload_file(file, dest)
-        if dest.suffix.lower() == ".csv":
-            data = extract_from_csv_file(dest)
-        else:
-            data = extract_from_excel_file(dest)
+        data = await extract_svn_report(stored.path, stored.filename)
     finally:
-        try:
-            dest.unlink()
-        except Exception:
-            pass
+        upload_store.release(stored)
 
     return {"status": "ok", "data": data}
 
 @router.post("/upload-review-checklist")
 async def upload_review_checklist(file: UploadFile = File(...), sheet_name: Optional[str] = "Test Scenario Remarks"):
+    from app.services.extractor import extract_hyperlinks_with_versions_from_path
+
     fname = file.filename or ""
     if not fname.lower().endswith((".xls", ".xlsx")):
         raise HTTPException(status_code=400, detail="Please upload an .xls or .xlsx file for review checklist")
 
-    dest = UPLOAD_DIR / fname
-    counter = 0
-    base = dest.stem
-    ext = dest.suffix
-    while dest.exists():
-        counter += 1
-        dest = UPLOAD_DIR / f"{base}_{counter}{ext}"
-
+    stored = await run_io(upload_store.save, file)
     try:
-        save_upload_file(file, dest)
-        results = extract_hyperlinks_with_versions_from_path(str(dest), sheet_name=sheet_name)
+        results = await run_cached(run_cpu, extract_hyperlinks_with_versions_from_path, str(stored.path), sheet_name=sheet_name)
     finally:
-        try:
-            dest.unlink()
-        except Exception:
-            pass
+        upload_store.release(stored)
 
     return {"status": "ok", "data": results, "count": len(results)}
 
 @router.post("/upload-both")
 async def upload_both(svn_file: UploadFile = File(...), checklist_file: UploadFile = File(...), sheet_name: Optional[str] = "Test Scenario Remarks"):
-    svn_name = svn_file.filename or "svn_input"
-    svn_dest = UPLOAD_DIR / svn_name
-    i = 0
-    while svn_dest.exists():
-        i += 1
-        svn_dest = UPLOAD_DIR / f"{Path(svn_name).stem}_{i}{svn_dest.suffix}"
+    from app.services.extractor import extract_hyperlinks_with_versions_from_path
 
     check_name = checklist_file.filename or "checklist_input.xlsx"
-    check_dest = UPLOAD_DIR / check_name
-    j = 0
-    while check_dest.exists():
-        j += 1
-        check_dest = UPLOAD_DIR / f"{Path(check_name).stem}_{j}{check_dest.suffix}"
-
+    svn_stored = check_stored = None
     try:
-        save_upload_file(svn_file, svn_dest)
-        save_upload_file(checklist_file, check_dest)
+        svn_stored = await run_io(upload_store.save, svn_file, "svn_input")
+        check_stored = await run_io(upload_store.save, checklist_file, "checklist_input.xlsx")
 
-        if svn_dest.suffix.lower() == ".csv":
-            svn_data = extract_from_csv_file(svn_dest)
-        else:
-            svn_data = extract_from_excel_file(svn_dest)
+        svn_data = await extract_svn_report(svn_stored.path, svn_stored.filename)
 
-        checklist_data = extract_hyperlinks_with_versions_from_path(str(check_dest), sheet_name=sheet_name)
+        checklist_data = await run_cached(run_cpu, extract_hyperlinks_with_versions_from_path, str(check_stored.path), sheet_name=sheet_name)
     finally:
-        try:
-            svn_dest.unlink()
-        except Exception:
-            pass
-        try:
-            check_dest.unlink()
-        except Exception:
-            pass
+        upload_store.release(svn_stored)
+        upload_store.release(check_stored)
 
     return {"status": "ok", "svn": svn_data, "checklist": {"filename": check_name, "data": checklist_data, "count": len(checklist_data)}}
 
 @router.post("/process-local-paths")
 async def process_local_paths(req: LocalPathsRequest):
+    from app.services.extractor import extract_hyperlinks_with_versions_from_path
+
     if not req.svn_path or not os.path.isabs(req.svn_path):
         raise HTTPException(status_code=400, detail="Provide an absolute svn_path on the server")
     if not req.checklist_path or not os.path.isabs(req.checklist_path):
@@ -119,35 +112,50 @@ async def process_local_paths(req: LocalPathsRequest):
     if not Path(req.checklist_path).exists():
         raise HTTPException(status_code=404, detail=f"checklist_path not found: {req.checklist_path}")
 
-    svn_path_obj = Path(req.svn_path)
-    if svn_path_obj.suffix.lower() == ".csv":
-        svn_data = extract_from_csv_file(svn_path_obj)
-    else:
-        svn_data = extract_from_excel_file(svn_path_obj)
+    svn_data = await extract_svn_report(Path(req.svn_path))
 
-    checklist_data = extract_hyperlinks_with_versions_from_path(req.checklist_path, sheet_name=req.sheet_name)
+    checklist_data = await run_cached(run_cpu, extract_hyperlinks_with_versions_from_path, req.checklist_path, sheet_name=req.sheet_name)
 
     return {"status": "ok", "svn": svn_data, "checklist": {"filename": Path(req.checklist_path).name, "data": checklist_data, "count": len(checklist_data)}}
 
-@router.post("/compare-both")
-async def compare_both(payload: Dict[str, Any] = Body(...)):
+def _truncation_notice(svn_blob: Dict[str, Any]) -> Dict[str, Any]:
+    """Result fields telling the client that only the preview rows of its report were compared."""
+    rows = svn_blob.get("preview", svn_blob.get("data"))
+    total = svn_blob.get("nrows", len(rows))
+    if not isinstance(total, int) or total <= len(rows):
+        return {}
+    return {
+        "svn_truncated": True,
+        "warning": f"The SVN report is no longer on the server: only its first {len(rows)} of {total} rows "
+                   "were compared. Upload the report again to compare all rows."
+    }
+
+async def resolve_compare_inputs(payload: Dict[str, Any]) -> Tuple[Any, Any, float, Dict[str, Any]]:
     """
-    Compare svn blob and checklist blob (or use server-local paths).
-    Enhancements:
-      - filename normalization + strip extension
-      - version coercion to integer when possible
-      - fuzzy matching (difflib) with threshold (default 0.85)
-    Payload options:
-      - { "svn": <svn_blob>, "checklist": <checklist_blob>, "fuzzy_threshold": 0.85 }
-      - or provide { "svn_path": "/abs/path/to/svn_report.csv", "checklist_path": "/abs/path/to/checklist.xlsx", "sheet_name": "...", "fuzzy_threshold": 0.85 }
+    Turn a /compare-both payload into (svn_rows, checklist_rows, fuzzy_threshold, notice),
+    reading server-local paths and resolving SVN dataset IDs as needed. notice
+    holds fields to add to the result (see _truncation_notice), usually none.
     """
     fuzzy_threshold = float(payload.get("fuzzy_threshold", 0.85))
 
     svn_blob = payload.get("svn")
     checklist_blob = payload.get("checklist")
+    svn_frame = None
+    notice: Dict[str, Any] = {}
+
+    dataset_id = payload.get("svn_dataset_id")
+    if not dataset_id and isinstance(svn_blob, dict):
+        dataset_id = svn_blob.get("dataset_id")
+    if dataset_id:
+        svn_frame = await run_io(svn_datasets.get, dataset_id)
+        if svn_frame is None:
+            if not (isinstance(svn_blob, dict) and isinstance(svn_blob.get("preview", svn_blob.get("data")), list)):
+                raise HTTPException(status_code=404, detail="SVN dataset expired or unknown; upload the report again")
+            # Fall back to the rows the client sent
+            notice = _truncation_notice(svn_blob)
 
     # If server-local paths provided, process them first
-    if not svn_blob and payload.get("svn_path"):
+    if svn_frame is None and not svn_blob and payload.get("svn_path"):
         svn_path = payload["svn_path"]
         # accept file:// URIs by stripping
         if svn_path.startswith("file://"):
@@ -157,10 +165,7 @@ async def compare_both(payload: Dict[str, Any] = Body(...)):
         svn_path_obj = Path(svn_path)
         if not svn_path_obj.exists():
             raise HTTPException(status_code=404, detail=f"svn_path not found: {svn_path}")
-        if svn_path_obj.suffix.lower() == ".csv":
-            svn_blob = extract_from_csv_file(svn_path_obj)
-        else:
-            svn_blob = extract_from_excel_file(svn_path_obj)
+        svn_frame = await read_svn_report(svn_path_obj)
 
     if not checklist_blob and payload.get("checklist_path"):
         checklist_path = payload["checklist_path"]
@@ -171,14 +176,19 @@ async def compare_both(payload: Dict[str, Any] = Body(...)):
         if not Path(checklist_path).exists():
             raise HTTPException(status_code=404, detail=f"checklist_path not found: {checklist_path}")
         sheet_name = payload.get("sheet_name", "Test Scenario Remarks")
-        checklist_list = extract_hyperlinks_with_versions_from_path(checklist_path, sheet_name=sheet_name)
+        from app.services.extractor import extract_hyperlinks_with_versions_from_path
+
+        checklist_list = await run_cached(run_cpu, extract_hyperlinks_with_versions_from_path, checklist_path, sheet_name=sheet_name)
         checklist_blob = {"filename": Path(checklist_path).name, "data": checklist_list, "count": len(checklist_list)}
 
-    if not svn_blob or not checklist_blob:
+    if (svn_frame is None and not svn_blob) or not checklist_blob:
         raise HTTPException(status_code=400, detail="Provide either 'svn' and 'checklist' blobs, or 'svn_path' and 'checklist_path'.")
 
-    # Extract svn rows list
-    if isinstance(svn_blob, dict) and "preview" in svn_blob:
+    # Extract svn rows: the full report when available, else what the client sent
+    if svn_frame is not None:
+        # Same cell values as the preview rows (blank cells become "")
+        svn_rows = svn_frame.fillna("")
+    elif isinstance(svn_blob, dict) and "preview" in svn_blob:
         svn_rows = svn_blob["preview"]
     elif isinstance(svn_blob, dict) and "data" in svn_blob:
         svn_rows = svn_blob["data"]
@@ -195,7 +205,120 @@ async def compare_both(payload: Dict[str, Any] = Body(...)):
     else:
         raise HTTPException(status_code=400, detail="Unrecognized checklist blob format")
 
-    return compare_data(svn_rows, checklist_rows, fuzzy_threshold)
+    return svn_rows, checklist_rows, fuzzy_threshold, notice
+
+def _json_default(value: Any) -> Any:
+    # Cell values json can't write itself: dates as ISO text, numpy scalars as numbers
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+class ComparisonResponse(JSONResponse):
+    """
+    A comparison result written out as JSON directly. Returning the dict would
+    have FastAPI copy every row through jsonable_encoder first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_json_default
+        ).encode("utf-8")
+
+@router.post("/compare-both")
+async def compare_both(payload: Dict[str, Any] = Body(...)):
+    """
+    Compare svn blob and checklist blob (or use server-local paths).
+    Enhancements:
+      - filename normalization + strip extension
+      - version coercion to integer when possible
+      - fuzzy matching (difflib) with threshold (default 0.85)
+    Payload options:
+      - { "svn": <svn_blob>, "checklist": <checklist_blob>, "fuzzy_threshold": 0.85 }
+      - or provide { "svn_path": "/abs/path/to/svn_report.csv", "checklist_path": "/abs/path/to/checklist.xlsx", "sheet_name": "...", "fuzzy_threshold": 0.85 }
+      - or { "svn_dataset_id": "...", "checklist": <checklist_blob> }
+    An svn blob returned by the upload endpoints carries a dataset_id; the
+    comparison then runs on every row of the report, not only its preview.
+    If the server no longer has that report, the rows in the blob are compared
+    and the result carries "svn_truncated": true and a warning.
+    With "incremental": true (or a "previous_run_id"), the run is kept and the
+    result also carries run_id and a delta against previous_run_id; only the
+    names whose rows changed since then are re-evaluated.
+    only_in_checklist entries carry their checklist row as "raw" only with
+    "include_raw": true.
+    """
+    from app.services.comparator import compare_data
+
+    svn_rows, checklist_rows, fuzzy_threshold, notice = await resolve_compare_inputs(payload)
+    include_raw = bool(payload.get("include_raw"))
+    if payload.get("incremental") or payload.get("previous_run_id"):
+        from app.services.incremental_compare import compare_incremental
+
+        # Earlier runs live in this process, so this runs on an I/O thread
+        result = await run_io(
+            compare_incremental, svn_rows, checklist_rows, fuzzy_threshold, payload.get("previous_run_id"), include_raw
+        )
+    else:
+        result = await run_cpu(compare_data, svn_rows, checklist_rows, fuzzy_threshold, include_raw=include_raw)
+    result.update(notice)
+    return ComparisonResponse(result)
+
+async def resolve_package_svn_rows(svn_file: Optional[UploadFile], svn_dataset_id: Optional[str]):
+    """SVN rows of a package comparison: an uploaded report or one kept from an earlier upload."""
+    if svn_dataset_id:
+        svn_frame = await run_io(svn_datasets.get, svn_dataset_id)
+        if svn_frame is None:
+            raise HTTPException(status_code=404, detail="SVN dataset expired or unknown; upload the report again")
+    elif svn_file is not None:
+        if not (svn_file.filename or "").lower().endswith((".xls", ".xlsx", ".csv")):
+            raise HTTPException(status_code=400, detail="SVN report must be an .xls, .xlsx or .csv file")
+        stored = await run_io(upload_store.save, svn_file)
+        try:
+            svn_frame = await read_svn_report(stored.path)
+        finally:
+            upload_store.release(stored)
+    else:
+        raise HTTPException(status_code=400, detail="Provide an svn_file or an svn_dataset_id")
+    # Same cell values as /compare-both uses for a full report
+    return svn_frame.fillna("")
+
+@router.post("/compare-both-batch")
+async def compare_both_batch(
+    checklist_files: List[UploadFile] = File(...),
+    svn_file: Optional[UploadFile] = File(None),
+    svn_dataset_id: Optional[str] = Form(None),
+    sheet_name: str = Form("Test Scenario Remarks"),
+    fuzzy_threshold: float = Form(0.85),
+    include_raw: bool = Form(False)
+):
+    """
+    Compare a whole review package against one SVN report.
+    checklist_files accepts .xlsx/.xlsm checklists and .zip archives of them; the
+    SVN report is an upload (svn_file) or the dataset_id of an earlier upload.
+    The report is indexed once and each checklist is matched as by /compare-both.
+    Returns per-checklist results plus every mismatch of the package and the
+    SVN files that no checklist covers.
+    """
+    from app.services.comparator import SvnIndex, compare_package_with_index
+
+    svn_rows = await resolve_package_svn_rows(svn_file, svn_dataset_id)
+    work_dir = Path(tempfile.mkdtemp(dir=UPLOAD_DIR))
+    try:
+        input_dir = work_dir / "input"
+        input_dir.mkdir()
+        checklists = await run_io(collect_batch_inputs, checklist_files, work_dir, input_dir, (".xlsx", ".xlsm"))
+        if not checklists:
+            raise HTTPException(status_code=400, detail="No checklist workbooks found in the upload")
+
+        index = await run_cpu(SvnIndex, svn_rows, True)
+        # The batch runs its own process pool; only the wait happens on an I/O thread
+        return ComparisonResponse(await run_io(
+            compare_package_with_index, index, checklists, sheet_name, fuzzy_threshold,
+            max_workers=BATCH_MAX_WORKERS, include_raw=include_raw
+        ))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
 
 @router.post("/validate-tc-traceability")
 async def validate_tc_traceability_endpoint(file: UploadFile = File(...)):
@@ -208,23 +331,84 @@ async def validate_tc_traceability_endpoint(file: UploadFile = File(...)):
     if not fname.lower().endswith((".xls", ".xlsx", ".xlsm")):
         raise HTTPException(status_code=400, detail="Please upload an .xls, .xlsx, or .xlsm file")
     
-    dest = UPLOAD_DIR / fname
-    counter = 0
-    base = dest.stem
-    ext = dest.suffix
-    while dest.exists():
-        counter += 1
-        dest = UPLOAD_DIR / f"{base}_{counter}{ext}"
-    
+    stored = await run_io(upload_store.save, file)
     try:
-        save_upload_file(file, dest)
-        result = validate_tc_traceability(dest)
+        result = await run_cpu(validate_tc_traceability, stored.path)
         return result
     finally:
+        upload_store.release(stored)
+
+@router.post("/validate-tc-traceability-batch")
+async def validate_tc_traceability_batch_endpoint(
+    files: Optional[List[UploadFile]] = File(None),
+    path: Optional[str] = Form(None)
+):
+    """
+    Validate many traceability matrices in parallel: uploaded .xlsx/.xlsm files and
+    .zip archives of them, or an absolute server path to a directory or .zip.
+    Streams NDJSON: one line per workbook as soon as it is validated, then a summary line.
+    """
+    from app.services.traceability_batch import (
+        TRACEABILITY_SUFFIXES, create_pool, find_workbooks, result_entry, submit_batch, summarize_batch
+    )
+    
+    work_dir = Path(tempfile.mkdtemp(dir=UPLOAD_DIR))
+    try:
+        if path:
+            if path.startswith("file://"):
+                path = path[len("file://"):]
+            if not os.path.isabs(path):
+                raise HTTPException(status_code=400, detail="path must be absolute")
+            if not Path(path).exists():
+                raise HTTPException(status_code=404, detail=f"path not found: {path}")
+            inputs = await run_io(find_workbooks, Path(path), work_dir)
+        elif files:
+            input_dir = work_dir / "input"
+            input_dir.mkdir()
+            inputs = await run_io(collect_batch_inputs, files, work_dir, input_dir, TRACEABILITY_SUFFIXES)
+        else:
+            raise HTTPException(status_code=400, detail="Upload traceability workbooks or provide a server path")
+        
+        if not inputs:
+            raise HTTPException(status_code=400, detail="No .xlsx/.xlsm workbooks found")
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    
+    pool = None
+    
+    def cleanup():
+        # Runs at the end of the stream and as the response's background task, which
+        # also covers a client gone before streaming started; the second call is a no-op
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    async def entry_when_done(future, filename):
+        await asyncio.wait([asyncio.wrap_future(future)])
+        return result_entry(future, filename)
+    
+    async def stream():
+        entries = []
         try:
-            dest.unlink()
-        except Exception:
-            pass
+            for next_entry in asyncio.as_completed([entry_when_done(f, name) for f, name in futures.items()]):
+                entry = await next_entry
+                entries.append(entry)
+                yield json.dumps(entry) + "\n"
+            yield json.dumps(summarize_batch(entries)) + "\n"
+        finally:
+            # Also reached when the client disconnects: drop the files not started yet
+            cleanup()
+    
+    try:
+        # Workers come from the shared batch budget (503 when used up); starting them waits for the warm-up
+        pool = await run_io(create_pool, len(inputs), BATCH_MAX_WORKERS, BATCH_WORKER_MAX_MEMORY_MB)
+        futures = await run_io(submit_batch, pool, inputs)
+        return StreamingResponse(stream(), media_type="application/x-ndjson", background=BackgroundTask(cleanup))
+    except BaseException:
+        cleanup()
+        raise
+
 
 @router.post("/compare-cia")
 async def compare_cia_endpoint(
@@ -247,41 +431,53 @@ async def compare_cia_endpoint(
     if not cia_fname.lower().endswith((".xls", ".xlsx", ".xlsm")):
         raise HTTPException(status_code=400, detail="CIA file must be .xls, .xlsx, or .xlsm")
     
-    # Save TC file
-    tc_dest = UPLOAD_DIR / tc_fname
-    counter = 0
-    base = tc_dest.stem
-    ext = tc_dest.suffix
-    while tc_dest.exists():
-        counter += 1
-        tc_dest = UPLOAD_DIR / f"{base}_{counter}{ext}"
-    
-    # Save CIA file
-    cia_dest = UPLOAD_DIR / cia_fname
-    counter = 0
-    base = cia_dest.stem
-    ext = cia_dest.suffix
-    while cia_dest.exists():
-        counter += 1
-        cia_dest = UPLOAD_DIR / f"{base}_{counter}{ext}"
-    
+    tc_stored = cia_stored = None
     try:
-        save_upload_file(tc_file, tc_dest)
-        save_upload_file(cia_file, cia_dest)
+        tc_stored = await run_io(upload_store.save, tc_file)
+        cia_stored = await run_io(upload_store.save, cia_file)
         
-        result = compare_tc_vs_cia(
-            tc_excel_path=str(tc_dest),
-            cia_excel_path=str(cia_dest),
+        result = await run_cpu(
+            compare_tc_vs_cia,
+            tc_excel_path=str(tc_stored.path),
+            cia_excel_path=str(cia_stored.path),
             tc_filename=tc_fname  # Pass original filename for SIT name derivation
         )
         return result
     finally:
-        # Clean up temporary files
-        try:
-            tc_dest.unlink()
-        except Exception:
-            pass
-        try:
-            cia_dest.unlink()
-        except Exception:
-            pass
+        # Release the stored uploads (deleted once no request uses them)
+        upload_store.release(tc_stored)
+        upload_store.release(cia_stored)
+
+
+@router.post("/compare-cia-batch")
+async def compare_cia_batch_endpoint(
+    tc_files: List[UploadFile] = File(...),
+    cia_file: UploadFile = File(...)
+):
+    """
+    Compare many TC files against one CIA file.
+    tc_files accepts .xls/.xlsx/.xlsm files and .zip archives of them; the SIT name of
+    each TC file comes from its file name, as in /compare-cia. The CIA sheet is read once.
+    """
+    from app.services.cia_compare import build_cia_index, compare_tc_batch_with_index
+    
+    cia_fname = cia_file.filename or "cia_file.xlsx"
+    if not cia_fname.lower().endswith((".xls", ".xlsx", ".xlsm")):
+        raise HTTPException(status_code=400, detail="CIA file must be .xls, .xlsx, or .xlsm")
+    
+    work_dir = Path(tempfile.mkdtemp(dir=UPLOAD_DIR))
+    cia_stored = None
+    try:
+        input_dir = work_dir / "input"
+        input_dir.mkdir()
+        tc_inputs = await run_io(collect_batch_inputs, tc_files, work_dir, input_dir, (".xls", ".xlsx", ".xlsm"))
+        if not tc_inputs:
+            raise HTTPException(status_code=400, detail="No TC workbooks found in the upload")
+        
+        cia_stored = await run_io(upload_store.save, cia_file)
+        cia_index = await run_cpu(build_cia_index, str(cia_stored.path))
+        # The batch runs its own process pool; only the wait happens on an I/O thread
+        return await run_io(compare_tc_batch_with_index, tc_inputs, cia_index, max_workers=BATCH_MAX_WORKERS)
+    finally:
+        upload_store.release(cia_stored)
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -1,38 +1,59 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from fastapi.responses import FileResponse, JSONResponse
-from app.services.excel_processor import ExcelHyperlinkProcessor
+from starlette.background import BackgroundTask
+from typing import List
+from app.core.config import UPLOAD_DIR, BATCH_MAX_WORKERS
+from app.core.executors import run_cpu, run_io
+from app.services.uploads import collect_batch_inputs, upload_store
+import json
+import re
 import shutil
 import tempfile
 import os
+import zipfile
 from pathlib import Path
 
+WORKBOOK_SUFFIXES = (".xlsx", ".xlsm")
+# What update_build_numbers accepts; the value also ends up in file names
+BUILD_NUMBER_PATTERN = re.compile(r"_?[0-9]+")
+
 router = APIRouter()
 
+def check_new_build(new_build: str) -> str:
+    """new_build as sent, or 400 unless it is a build number ("213" or "_0213")."""
+    if not BUILD_NUMBER_PATTERN.fullmatch(new_build):
+        raise HTTPException(status_code=400, detail="new_build must be a build number, e.g. 213")
+    return new_build
+
+def _output_path(input_path: Path, new_build: str) -> str:
+    """A fresh temporary path for the updated copy of input_path."""
+    fd, path = tempfile.mkstemp(suffix=f"_build_{new_build}{input_path.suffix}")
+    os.close(fd)
+    return path
+
 @router.post("/extract-hyperlinks/")
 async def extract_hyperlinks(file: UploadFile = File(...)):
     """
     Extract hyperlinks from uploaded Excel file.
     Returns JSON with all hyperlink details.
     """
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp_file:
-        shutil.copyfileobj(file.file, tmp_file)
-        tmp_path = tmp_file.name
+    from app.services.excel_processor import extract_hyperlinks_from_file
+
+    # Save uploaded file (shared with identical uploads in flight)
+    stored = await run_io(upload_store.save, file)
     
     try:
-        processor = ExcelHyperlinkProcessor(tmp_path)
-        result = processor.extract_hyperlinks()
-        processor.close()
+        result = await run_cpu(extract_hyperlinks_from_file, str(stored.path))
         
         return JSONResponse(content=result)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
     finally:
-        # Cleanup temporary file
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        upload_store.release(stored)
 
 
 @router.post("/update-build/")
@@ -43,42 +64,42 @@ async def update_build(
     """
     Update hyperlinks with new build number and return the updated file.
     """
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp_file:
-        shutil.copyfileobj(file.file, tmp_file)
-        tmp_path = tmp_file.name
+    from app.services.excel_processor import update_build_numbers_for_file
+
+    check_new_build(new_build)
+    # Save uploaded file (shared with identical uploads in flight)
+    stored = await run_io(upload_store.save, file)
     
     output_path = None
     
     try:
-        processor = ExcelHyperlinkProcessor(tmp_path)
-        
         # Generate output file path
-        output_path = tmp_path.replace(Path(tmp_path).suffix, f"_build_{new_build}{Path(tmp_path).suffix}")
+        output_path = _output_path(stored.path, new_build)
         
-        result = processor.update_build_numbers(new_build, output_path)
-        processor.close()
+        result = await run_cpu(update_build_numbers_for_file, str(stored.path), new_build, output_path)
         
         if result['status'] == 'success':
-            # Return the updated file
-            return FileResponse(
+            # Return the updated file, removed once it has been sent
+            response = FileResponse(
                 path=output_path,
                 filename=f"{Path(file.filename).stem}_build_{new_build}{Path(file.filename).suffix}",
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                background=BackgroundTask(os.remove, output_path)
             )
+            output_path = None
+            return response
         else:
             raise HTTPException(status_code=500, detail=result['message'])
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
     finally:
-        # Cleanup temporary files
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        upload_store.release(stored)
         if output_path and os.path.exists(output_path):
-            # Note: FileResponse handles cleanup, but we do it here for error cases
-            pass
+            os.remove(output_path)
 
 
 @router.post("/extract-and-update/")
@@ -90,37 +111,96 @@ async def extract_and_update(
     Combined endpoint: Extract hyperlinks info and update build number.
     Returns JSON with extraction details and download link for updated file.
     """
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp_file:
-        shutil.copyfileobj(file.file, tmp_file)
-        tmp_path = tmp_file.name
+    from app.services.excel_processor import extract_and_update_file
+
+    check_new_build(new_build)
+    # Save uploaded file (shared with identical uploads in flight)
+    stored = await run_io(upload_store.save, file)
     
     output_path = None
     
     try:
-        processor = ExcelHyperlinkProcessor(tmp_path)
-        
-        # Extract hyperlinks
-        extraction_result = processor.extract_hyperlinks()
-        
         # Generate output file path
-        output_path = tmp_path.replace(Path(tmp_path).suffix, f"_build_{new_build}{Path(tmp_path).suffix}")
+        output_path = _output_path(stored.path, new_build)
         
-        # Update build numbers
-        update_result = processor.update_build_numbers(new_build, output_path)
-        processor.close()
-        
-        combined_result = {
-            'extraction': extraction_result,
-            'update': update_result
-        }
+        # Extract hyperlinks and update build numbers
+        combined_result = await run_cpu(extract_and_update_file, str(stored.path), new_build, output_path)
         
         return JSONResponse(content=combined_result)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
     finally:
-        # Cleanup temporary files
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        upload_store.release(stored)
+
+
+def _write_bundle(bundle_path: Path, inputs: List[tuple], output_names: List[str], results: List[dict], new_build: str) -> None:
+    """Zip the updated workbooks together with a manifest.json of per-file results."""
+    manifest = {"new_build": new_build.lstrip('_0'), "total_files": len(inputs), "files": []}
+    with zipfile.ZipFile(bundle_path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for (name, _), out_name, result in zip(inputs, output_names, results):
+            ok = result['status'] == 'success'
+            if ok:
+                bundle.write(result['output_file'], arcname=out_name)
+            manifest["files"].append({
+                "filename": name,
+                "output_filename": out_name if ok else None,
+                "status": result['status'],
+                "message": result['message'],
+                "updated_count": result['updated_count'],
+                "update_details": result['updates']
+            })
+        manifest["succeeded"] = sum(1 for f in manifest["files"] if f["status"] == 'success')
+        manifest["failed"] = manifest["total_files"] - manifest["succeeded"]
+        bundle.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+
+@router.post("/update-build-batch/")
+async def update_build_batch(
+    files: List[UploadFile] = File(...),
+    new_build: str = Form(...)
+):
+    """
+    Update hyperlinks with a new build number in many checklists at once.
+    Accepts any mix of .xlsx/.xlsm files and .zip archives of them.
+    Returns a zip with the updated workbooks and a manifest.json of per-file update details.
+    """
+    from app.services.excel_processor import update_build_numbers_batch
+
+    check_new_build(new_build)
+    work_dir = Path(tempfile.mkdtemp(dir=UPLOAD_DIR))
+    input_dir = work_dir / "input"
+    output_dir = work_dir / "output"
+    input_dir.mkdir()
+    output_dir.mkdir()
+    
+    try:
+        inputs = await run_io(collect_batch_inputs, files, work_dir, input_dir, WORKBOOK_SUFFIXES)
+        
+        if not inputs:
+            raise HTTPException(status_code=400, detail="No .xlsx/.xlsm workbooks found in the upload")
+        
+        output_names = [f"{Path(name).stem}_build_{new_build}{Path(name).suffix}" for name, _ in inputs]
+        jobs = [(str(src), str(output_dir / out_name)) for (_, src), out_name in zip(inputs, output_names)]
+        # The batch runs its own process pool; only the wait happens on an I/O thread
+        results = await run_io(update_build_numbers_batch, jobs, new_build, max_workers=BATCH_MAX_WORKERS)
+        
+        bundle_path = work_dir / f"checklists_build_{new_build}.zip"
+        await run_io(_write_bundle, bundle_path, inputs, output_names, results, new_build)
+        
+        return FileResponse(
+            path=bundle_path,
+            filename=bundle_path.name,
+            media_type="application/zip",
+            background=BackgroundTask(shutil.rmtree, work_dir, ignore_errors=True)
+        )
+    
+    except HTTPException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,168 @@
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, File, Form, HTTPException, UploadFile
+
+from app.api.endpoints import resolve_compare_inputs, resolve_package_svn_rows, unique_upload_path
+from app.core.config import BATCH_MAX_WORKERS, UPLOAD_DIR
+from app.core.executors import io_pool, run_io
+from app.services.jobs import SUCCEEDED, job_status, jobs
+from app.services.uploads import collect_batch_inputs, copy_upload
+
+router = APIRouter()
+
+EXCEL_SUFFIXES = (".xls", ".xlsx", ".xlsm")
+
+
+async def _save_for_job(upload: UploadFile, default_name: str, label: str):
+    fname = upload.filename or default_name
+    if not fname.lower().endswith(EXCEL_SUFFIXES):
+        raise HTTPException(status_code=400, detail=f"{label} must be .xls, .xlsx, or .xlsm")
+    dest = unique_upload_path(fname)
+    await run_io(copy_upload, upload, dest)
+    return fname, dest
+
+
+@router.post("/validate-tc-traceability")
+async def submit_validate_tc_traceability(file: UploadFile = File(...)):
+    """Start a traceability validation; poll /api/jobs/{job_id} for progress."""
+    from app.services.tc_traceability import validate_tc_traceability
+
+    _, dest = await _save_for_job(file, "traceability.xlsx", "Traceability file")
+    job = jobs.submit("validate-tc-traceability", validate_tc_traceability, dest, cleanup=[dest])
+    return job_status(job)
+
+
+@router.post("/compare-cia")
+async def submit_compare_cia(tc_file: UploadFile = File(...), cia_file: UploadFile = File(...)):
+    """Start a TC vs CIA comparison; poll /api/jobs/{job_id} for progress."""
+    from app.services.cia_compare import compare_tc_vs_cia
+
+    tc_fname, tc_dest = await _save_for_job(tc_file, "tc_file.xlsx", "TC file")
+    try:
+        _, cia_dest = await _save_for_job(cia_file, "cia_file.xlsx", "CIA file")
+    except HTTPException:
+        tc_dest.unlink(missing_ok=True)
+        raise
+    job = jobs.submit(
+        "compare-cia",
+        compare_tc_vs_cia,
+        cleanup=[tc_dest, cia_dest],
+        tc_excel_path=str(tc_dest),
+        cia_excel_path=str(cia_dest),
+        tc_filename=tc_fname
+    )
+    return job_status(job)
+
+
+@router.post("/compare-cia-batch")
+async def submit_compare_cia_batch(tc_files: List[UploadFile] = File(...), cia_file: UploadFile = File(...)):
+    """Start a batch TC vs CIA comparison (same upload as /api/compare-cia-batch)."""
+    from app.services.cia_compare import compare_tc_batch_vs_cia
+
+    _, cia_dest = await _save_for_job(cia_file, "cia_file.xlsx", "CIA file")
+    work_dir = Path(tempfile.mkdtemp(dir=UPLOAD_DIR))
+    try:
+        input_dir = work_dir / "input"
+        input_dir.mkdir()
+        tc_inputs = await run_io(collect_batch_inputs, tc_files, work_dir, input_dir, EXCEL_SUFFIXES)
+        if not tc_inputs:
+            raise HTTPException(status_code=400, detail="No TC workbooks found in the upload")
+    except BaseException:
+        cia_dest.unlink(missing_ok=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    job = jobs.submit(
+        "compare-cia-batch",
+        compare_tc_batch_vs_cia,
+        [(name, str(path)) for name, path in tc_inputs],
+        str(cia_dest),
+        cleanup=[cia_dest, work_dir],
+        pool=io_pool,
+        max_workers=BATCH_MAX_WORKERS
+    )
+    return job_status(job)
+
+
+@router.post("/compare-both")
+async def submit_compare_both(payload: Dict[str, Any] = Body(...)):
+    """Start an SVN vs checklist comparison (same payload as /api/compare-both)."""
+    from app.services.comparator import compare_data
+
+    svn_rows, checklist_rows, fuzzy_threshold, notice = await resolve_compare_inputs(payload)
+    job = jobs.submit(
+        "compare-both", compare_data, svn_rows, checklist_rows, fuzzy_threshold,
+        notice=notice, include_raw=bool(payload.get("include_raw"))
+    )
+    return job_status(job)
+
+
+@router.post("/compare-both-batch")
+async def submit_compare_both_batch(
+    checklist_files: List[UploadFile] = File(...),
+    svn_file: Optional[UploadFile] = File(None),
+    svn_dataset_id: Optional[str] = Form(None),
+    sheet_name: str = Form("Test Scenario Remarks"),
+    fuzzy_threshold: float = Form(0.85),
+    include_raw: bool = Form(False)
+):
+    """Start a review package comparison (same upload as /api/compare-both-batch)."""
+    from app.services.comparator import compare_package
+
+    svn_rows = await resolve_package_svn_rows(svn_file, svn_dataset_id)
+    work_dir = Path(tempfile.mkdtemp(dir=UPLOAD_DIR))
+    try:
+        input_dir = work_dir / "input"
+        input_dir.mkdir()
+        checklists = await run_io(collect_batch_inputs, checklist_files, work_dir, input_dir, (".xlsx", ".xlsm"))
+        if not checklists:
+            raise HTTPException(status_code=400, detail="No checklist workbooks found in the upload")
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    job = jobs.submit(
+        "compare-both-batch",
+        compare_package,
+        svn_rows,
+        [(name, str(path)) for name, path in checklists],
+        sheet_name,
+        fuzzy_threshold,
+        cleanup=[work_dir],
+        pool=io_pool,
+        max_workers=BATCH_MAX_WORKERS,
+        include_raw=include_raw
+    )
+    return job_status(job)
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress ({done, total, stage}) of a job."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job_status(job)
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Result of a finished job, as the synchronous endpoint would have returned it."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}" + (f": {job['error']}" if job["error"] else ""))
+    if job.get("notice") and isinstance(job["result"], dict):
+        return {**job["result"], **job["notice"]}
+    return job["result"]
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; finished jobs are left as they are."""
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job_status(job)
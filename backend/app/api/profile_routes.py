@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.core import profiling
+from app.core.executors import run_io
+from app.core.profiling import profile_store
+
+router = APIRouter()
+
+SORT_KEYS = ("cumulative", "tottime", "ncalls", "filename", "name")
+
+
+def _require_enabled() -> None:
+    if not profiling.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILING_ENABLED=1)")
+
+
+@router.get("")
+async def list_profiles():
+    """Saved request profiles, newest first."""
+    _require_enabled()
+    return {"profiles": await run_io(profile_store.list)}
+
+
+@router.get("/{profile_id}")
+async def download_profile(profile_id: str):
+    """The profile as a pstats file (python -m pstats <file>, snakeviz, ...)."""
+    _require_enabled()
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+@router.get("/{profile_id}/summary", response_class=PlainTextResponse)
+async def profile_summary(profile_id: str, sort: str = "cumulative", limit: int = 50):
+    """Text report of the top `limit` functions of a profile, sorted by `sort`."""
+    _require_enabled()
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_KEYS)}")
+    summary = await run_io(profile_store.summary, profile_id, sort, max(1, limit))
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(summary)
@@ -0,0 +1,113 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+
+from app.api.hyperlink_routes import check_new_build
+from app.core.executors import run_cpu, run_io
+from app.services.parse_cache import run_cached
+from app.services.sessions import WorkbookSession, sessions
+from app.services.uploads import upload_store
+
+router = APIRouter()
+
+# Formats every session endpoint can read (openpyxl: no legacy .xls)
+WORKBOOK_SUFFIXES = (".xlsx", ".xlsm")
+
+
+async def _get_session(session_id: str) -> WorkbookSession:
+    session = await run_io(sessions.get, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired; upload the workbook again")
+    return session
+
+
+@router.post("")
+async def open_session(file: UploadFile = File(...)):
+    """Upload a workbook once; the returned session_id is used by the other session endpoints."""
+    fname = file.filename or ""
+    if not fname.lower().endswith(WORKBOOK_SUFFIXES):
+        raise HTTPException(status_code=400, detail="Please upload an .xlsx or .xlsm file")
+    stored = await run_io(upload_store.save, file)
+    session = await run_io(sessions.create, stored)
+    return session.info()
+
+
+@router.get("/{session_id}")
+async def get_session(session_id: str):
+    session = await _get_session(session_id)
+    return session.info()
+
+
+@router.delete("/{session_id}")
+async def close_session(session_id: str):
+    if not await run_io(sessions.close, session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return {"status": "ok"}
+
+
+@router.get("/{session_id}/hyperlinks")
+async def session_hyperlinks(session_id: str):
+    """Same result as /api/hyperlinks/extract-hyperlinks/."""
+    from app.services.excel_processor import extract_hyperlinks_from_file
+
+    session = await _get_session(session_id)
+    return await sessions.analyze(
+        session, ("hyperlinks",),
+        lambda: run_cpu(extract_hyperlinks_from_file, str(session.path))
+    )
+
+
+@router.get("/{session_id}/checklist")
+async def session_checklist(session_id: str, sheet_name: Optional[str] = "Test Scenario Remarks"):
+    """Same result as /api/upload-review-checklist."""
+    from app.services.extractor import extract_hyperlinks_with_versions_from_path
+
+    session = await _get_session(session_id)
+    results = await sessions.analyze(
+        session, ("checklist", sheet_name),
+        lambda: run_cached(run_cpu, extract_hyperlinks_with_versions_from_path, str(session.path), sheet_name=sheet_name)
+    )
+    return {"status": "ok", "data": results, "count": len(results)}
+
+
+@router.get("/{session_id}/traceability")
+async def session_traceability(session_id: str):
+    """Same result as /api/validate-tc-traceability."""
+    from app.services.tc_traceability import validate_tc_traceability
+
+    session = await _get_session(session_id)
+    return await sessions.analyze(
+        session, ("traceability",),
+        lambda: run_cpu(validate_tc_traceability, session.path)
+    )
+
+
+@router.post("/{session_id}/update-build")
+async def session_update_build(session_id: str, new_build: str = Form(...)):
+    """Same as /api/hyperlinks/update-build/: returns the updated copy, the session workbook is unchanged."""
+    from app.services.excel_processor import update_build_numbers_for_file
+
+    check_new_build(new_build)
+    session = await _get_session(session_id)
+    fd, output_path = tempfile.mkstemp(suffix=f"_build_{new_build}{session.path.suffix}")
+    os.close(fd)
+
+    result = await sessions.run(
+        session,
+        lambda: run_cpu(update_build_numbers_for_file, str(session.path), new_build, output_path)
+    )
+    if result['status'] != 'success':
+        os.remove(output_path)
+        raise HTTPException(status_code=500, detail=result['message'])
+
+    return FileResponse(
+        path=output_path,
+        filename=f"{Path(session.filename).stem}_build_{new_build}{Path(session.filename).suffix}",
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        background=BackgroundTask(os.remove, output_path)
+    )
@@ -1,5 +1,65 @@
+import os
 import tempfile
 from pathlib import Path
 
 UPLOAD_DIR = Path(tempfile.gettempdir()) / "uploads_backend"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+# Worker processes for batch jobs (unset = one per CPU core)
+BATCH_MAX_WORKERS = int(os.environ["BATCH_MAX_WORKERS"]) if os.environ.get("BATCH_MAX_WORKERS") else None
+# Address-space limit per batch worker process in MB (0 = unlimited; not enforced on Windows)
+BATCH_WORKER_MAX_MEMORY_MB = int(os.environ.get("BATCH_WORKER_MAX_MEMORY_MB", "0"))
+# Batch worker processes one server process may run at once, over all batches (unset = one per CPU core)
+BATCH_MAX_PROCESSES = int(os.environ["BATCH_MAX_PROCESSES"]) if os.environ.get("BATCH_MAX_PROCESSES") else None
+
+# Parsed SVN reports kept server-side for /compare-both (see app.services.datasets)
+DATASET_MAX_ENTRIES = int(os.environ.get("DATASET_MAX_ENTRIES", "8"))
+DATASET_TTL_SECONDS = int(os.environ.get("DATASET_TTL_SECONDS", "3600"))
+# Disk copies shared by every server process and kept past the TTL; 0 keeps datasets in memory only
+DATASET_DISK_MAX_BYTES = int(os.environ.get("DATASET_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+DATASET_DIR = UPLOAD_DIR / "datasets"
+
+# Incremental /compare-both runs kept for re-comparison (see app.services.incremental_compare)
+COMPARE_RUN_MAX_ENTRIES = int(os.environ.get("COMPARE_RUN_MAX_ENTRIES", "8"))
+COMPARE_RUN_TTL_SECONDS = int(os.environ.get("COMPARE_RUN_TTL_SECONDS", "3600"))
+
+# Parse results cached by file content (see app.services.parse_cache); 0 disables a tier
+PARSE_CACHE_MAX_BYTES = int(os.environ.get("PARSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PARSE_CACHE_DISK_MAX_BYTES = int(os.environ.get("PARSE_CACHE_DISK_MAX_BYTES", "0"))
+PARSE_CACHE_DIR = UPLOAD_DIR / "parse_cache"
+
+# Pools for blocking work called from async endpoints (see app.core.executors)
+IO_MAX_WORKERS = int(os.environ.get("IO_MAX_WORKERS", "8"))
+# Worker processes for parsing (unset = one per CPU core); CPU_POOL_MODE=thread keeps them in-process
+CPU_MAX_WORKERS = int(os.environ["CPU_MAX_WORKERS"]) if os.environ.get("CPU_MAX_WORKERS") else None
+CPU_POOL_MODE = os.environ.get("CPU_POOL_MODE", "process")
+# Calls allowed to wait for a busy pool before new ones are rejected with 503
+EXECUTOR_MAX_QUEUE = int(os.environ.get("EXECUTOR_MAX_QUEUE", "32"))
+
+# Background jobs (see app.services.jobs)
+JOB_RESULT_TTL_SECONDS = int(os.environ.get("JOB_RESULT_TTL_SECONDS", "3600"))
+JOB_MAX_CONCURRENT = int(os.environ["JOB_MAX_CONCURRENT"]) if os.environ.get("JOB_MAX_CONCURRENT") else None
+# SQLite file that keeps finished jobs across restarts (unset = memory only)
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH") or None
+JOB_DIR = UPLOAD_DIR / "jobs"
+
+# Import the service modules in the background once the server is up (see app.core.warmup)
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "1") != "0"
+
+# Largest accepted upload, enforced while the upload is being written
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Workbook sessions (see app.services.sessions)
+SESSION_IDLE_SECONDS = int(os.environ.get("SESSION_IDLE_SECONDS", "1800"))
+SESSION_MAX_BYTES = int(os.environ.get("SESSION_MAX_BYTES", str(512 * 1024 * 1024)))
+SESSION_DIR = UPLOAD_DIR / "sessions"
+
+# Request/phase timings served at /metrics (see app.core.metrics); 0 turns them off
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+# Per-request profiling (see app.core.profiling): off unless PROFILING_ENABLED=1. A request
+# is then profiled when it asks for it (X-Profile: 1 header or ?profile=1) or is sampled
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "50"))
+PROFILE_DIR = UPLOAD_DIR / "profiles"
@@ -0,0 +1,236 @@
+"""
+Worker pools for the blocking parts of async endpoints.
+
+Every handler is `async def`, so calling pandas/openpyxl or copying uploads
+directly would stall the event loop (and /health with it). Endpoints hand
+that work to one of two pools instead:
+  - run_io: a thread pool for file copies and zip handling
+  - run_cpu: a process pool for parsing and comparisons. Functions must be
+    module-level and their arguments/results picklable
+Each pool runs at most max_workers calls at once and lets max_queue more
+wait; beyond that calls are rejected with 503 instead of piling up.
+
+Batches (many workbooks in one request or job) fan out over a process pool
+of their own, created with batch_pools.create: its workers come out of a
+budget shared by every batch of the server process, so concurrent batches
+can't start more than BATCH_MAX_PROCESSES processes; past that, 503.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.core import metrics, profiling, warmup
+from app.core.config import (
+    BATCH_MAX_PROCESSES, BATCH_WORKER_MAX_MEMORY_MB, CPU_MAX_WORKERS, CPU_POOL_MODE, EXECUTOR_MAX_QUEUE, IO_MAX_WORKERS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _WorkerHTTPError(Exception):
+    """Picklable stand-in for an HTTPException raised in a worker process."""
+
+
+def _call_in_worker(func: Callable, args: tuple, kwargs: dict, capture_metrics: bool = False) -> Any:
+    try:
+        if not capture_metrics:
+            return func(*args, **kwargs)
+        # Phase timings of the call travel back with its result (see metrics.merge)
+        with metrics.capture() as samples:
+            return func(*args, **kwargs), samples
+    except HTTPException as e:
+        # HTTPException can't be unpickled in the parent process
+        raise _WorkerHTTPError(e.status_code, e.detail) from None
+
+
+class WorkerPool:
+    def __init__(self, name: str, max_workers: int, max_queue: int, use_processes: bool = False):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        # Created on first use: worker processes cost a second or two to start
+        if self._executor is None:
+            if self.use_processes:
+                # Don't fork while the warm-up thread may hold an import lock
+                warmup.wait()
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.name}-pool")
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        """Calls running or waiting in this pool."""
+        return self._pending
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        if self.use_processes and self._executor is None and not warmup.wait(0):
+            # The first call waits for the warm-up on a thread, so the event loop (and /health) keeps running
+            await asyncio.to_thread(warmup.wait)
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                raise HTTPException(status_code=503, detail=f"Server busy ({self.name} queue full), retry shortly")
+            executor = self._get_executor()
+            # Counted once the executor exists: the finally below gives the slot back
+            self._pending += 1
+
+        loop = asyncio.get_running_loop()
+        profile = profiling.current()
+        call, call_args = (profiling.profiled_call, (func, *args)) if profile else (func, args)
+        try:
+            if self.use_processes and metrics.enabled:
+                result, samples = await loop.run_in_executor(executor, _call_in_worker, call, call_args, kwargs, True)
+                metrics.merge(samples)
+            elif self.use_processes:
+                result = await loop.run_in_executor(executor, _call_in_worker, call, call_args, kwargs)
+            else:
+                result = await loop.run_in_executor(executor, functools.partial(call, *call_args, **kwargs))
+            # Stats of a profiled call are added to the request's profile
+            return profile.unwrap(result) if profile else result
+        except _WorkerHTTPError as e:
+            raise HTTPException(status_code=e.args[0], detail=e.args[1])
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool for the next call
+            logger.error(f"{self.name} worker pool broke while running {getattr(func, '__name__', func)}")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise HTTPException(status_code=500, detail="Worker process crashed while processing the file")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def prestart(self, func: Callable, *args) -> None:
+        """Start a worker process now by running func (e.g. imports) on it; the result is dropped."""
+        if not self.use_processes:
+            return
+        with self._lock:
+            executor = self._get_executor()
+        executor.submit(func, *args)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def limit_worker_memory(max_memory_mb: int) -> None:
+    """Cap the calling worker's address space so one huge workbook fails alone."""
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        # Windows: no per-process limit available
+        return
+    limit = max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _init_batch_worker(max_memory_mb: int, initializer: Optional[Callable], initargs: tuple) -> None:
+    limit_worker_memory(max_memory_mb)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class _BatchExecutor(ProcessPoolExecutor):
+    """Process pool of one batch; shutting it down gives its workers back to the budget."""
+
+    def __init__(self, pools: "BatchPools", workers: int, **kwargs):
+        super().__init__(max_workers=workers, **kwargs)
+        self._pools = pools
+        self._workers = workers
+        self._released = False
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+        with self._pools._lock:
+            if not self._released:
+                self._released = True
+                self._pools._used -= self._workers
+
+
+class BatchPools:
+    def __init__(self, max_processes: int):
+        self.max_processes = max_processes
+        self._used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def used(self) -> int:
+        """Batch worker processes currently handed out."""
+        return self._used
+
+    def workers_for(self, tasks: int, max_workers: Optional[int] = None) -> int:
+        """
+        Workers a batch of tasks should ask for (None = one per CPU core); 1
+        means run it in the calling process, which is always the case inside a
+        worker process (e.g. a job on the CPU pool) so pools are never nested.
+        """
+        if multiprocessing.parent_process() is not None:
+            return 1
+        return max(1, min(max_workers or os.cpu_count() or 1, tasks))
+
+    def create(
+        self,
+        workers: int,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+        max_memory_mb: int = BATCH_WORKER_MAX_MEMORY_MB
+    ) -> ProcessPoolExecutor:
+        """
+        Process pool with up to workers processes, fewer when the budget is
+        short and 503 when it is used up. Blocks during the warm-up, so call it
+        from a thread. Shut the pool down (or use it in a with block) when done.
+        """
+        # Don't fork while the warm-up thread may hold an import lock
+        warmup.wait()
+        with self._lock:
+            granted = min(workers, self.max_processes - self._used)
+            if granted < 1:
+                raise HTTPException(status_code=503, detail="Server busy (batch workers all in use), retry shortly")
+            self._used += granted
+        try:
+            return _BatchExecutor(self, granted, initializer=_init_batch_worker, initargs=(max_memory_mb, initializer, initargs))
+        except BaseException:
+            with self._lock:
+                self._used -= granted
+            raise
+
+
+io_pool = WorkerPool("io", IO_MAX_WORKERS, EXECUTOR_MAX_QUEUE)
+cpu_pool = WorkerPool(
+    "cpu",
+    CPU_MAX_WORKERS or os.cpu_count() or 1,
+    EXECUTOR_MAX_QUEUE,
+    use_processes=CPU_POOL_MODE == "process",
+)
+batch_pools = BatchPools(BATCH_MAX_PROCESSES or os.cpu_count() or 1)
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    return await io_pool.run(func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    return await cpu_pool.run(func, *args, **kwargs)
+
+
+def shutdown_pools() -> None:
+    io_pool.shutdown()
+    cpu_pool.shutdown()
@@ -0,0 +1,265 @@
+"""
+Request and phase timings, exposed in the Prometheus text format at /metrics.
+
+    with phase("compare.fuzzy"):        # time a block
+        ...
+
+    @timed("parse.checklist")           # or a whole function
+    def extract(...): ...
+
+    count_rows(len(rows))               # rows handled for the current request
+
+MetricsMiddleware records latency, request payload size and rows counted per
+route. Everything is kept in this process; functions run by run_cpu in a
+worker process record into a buffer that _call_in_worker sends back with the
+result (see capture/merge), so their phases show up here too. Batch pools
+started by the services themselves are not covered, only their route.
+
+With METRICS_ENABLED=0 phase() hands out one shared no-op context manager,
+timed() and count_rows() return at the first check, the middleware is not
+installed and /metrics answers 404.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import METRICS_ENABLED
+
+enabled = METRICS_ENABLED
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(11))  # 1 KB .. 1 GB
+ROWS_BUCKETS = (10, 100, 1000, 10_000, 100_000, 1_000_000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per combination of label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for label_values, counts, total in series:
+            labels = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, label_values))
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            braces = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{braces} {_format_value(total)}")
+            lines.append(f"{self.name}_count{braces} {cumulative}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body.",
+    ("method", "route", "status"), SECONDS_BUCKETS
+)
+REQUEST_BYTES = Histogram(
+    "http_request_size_bytes", "Request payload size (Content-Length).", ("method", "route"), BYTES_BUCKETS
+)
+REQUEST_ROWS = Histogram(
+    "http_request_rows", "Rows read or compared by the services for one request.", ("method", "route"), ROWS_BUCKETS
+)
+PHASE_SECONDS = Histogram(
+    "phase_duration_seconds", "Time spent in one service phase (parse, normalize, exact/fuzzy pass, ...).",
+    ("phase",), SECONDS_BUCKETS
+)
+HISTOGRAMS = (REQUEST_SECONDS, REQUEST_BYTES, REQUEST_ROWS, PHASE_SECONDS)
+
+# Rows counted for the request being handled (a one-item list, so tasks it spawns add to the same total)
+_request_rows: ContextVar[Optional[List[int]]] = ContextVar("request_rows", default=None)
+# Set in a worker process while a run_cpu call is captured: (phase, seconds) and ("rows", n) samples
+_captured: Optional[List[Tuple[str, float]]] = None
+
+
+def _record_phase(name: str, seconds: float) -> None:
+    if _captured is not None:
+        _captured.append((name, seconds))
+    else:
+        PHASE_SECONDS.observe(seconds, name)
+
+
+class _Phase:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "_Phase":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _record_phase(self.name, time.perf_counter() - self.start)
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name: str):
+    """Context manager timing a block as phase `name` (a shared no-op when metrics are off)."""
+    return _Phase(name) if enabled else _NO_PHASE
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator timing every call of a function as phase `name`."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record_phase(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count_rows(rows: int) -> None:
+    """Add rows to the current request's total (no-op outside a request)."""
+    if not enabled:
+        return
+    if _captured is not None:
+        _captured.append(("rows", rows))
+        return
+    total = _request_rows.get()
+    if total is not None:
+        total[0] += rows
+
+
+class capture:
+    """
+    Collect the samples of one call in a worker process instead of recording
+    them there; `samples` is what the parent passes to merge().
+    """
+
+    def __enter__(self) -> List[Tuple[str, float]]:
+        global _captured
+        self.samples, self._outer = [], _captured
+        _captured = self.samples
+        return self.samples
+
+    def __exit__(self, *exc) -> None:
+        global _captured
+        _captured = self._outer
+
+
+def merge(samples: List[Tuple[str, float]]) -> None:
+    """Record samples captured in a worker process as if they had happened here."""
+    for name, value in samples:
+        if name == "rows":
+            count_rows(int(value))
+        else:
+            _record_phase(name, value)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+def _route_path(scope) -> str:
+    """Path template of the matched route, e.g. "/api/jobs/{job_id}"."""
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        # Unmatched paths share one label so probing URLs can't grow the series without bound
+        return "unmatched"
+    # Routes of an included router may only know their path below the router's
+    # prefix; the request path has as many segments, so the rest is the prefix
+    parts = scope["path"].rstrip("/").split("/")
+    depth = template.rstrip("/").count("/")
+    return "/".join(parts[:len(parts) - depth]) + template
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, request size and rows per route for HTTP requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        rows = [0]
+        token = _request_rows.set(rows)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_rows.reset(token)
+            method, route = scope["method"], _route_path(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method, route, str(status[0]))
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    try:
+                        REQUEST_BYTES.observe(int(value), method, route)
+                    except ValueError:
+                        pass
+                    break
+            if rows[0]:
+                REQUEST_ROWS.observe(rows[0], method, route)
@@ -0,0 +1,252 @@
+"""
+Opt-in cProfile of single requests.
+
+With PROFILING_ENABLED=1 a request is profiled when it sends "X-Profile: 1"
+or "?profile=1", or at random with probability PROFILE_SAMPLE_RATE. Its
+response then carries X-Profile-Id, and the profile is saved as
+PROFILE_DIR/<id>.prof (pstats format, for python -m pstats, snakeviz, ...)
+next to <id>.json describing the request. /api/profiles lists and serves
+them; only the newest PROFILE_MAX_FILES are kept.
+
+Handlers mostly wait on the worker pools, so a profile of the event loop
+alone would show little. While a request is profiled, every call it hands
+to run_io/run_cpu is profiled where it runs (thread or worker process, see
+profiled_call) and the stats travel back with the result, so one profile
+covers the request across processes. The event loop part can include other
+requests running at the same time, and only one request at a time profiles
+it (cProfile can't nest); a second concurrent one still gets its pool calls.
+
+With PROFILING_ENABLED=0 (the default) the middleware passes requests
+straight through and /api/profiles answers 404.
+"""
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from app.core.config import PROFILE_DIR, PROFILE_MAX_FILES, PROFILE_SAMPLE_RATE, PROFILING_ENABLED
+
+logger = logging.getLogger(__name__)
+
+enabled = PROFILING_ENABLED
+sample_rate = PROFILE_SAMPLE_RATE
+
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,80}$")
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+class _RawStats:
+    """A profiler's stats dict in the form pstats.Stats accepts."""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+@dataclass
+class ProfiledResult:
+    value: Any
+    stats: Optional[Dict]
+
+
+def _start_profiler() -> Optional[cProfile.Profile]:
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active (one per process since Python 3.12)
+        return None
+    return profiler
+
+
+def _stop_profiler(profiler: cProfile.Profile) -> Dict:
+    profiler.disable()
+    profiler.create_stats()
+    return profiler.stats
+
+
+def profiled_call(func: Callable, *args, **kwargs) -> ProfiledResult:
+    """Run func under cProfile wherever it executes; module-level so worker processes can run it."""
+    profiler = _start_profiler()
+    try:
+        value = func(*args, **kwargs)
+    finally:
+        stats = _stop_profiler(profiler) if profiler else None
+    return ProfiledResult(value, stats)
+
+
+class RequestProfile:
+    """Stats collected for one profiled request."""
+
+    def __init__(self, profile_id: str):
+        self.profile_id = profile_id
+        self.parts: List[Dict] = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add(self, stats: Optional[Dict]) -> None:
+        if stats:
+            with self._lock:
+                self.parts.append(stats)
+
+    def unwrap(self, result: Any) -> Any:
+        """Result of a profiled_call, with its stats added to this profile."""
+        if isinstance(result, ProfiledResult):
+            self.add(result.stats)
+            return result.value
+        return result
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def current() -> Optional[RequestProfile]:
+    """Profile of the request being handled, if it is profiled."""
+    profile = _current.get()
+    # Background jobs inherit the context of the request that submitted them
+    return None if profile is None or profile.closed else profile
+
+
+class ProfileStore:
+    """Saved profiles in a directory: <id>.prof plus <id>.json, newest max_files kept."""
+
+    def __init__(self, root: Path, max_files: int):
+        self.root = root
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, parts: List[Dict], info: Dict[str, Any]) -> None:
+        stats = pstats.Stats()
+        stats.add(*[_RawStats(part) for part in parts if part])
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            stats.dump_stats(str(self.root / f"{profile_id}.prof"))
+            (self.root / f"{profile_id}.json").write_text(json.dumps({"profile_id": profile_id, **info}))
+            self._prune()
+
+    def _prune(self) -> None:
+        infos = sorted(self.root.glob("*.json"), key=os.path.getmtime, reverse=True)
+        for info_path in infos[self.max_files:]:
+            info_path.unlink(missing_ok=True)
+            info_path.with_suffix(".prof").unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Saved profiles, newest first."""
+        entries = []
+        for info_path in self.root.glob("*.json"):
+            try:
+                info = json.loads(info_path.read_text())
+                info["size"] = info_path.with_suffix(".prof").stat().st_size
+            except (OSError, ValueError):
+                # Pruned or being written meanwhile
+                continue
+            entries.append(info)
+        return sorted(entries, key=lambda e: (e["created_at"], e["profile_id"]), reverse=True)
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.root / f"{profile_id}.prof"
+        return path if path.is_file() else None
+
+    def summary(self, profile_id: str, sort: str = "cumulative", limit: int = 50) -> Optional[str]:
+        """pstats text report of a saved profile (top `limit` functions by `sort`)."""
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(str(path), stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+profile_store = ProfileStore(PROFILE_DIR, PROFILE_MAX_FILES)
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1").strip()
+    return None
+
+
+def _wants_profile(scope) -> bool:
+    flag = _header(scope, b"x-profile")
+    if flag is None:
+        flag = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile", [""])[-1]
+    if flag.lower() in _TRUE_VALUES:
+        return True
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def _new_profile_id(scope) -> str:
+    # Timestamp first so ids sort by time; a valid X-Request-ID makes the profile easy to find
+    request_id = _header(scope, b"x-request-id")
+    if not request_id or not PROFILE_ID_PATTERN.match(request_id):
+        request_id = uuid.uuid4().hex[:12]
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{request_id}"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the requests that ask for it (or are sampled)."""
+
+    def __init__(self, app, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+        self._loop_profiled = False
+
+    async def __call__(self, scope, receive, send):
+        if not enabled or scope["type"] != "http" or scope["path"].startswith("/api/profiles") or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(_new_profile_id(scope))
+        token = _current.set(profile)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.profile_id.encode())]
+            await send(message)
+
+        loop_profiler = None
+        if not self._loop_profiled:
+            loop_profiler = _start_profiler()
+            self._loop_profiled = loop_profiler is not None
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            if loop_profiler is not None:
+                profile.add(_stop_profiler(loop_profiler))
+                self._loop_profiled = False
+            profile.closed = True
+            _current.reset(token)
+            info = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status[0],
+                "duration_seconds": round(duration, 6),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            try:
+                await asyncio.to_thread(self.store.save, profile.profile_id, profile.parts, info)
+            except Exception:
+                logger.exception(f"Could not save profile {profile.profile_id}")
@@ -0,0 +1,70 @@
+"""
+Background warm-up after startup.
+
+The routers import the service modules (and with them pandas, numpy and
+openpyxl) inside the handlers, so the server answers /health before any of
+that is loaded. Right after startup this thread imports them anyway, so the
+first real request doesn't pay for it, then starts one CPU pool worker with
+the same modules loaded.
+
+Worker processes are forked on Linux, and a fork taken while this thread
+holds an import lock would leave the child stuck on it; the CPU pool waits
+for wait() before starting processes, on a thread when called from the event
+loop (see WorkerPool.run).
+"""
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+SERVICE_MODULES = (
+    "app.services.extractor",
+    "app.services.comparator",
+    "app.services.incremental_compare",
+    "app.services.excel_processor",
+    "app.services.tc_traceability",
+    "app.services.cia_compare",
+)
+
+_done = threading.Event()
+_done.set()
+
+
+def import_modules(modules: Sequence[str] = SERVICE_MODULES) -> Dict[str, float]:
+    """Import modules, returning seconds per module; module-level so a worker process can run it."""
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def _run(modules: Sequence[str]) -> None:
+    from app.core.executors import cpu_pool
+
+    start = time.perf_counter()
+    try:
+        import_modules(modules)
+    except Exception:
+        logger.exception("Warm-up import failed")
+    finally:
+        _done.set()
+    cpu_pool.prestart(import_modules, modules)
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f} s")
+
+
+def start(modules: Sequence[str] = SERVICE_MODULES) -> threading.Thread:
+    """Warm up in a daemon thread; returns right away."""
+    _done.clear()
+    thread = threading.Thread(target=_run, args=(modules,), name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def wait(timeout: Optional[float] = None) -> bool:
+    """Block until a running warm-up has imported its modules (True right away when none runs)."""
+    return _done.wait(timeout)
@@ -1,15 +1,34 @@
 import logging
 import argparse
-from fastapi import FastAPI
+import multiprocessing
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.core import metrics, warmup
+from app.core.config import WARMUP_ENABLED
+from app.core.profiling import ProfilingMiddleware
+from app.core.executors import shutdown_pools
 from app.api.endpoints import router as api_router
 from app.api.hyperlink_routes import router as hyperlink_router
+from app.api.job_routes import router as job_router
+from app.api.session_routes import router as session_router
+from app.api.profile_routes import router as profile_router
 from fastapi.middleware.cors import CORSMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Inspector: SVN CSV + Review Checklist (with advanced compare)")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Service modules are imported on first use; load them while /health already answers
+    if WARMUP_ENABLED:
+        warmup.start()
+    yield
+    # Stop the worker pools used by the endpoints; workbook sessions stay on disk for the other processes
+    shutdown_pools()
+
+app = FastAPI(title="Inspector: SVN CSV + Review Checklist (with advanced compare)", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,8 +38,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if metrics.enabled:
+    app.add_middleware(metrics.MetricsMiddleware)
+# Passes requests straight through unless PROFILING_ENABLED=1 (see app.core.profiling)
+app.add_middleware(ProfilingMiddleware)
+
 app.include_router(api_router, prefix="/api")
 app.include_router(hyperlink_router, prefix="/api/hyperlinks", tags=["Hyperlinks"])
+app.include_router(job_router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(session_router, prefix="/api/sessions", tags=["Sessions"])
+app.include_router(profile_router, prefix="/api/profiles", tags=["Profiles"])
 
 @app.get("/health")
 @app.head("/health")
@@ -28,8 +55,17 @@ async def health():
     logger.info("Health check endpoint called.")
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Request and phase histograms in the Prometheus text format (this process only)."""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=0)")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Support running as standalone executable
 if __name__ == "__main__":
+    # Batch endpoints use process pools; required for the frozen (PyInstaller) executable
+    multiprocessing.freeze_support()
     import uvicorn
     
     parser = argparse.ArgumentParser(description='Test Suite Backend Server')
@@ -3,16 +3,26 @@ CIA Comparison Service
 Compares requirement IDs between TC (Traceability) file and CIA file.
 """
 import re
+from dataclasses import dataclass
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Tuple, Optional
 from pathlib import Path
 from fastapi import HTTPException
+from app.core.executors import batch_pools
+from app.core.metrics import timed
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.io.parsers import TextParser
+from app.services.workbook_reader import open_workbook_readonly, iter_sheet_rows, iter_sheet_columns
 
 
 # Compiled regex patterns for better performance
 RE_CL_PREFIX = re.compile(r'(?i)^\s*CL\b')
 RE_NUMERIC = re.compile(r'^[+-]?\d+(\.\d+)?$')
 
+# Header rows are looked for in the first rows only before falling back to reading the whole sheet
+HEADER_SCAN_ROWS = 50
+
 def normalize_req_id(value) -> Optional[str]:
     """
     Normalize a Requirements ID to a canonical float-string with 3 decimal places.
@@ -61,6 +71,177 @@ def normalize_req_id(value) -> Optional[str]:
     return None
 
 
+def _as_text(values: pd.Series) -> pd.Series:
+    """str() of each value as an object Series with a fresh 0..n-1 index."""
+    return pd.Series([str(v) for v in values.tolist()], dtype=object)
+
+
+def normalize_req_ids(values: pd.Series) -> pd.Series:
+    """
+    Vectorized normalize_req_id: the normalized ID of every value, or None
+    where normalize_req_id returns None, keeping the index of values.
+
+    Numbers are parsed with float() (astype(float)) rather than pd.to_numeric,
+    whose parser can round long decimals differently.
+    """
+    normalized = np.full(len(values), None, dtype=object)
+    present = values.notna().to_numpy()
+
+    text = _as_text(values[present]).str.strip()
+    # Strip the CL prefix, then commas (a value matching RE_NUMERIC has none anyway)
+    text = text.str.replace(RE_CL_PREFIX, '', regex=True).str.strip()
+    text = text.str.replace(',', '', regex=False)
+    is_numeric = text.str.match(RE_NUMERIC).to_numpy(dtype=bool)
+
+    numbers = text[is_numeric].astype(float).tolist()
+    normalized[np.flatnonzero(present)[is_numeric]] = [f"{val:.3f}" for val in numbers]
+    return pd.Series(normalized, index=values.index, dtype=object)
+
+
+def _normalize_column(values: pd.Series) -> Tuple[List[str], Dict[str, Optional[str]]]:
+    """
+    Normalize the non-empty values of a column.
+
+    Returns:
+        Tuple of (normalized IDs deduplicated in order, {str(raw value): normalized})
+    """
+    values = values.dropna()
+    normalized = normalize_req_ids(values).tolist()
+    mapping = dict(zip(_as_text(values).tolist(), normalized))
+    normalized_unique = list(dict.fromkeys(n for n in normalized if n is not None))
+    return normalized_unique, mapping
+
+
+def sit_name_mask(values: pd.Series, sit_name: str) -> np.ndarray:
+    """
+    Boolean mask of the cells whose semicolon-separated SIT names include
+    sit_name, compared stripped and case-insensitively.
+    """
+    target = sit_name.strip().lower()
+    present = values.notna().to_numpy()
+
+    # One row per (cell, SIT name) pair; the index is the cell's position among the present ones
+    tokens = _as_text(values[present]).str.split(';').explode().astype(object).str.strip().str.lower()
+    present_hits = np.zeros(int(present.sum()), dtype=bool)
+    present_hits[tokens.index.to_numpy()[tokens.to_numpy() == target]] = True
+
+    mask = np.zeros(len(values), dtype=bool)
+    mask[present] = present_hits
+    return mask
+
+
+def _excel_value(cell):
+    """Cell value converted the way pandas' openpyxl reader does it."""
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        if val == cell.value:
+            return val
+        return float(cell.value)
+    return cell.value
+
+
+def _read_header_columns(excel_path: str, sheet_name: str, marker: str, columns: List[str]) -> Optional[pd.DataFrame]:
+    """
+    Read only the given columns of a sheet, below its header row.
+
+    The header row is the first row with a cell equal to marker (ignoring case),
+    looked for in the first HEADER_SCAN_ROWS rows with a streaming pass. The
+    projected rows go through the same pandas parser as pd.read_excel, so the
+    values are the ones the whole-sheet read gives.
+
+    Returns:
+        DataFrame with the given columns, or None when the header is not in the
+        first rows, a column is missing or repeated, or the file cannot be
+        streamed (e.g. .xls); callers then read the whole sheet
+    """
+    try:
+        wb = open_workbook_readonly(excel_path)
+        try:
+            head = []
+            for row in iter_sheet_rows(wb[sheet_name]):
+                head.append(row)
+                if len(head) >= HEADER_SCAN_ROWS:
+                    break
+        finally:
+            wb.close()
+
+        header_row = None
+        for row_idx, row in enumerate(head, start=1):
+            texts = [str(_excel_value(cell)).strip() for cell in row]
+            if marker.lower() in (text.lower() for text in texts):
+                header_row = row_idx
+                break
+        if header_row is None:
+            return None
+
+        col_numbers = []
+        for name in columns:
+            matches = [col_idx for col_idx, text in enumerate(texts, start=1) if text == name]
+            if len(matches) != 1:
+                return None
+            col_numbers.append(matches[0])
+
+        # Rows down to the header are kept so column types are inferred over the same values
+        data = [
+            [_excel_value(row[col_idx - 1]) if col_idx <= len(row) else "" for col_idx in col_numbers]
+            for row in head[:header_row]
+        ]
+        for _, cells in iter_sheet_columns(excel_path, sheet_name, col_numbers, min_row=header_row + 1):
+            data.append([_excel_value(cell) for cell in cells])
+
+        df = TextParser(data, header=None, skip_blank_lines=False).read()
+    except Exception:
+        return None
+
+    df = df.iloc[header_row:].reset_index(drop=True)
+    df.columns = columns
+    return df
+
+
+def _read_sheet_with_header(excel_path: str, sheet_name: str, marker: str, file_label: str) -> pd.DataFrame:
+    """
+    Read a whole sheet and use the first row containing marker as its header,
+    or the first row when there is none.
+    """
+    try:
+        # Read without forcing header to auto-detect header row
+        raw = pd.read_excel(excel_path, sheet_name=sheet_name, header=None)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to read sheet '{sheet_name}' from {file_label} file: {str(e)}"
+        )
+
+    # Find header row
+    header_row = None
+    for idx, row in raw.iterrows():
+        row_vals = row.astype(str).str.strip().str.lower().tolist()
+        if marker.lower() in row_vals:
+            header_row = idx
+            break
+
+    if header_row is None:
+        # Fallback to default header=0 read
+        try:
+            df = pd.read_excel(excel_path, sheet_name=sheet_name)
+        except Exception:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Could not find header row with '{marker}' in {file_label} sheet '{sheet_name}'"
+            )
+    else:
+        cols = raw.iloc[header_row].astype(str).str.strip().tolist()
+        df = raw.iloc[header_row + 1:].copy().reset_index(drop=True)
+        df.columns = cols
+
+    df.columns = df.columns.str.strip()
+    return df
+
+
 def extract_sit_name_from_tc_filename(tc_filename: str) -> str:
     """
     Extract SIT name from TC filename by replacing _TC with _SIT.
@@ -100,64 +281,56 @@ def extract_requirements_from_tc(
     Returns:
         Tuple of (normalized_ids_list, original_to_normalized_mapping)
     """
-    try:
-        # Read without forcing header to auto-detect header row
-        raw = pd.read_excel(excel_path, sheet_name=sheet_name, header=None)
-    except Exception as e:
+    df = _read_header_columns(excel_path, sheet_name, req_col_name, [req_col_name])
+    if df is None:
+        df = _read_sheet_with_header(excel_path, sheet_name, req_col_name, "TC")
+    
+    if req_col_name not in df.columns:
         raise HTTPException(
-            status_code=400, 
-            detail=f"Failed to read sheet '{sheet_name}' from TC file: {str(e)}"
+            status_code=400,
+            detail=f"Column '{req_col_name}' not found in TC sheet '{sheet_name}'. Available columns: {df.columns.tolist()}"
         )
 
-    # Find header row
-    header_row = None
-    for idx, row in raw.iterrows():
-        row_vals = row.astype(str).str.strip().str.lower().tolist()
-        if req_col_name.lower() in row_vals:
-            header_row = idx
-            break
+    return _normalize_column(df[req_col_name])
 
-    if header_row is None:
-        # Fallback to default header=0 read
-        try:
-            df = pd.read_excel(excel_path, sheet_name=sheet_name)
-        except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Could not find header row with '{req_col_name}' in TC sheet '{sheet_name}'"
-            )
-    else:
-        cols = raw.iloc[header_row].astype(str).str.strip().tolist()
-        df = raw.iloc[header_row + 1:].copy().reset_index(drop=True)
-        df.columns = cols
 
-    df.columns = df.columns.str.strip()
+def _read_cia_sheet(excel_path: str, sheet_name: str, hlr_col_name: str, sit_col_name: str) -> pd.DataFrame:
+    """Read the CIA sheet and check that the SIT name and HLR ID columns exist."""
+    df = _read_header_columns(excel_path, sheet_name, sit_col_name, [sit_col_name, hlr_col_name])
+    if df is None:
+        df = _read_sheet_with_header(excel_path, sheet_name, sit_col_name, "CIA")
     
-    if req_col_name not in df.columns:
+    # Check if required columns exist
+    if sit_col_name not in df.columns:
         raise HTTPException(
             status_code=400,
-            detail=f"Column '{req_col_name}' not found in TC sheet '{sheet_name}'. Available columns: {df.columns.tolist()}"
+            detail=f"Column '{sit_col_name}' not found in CIA sheet '{sheet_name}'. Available columns: {df.columns.tolist()}"
         )
-
-    req_values = df[req_col_name].dropna().tolist()
-    normalized = []
-    mapping = {}
     
-    for v in req_values:
-        norm = normalize_req_id(v)
-        mapping[str(v)] = norm
-        if norm is not None:
-            normalized.append(norm)
-
-    # Deduplicate while keeping order
-    seen = set()
-    normalized_unique = []
-    for n in normalized:
-        if n not in seen:
-            seen.add(n)
-            normalized_unique.append(n)
+    if hlr_col_name not in df.columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Column '{hlr_col_name}' not found in CIA sheet '{sheet_name}'. Available columns: {df.columns.tolist()}"
+        )
+    return df
 
-    return normalized_unique, mapping
+
+def _available_sit_names(values: pd.Series) -> List[str]:
+    """Sorted distinct SIT names of a column, splitting semicolon-separated cells."""
+    all_sits = set()
+    for val in values.dropna().unique():
+        for s in str(val).split(';'):
+            all_sits.add(s.strip())
+    return sorted(all_sits)
+
+
+def _sit_not_found(sit_name: str, available_sit_names: List[str]) -> HTTPException:
+    # Provide helpful error message with available SIT names
+    available_names = ', '.join([f"'{name}'" for name in available_sit_names[:10]])
+    return HTTPException(
+        status_code=400,
+        detail=f"No matching records found for SIT name: '{sit_name}'. Available SIT names (first 10): {available_names}"
+    )
 
 
 def extract_requirements_from_cia(
@@ -180,130 +353,86 @@ def extract_requirements_from_cia(
     Returns:
         Tuple of (normalized_ids_list, original_to_normalized_mapping)
     """
-    try:
-        # Read without forcing header to auto-detect header row
-        raw = pd.read_excel(excel_path, sheet_name=sheet_name, header=None)
-    except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Failed to read sheet '{sheet_name}' from CIA file: {str(e)}"
-        )
-
-    # Find header row by looking for 'SIT name' column
-    header_row = None
-    for idx, row in raw.iterrows():
-        row_vals = row.astype(str).str.strip().str.lower().tolist()
-        if sit_col_name.lower() in row_vals:
-            header_row = idx
-            break
-
-    if header_row is None:
-        # Fallback to default header=0 read
-        try:
-            df = pd.read_excel(excel_path, sheet_name=sheet_name)
-        except Exception:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Could not find header row with '{sit_col_name}' in CIA sheet '{sheet_name}'"
-            )
-    else:
-        cols = raw.iloc[header_row].astype(str).str.strip().tolist()
-        df = raw.iloc[header_row + 1:].copy().reset_index(drop=True)
-        df.columns = cols
-
-    df.columns = df.columns.str.strip()
-    
-    # Check if required columns exist
-    if sit_col_name not in df.columns:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Column '{sit_col_name}' not found in CIA sheet '{sheet_name}'. Available columns: {df.columns.tolist()}"
-        )
-    
-    if hlr_col_name not in df.columns:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Column '{hlr_col_name}' not found in CIA sheet '{sheet_name}'. Available columns: {df.columns.tolist()}"
-        )
+    df = _read_cia_sheet(excel_path, sheet_name, hlr_col_name, sit_col_name)
 
     # Filter rows where 'SIT name' matches the input (handling semicolon-separated values)
-    target_sit = sit_name.strip().lower()
-    
-    def check_sit_match(cell_value):
-        if pd.isna(cell_value):
-            return False
-        # Split by semicolon, strip whitespace, and lower case
-        sits = [s.strip().lower() for s in str(cell_value).split(';')]
-        return target_sit in sits
-
-    filtered_df = df[df[sit_col_name].apply(check_sit_match)]
+    filtered_df = df[sit_name_mask(df[sit_col_name], sit_name)]
     
     if len(filtered_df) == 0:
-        # Provide helpful error message with available SIT names
-        unique_sit_names = df[sit_col_name].dropna().unique()
-        # Flatten the list of SIT names for the error message
-        all_sits = set()
-        for val in unique_sit_names:
-            for s in str(val).split(';'):
-                all_sits.add(s.strip())
-        
-        available_names = ', '.join([f"'{name}'" for name in sorted(list(all_sits))[:10]])
-        raise HTTPException(
-            status_code=400,
-            detail=f"No matching records found for SIT name: '{sit_name}'. Available SIT names (first 10): {available_names}"
-        )
+        raise _sit_not_found(sit_name, _available_sit_names(df[sit_col_name]))
 
     # Extract HLR IDs
-    raw_hlr_ids = filtered_df[hlr_col_name].dropna().tolist()
-    
-    normalized = []
-    mapping = {}
-    
-    for v in raw_hlr_ids:
-        norm = normalize_req_id(v)
-        mapping[str(v)] = norm
-        if norm is not None:
-            normalized.append(norm)
-
-    # Deduplicate while keeping order
-    seen = set()
-    normalized_unique = []
-    for n in normalized:
-        if n not in seen:
-            seen.add(n)
-            normalized_unique.append(n)
-
-    return normalized_unique, mapping
+    return _normalize_column(filtered_df[hlr_col_name])
 
 
-def compare_tc_vs_cia(
-    tc_excel_path: str, 
-    cia_excel_path: str,
-    tc_filename: str = None
-) -> Dict:
+@dataclass
+class CiaIndex:
     """
-    Compare requirement IDs between TC and CIA Excel files.
+    Normalized HLR IDs of a CIA sheet by SIT name, so that many TC files can
+    be compared against a single read of the sheet.
+    """
+    # {stripped, lower-cased SIT name: normalized HLR IDs in sheet order}
+    hlr_ids: Dict[str, List[str]]
+    available_sit_names: List[str]
+
+    def requirements_for(self, sit_name: str) -> List[str]:
+        """
+        The IDs extract_requirements_from_cia returns for sit_name; raises the
+        same HTTPException when no row lists that SIT.
+        """
+        ids = self.hlr_ids.get(sit_name.strip().lower())
+        if ids is None:
+            raise _sit_not_found(sit_name, self.available_sit_names)
+        return ids
+
+
+@timed("cia.index")
+def build_cia_index(
+    excel_path: str,
+    sheet_name: str = 'HLR Change and Impact',
+    hlr_col_name: str = 'New HLR ID',
+    sit_col_name: str = 'SIT name'
+) -> CiaIndex:
+    """
+    Read the CIA sheet once and group its normalized HLR IDs by SIT name.
     
     Args:
-        tc_excel_path: Path to TC Excel file
-        cia_excel_path: Path to CIA Excel file
-        tc_filename: Original TC filename (used to derive SIT name)
+        excel_path: Path to CIA Excel file
+        sheet_name: Name of sheet to read (default: 'HLR Change and Impact')
+        hlr_col_name: Name of the HLR ID column (default: 'New HLR ID')
+        sit_col_name: Name of the SIT name column (default: 'SIT name')
         
     Returns:
-        Dictionary with comparison results in format expected by frontend
+        CiaIndex with an entry for every SIT name listed in the sheet
     """
-    # Extract SIT name from TC filename
-    if tc_filename is None:
-        tc_filename = Path(tc_excel_path).name
-    
-    sit_name = extract_sit_name_from_tc_filename(tc_filename)
-    
-    # Extract requirements from TC file (General sheet, Requirements ID column)
-    tc_ids, tc_map = extract_requirements_from_tc(tc_excel_path)
-    
-    # Extract requirements from CIA file (HLR Change and Impact sheet, New HLR ID column, filtered by SIT name)
-    cia_ids, cia_map = extract_requirements_from_cia(cia_excel_path, sit_name)
+    df = _read_cia_sheet(excel_path, sheet_name, hlr_col_name, sit_col_name)
+    sits = df[sit_col_name]
+    present = sits.notna().to_numpy()
+    hlr_ids = normalize_req_ids(df[hlr_col_name]).to_numpy()
+
+    # Same tokens sit_name_mask compares against, with the row each one comes from
+    tokens = _as_text(sits[present]).str.split(';').explode().astype(object).str.strip().str.lower()
+    rows = np.flatnonzero(present)[tokens.index.to_numpy()]
 
+    index: Dict[str, Dict[str, None]] = {}
+    for token, row in zip(tokens.tolist(), rows.tolist()):
+        ids = index.setdefault(token, {})
+        if hlr_ids[row] is not None:
+            ids[hlr_ids[row]] = None
+
+    return CiaIndex(
+        hlr_ids={token: list(ids) for token, ids in index.items()},
+        available_sit_names=_available_sit_names(sits)
+    )
+
+
+def compare_requirement_ids(tc_ids: List[str], cia_ids: List[str], sit_name: str) -> Dict:
+    """
+    Compare normalized TC and CIA requirement IDs.
+    
+    Returns:
+        Dictionary with comparison results in format expected by frontend
+    """
     set_tc = set(tc_ids)
     set_cia = set(cia_ids)
 
@@ -385,3 +514,143 @@ def compare_tc_vs_cia(
             "only_in_cia_count": len(only_in_cia)
         }
     }
+
+
+@timed("cia.compare")
+def compare_tc_vs_cia(
+    tc_excel_path: str, 
+    cia_excel_path: str,
+    tc_filename: str = None,
+    progress: Optional[Callable[[int, int, str], None]] = None
+) -> Dict:
+    """
+    Compare requirement IDs between TC and CIA Excel files.
+    
+    Args:
+        tc_excel_path: Path to TC Excel file
+        cia_excel_path: Path to CIA Excel file
+        tc_filename: Original TC filename (used to derive SIT name)
+        progress: Optional callback receiving (files read, 2, stage)
+        
+    Returns:
+        Dictionary with comparison results in format expected by frontend
+    """
+    # Extract SIT name from TC filename
+    if tc_filename is None:
+        tc_filename = Path(tc_excel_path).name
+    
+    sit_name = extract_sit_name_from_tc_filename(tc_filename)
+    
+    # Extract requirements from TC file (General sheet, Requirements ID column)
+    if progress:
+        progress(0, 2, "Reading TC file")
+    tc_ids, tc_map = extract_requirements_from_tc(tc_excel_path)
+    
+    # Extract requirements from CIA file (HLR Change and Impact sheet, New HLR ID column, filtered by SIT name)
+    if progress:
+        progress(1, 2, "Reading CIA file")
+    cia_ids, cia_map = extract_requirements_from_cia(cia_excel_path, sit_name)
+    if progress:
+        progress(2, 2, "Comparing requirements")
+
+    return compare_requirement_ids(tc_ids, cia_ids, sit_name)
+
+
+def _compare_tc_for_batch(tc_excel_path: str, tc_filename: str, sit_name: str, cia_ids: Optional[List[str]], cia_error: Optional[str]) -> Dict:
+    """
+    One TC file of a batch, run in a worker process. Errors are returned in
+    the entry (HTTPException does not survive the trip back from the worker).
+    """
+    entry = {"tc_filename": tc_filename, "sit_name": sit_name}
+    try:
+        # Same order as compare_tc_vs_cia: TC read errors are reported before a missing SIT
+        tc_ids, _ = extract_requirements_from_tc(tc_excel_path)
+        if cia_ids is None:
+            raise HTTPException(status_code=400, detail=cia_error)
+        entry.update(status="ok", **compare_requirement_ids(tc_ids, cia_ids, sit_name))
+    except HTTPException as e:
+        entry.update(status="error", error=e.detail)
+    except Exception as e:
+        entry.update(status="error", error=str(e))
+    return entry
+
+
+def compare_tc_batch_with_index(
+    tc_files: List[Tuple[str, str]],
+    cia_index: CiaIndex,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None
+) -> Dict:
+    """
+    Compare many TC files against an indexed CIA sheet, in parallel across a process pool
+    (in the calling process when it is itself a worker process).
+    
+    Args:
+        tc_files: (original TC filename, path) pairs; the filename gives the SIT name
+        cia_index: Index from build_cia_index
+        max_workers: Worker processes (None = one per CPU core)
+        progress: Optional callback receiving (files done, total files, stage)
+        
+    Returns:
+        {"summary": aggregate counts, "results": one entry per TC file in input order}.
+        Each entry has tc_filename, sit_name and status; "ok" entries also carry
+        what compare_tc_vs_cia returns for that file, "error" entries an error message.
+    """
+    jobs = []
+    for tc_filename, tc_path in tc_files:
+        sit_name = extract_sit_name_from_tc_filename(tc_filename)
+        try:
+            jobs.append((str(tc_path), tc_filename, sit_name, cia_index.requirements_for(sit_name), None))
+        except HTTPException as e:
+            jobs.append((str(tc_path), tc_filename, sit_name, None, e.detail))
+
+    results = []
+    workers = batch_pools.workers_for(len(jobs), max_workers)
+    if workers <= 1:
+        for job in jobs:
+            results.append(_compare_tc_for_batch(*job))
+            if progress:
+                progress(len(results), len(jobs), "Comparing TC files")
+    else:
+        # Workers come from the server's shared batch budget (see app.core.executors)
+        pool = batch_pools.create(workers)
+        try:
+            futures = [pool.submit(_compare_tc_for_batch, *job) for job in jobs]
+            for future in futures:
+                results.append(future.result())
+                if progress:
+                    progress(len(results), len(jobs), "Comparing TC files")
+        finally:
+            # A cancelled or failed batch drops the files not started yet
+            pool.shutdown(cancel_futures=True)
+
+    compared = [r for r in results if r["status"] == "ok"]
+    files_passed = sum(1 for r in compared if r["summary"]["failed"] == 0)
+    return {
+        "summary": {
+            "total_files": len(results),
+            "compared": len(compared),
+            "errors": len(results) - len(compared),
+            "files_passed": files_passed,
+            "files_failed": len(compared) - files_passed,
+            "total_requirements": sum(r["summary"]["total_requirements"] for r in compared),
+            "passed": sum(r["summary"]["passed"] for r in compared),
+            "failed": sum(r["summary"]["failed"] for r in compared)
+        },
+        "results": results
+    }
+
+
+def compare_tc_batch_vs_cia(
+    tc_files: List[Tuple[str, str]],
+    cia_excel_path: str,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None
+) -> Dict:
+    """
+    Compare many TC files against one CIA file, reading the CIA sheet once.
+    See compare_tc_batch_with_index for the arguments and the result.
+    """
+    if progress:
+        progress(0, len(tc_files), "Reading CIA file")
+    return compare_tc_batch_with_index(tc_files, build_cia_index(cia_excel_path), max_workers, progress)
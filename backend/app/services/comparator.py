@@ -1,14 +1,33 @@
-from typing import Dict, Any, List
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from app.core.executors import batch_pools
+from app.core.metrics import count_rows, phase
 from app.utils.common import (
-    normalize_filename_for_match,
-    normalize_version_string,
-    extract_int_from_version,
-    fuzzy_best_match
+    normalize_filenames_for_match,
+    normalize_version_strings,
+    extract_ints_from_versions,
+    FuzzyMatcher
 )
 
 # File extensions to ignore during SVN comparison
 IGNORED_EXTENSIONS = {'.mcr', '.mcorder', '.mccache', '.ewo', '.skc', '.vsw', '.html'}
 
+# Accepted spellings of each field, in lookup order (first non-empty value wins)
+SVN_FILE_KEYS = ("file", "Filename", "filename")  # only used when there is no "File" key
+SVN_REVISION_KEYS = ("Last Changed Revision", "last changed revision", "WC Revision", "revision", "Revision")
+SVN_AUTHOR_KEYS = ("Last Changed Author", "last changed author", "last changed author", "Last Changed Author")
+SVN_DATE_KEYS = ("Last Changed Date", "last changed date", "last changed date")
+CHECKLIST_FILE_KEYS = ("filename", "Filename", "File")
+CHECKLIST_VERSION_KEYS = ("version_closed", "Version", "version")
+
+Rows = Union[List[Dict[str, Any]], pd.DataFrame]
+
 def should_ignore_file(filename: str) -> bool:
     """
     Check if a file should be ignored based on its extension.
@@ -29,164 +48,340 @@ def should_ignore_file(filename: str) -> bool:
             return True
     return False
 
-def compare_data(svn_rows: List[Dict[str, Any]], checklist_rows: List[Dict[str, Any]], fuzzy_threshold: float = 0.85) -> Dict[str, Any]:
-    # Build canonical maps keyed by normalized filename (no extension)
-    # Value is a LIST of entries to handle collisions (e.g. same name, different extension)
-    svn_map: Dict[str, List[Dict[str, Any]]] = {}
-    for r in svn_rows:
-        # support both "File" or lowercase/other keys
-        filename = r.get("File") if "File" in r else r.get("file") or r.get("Filename") or r.get("filename")
-        if not filename:
-            continue
-        
-        # Skip files with ignored extensions
-        if should_ignore_file(filename):
+class _Columns:
+    """
+    Per-key columns of a list of row dicts (or a DataFrame), built once per
+    frame. A column holds row.get(key) for every row: None where the key is
+    missing, raw values otherwise.
+    """
+
+    def __init__(self, rows: Rows):
+        self.rows = rows
+        self._cache: Dict[str, pd.Series] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, key: str) -> pd.Series:
+        if key not in self._cache:
+            if isinstance(self.rows, pd.DataFrame):
+                if key in self.rows.columns:
+                    values = self.rows[key].to_numpy(dtype=object)
+                else:
+                    values = [None] * len(self.rows)
+            else:
+                values = [r.get(key) for r in self.rows]
+            self._cache[key] = pd.Series(values, dtype=object)
+        return self._cache[key]
+
+    def has(self, key: str) -> pd.Series:
+        if isinstance(self.rows, pd.DataFrame):
+            return pd.Series([key in self.rows.columns] * len(self.rows), dtype=bool)
+        return pd.Series([key in r for r in self.rows], dtype=bool)
+
+    def first(self, keys: Sequence[str]) -> pd.Series:
+        """Same as row.get(keys[0]) or row.get(keys[1]) or ... for every row."""
+        result = self.get(keys[-1])
+        for key in reversed(keys[:-1]):
+            column = self.get(key)
+            result = column.where(_truthy(column), result)
+        return result
+
+
+def _truthy(column: pd.Series) -> pd.Series:
+    """Python truthiness of each value (NaN is truthy, "" and 0 are not)."""
+    return pd.Series(column.to_numpy(dtype=object).astype(bool), index=column.index)
+
+
+def _raw_rows(rows: Rows) -> List[Any]:
+    """The row dicts themselves; a DataFrame is converted once, up front."""
+    if isinstance(rows, pd.DataFrame):
+        return rows.to_dict(orient="records")
+    return rows
+
+
+@dataclass(slots=True)
+class SvnEntry:
+    """An SVN report row normalized for matching (the row itself is not kept)."""
+    norm_name: str
+    filename_original: str
+    last_changed_revision_raw: str
+    last_changed_revision_int: Optional[int]
+    last_changed_author: Any
+    last_changed_date: Any
+
+
+@dataclass(slots=True)
+class ChecklistEntry:
+    """A checklist row normalized for matching; raw is the row itself, only kept when asked for."""
+    norm_name: str
+    filename_original: Any
+    version_closed_raw: str
+    version_closed_int: Optional[int]
+    inter_sheet_conflict: bool
+    conflict_comment: Any
+    raw: Optional[Dict[str, Any]] = None
+    matched: bool = False
+
+
+def build_svn_entries(svn_rows: Rows) -> List[SvnEntry]:
+    """
+    Normalize SVN report rows into comparison entries, column by column.
+
+    Rows without a filename and files with an ignored extension are dropped.
+    Accepts the row dicts of an extracted report or the report's DataFrame.
+    """
+    columns = _Columns(svn_rows)
+    if not len(columns):
+        return []
+
+    filenames = columns.get("File").where(columns.has("File"), columns.first(SVN_FILE_KEYS))
+    keep = _truthy(filenames)
+    # Filenames are matched as text; the few non-string cells (numbers) are converted
+    filenames = filenames.map(str).astype(object)
+    keep &= ~filenames.str.lower().str.endswith(tuple(IGNORED_EXTENSIONS)).astype(bool)
+    if not keep.any():
+        return []
+
+    filenames = filenames[keep]
+    norm_names = normalize_filenames_for_match(filenames)
+    revisions = columns.first(SVN_REVISION_KEYS)[keep]
+    revisions_raw = normalize_version_strings(revisions)
+    revisions_int = extract_ints_from_versions(revisions)
+    authors = columns.first(SVN_AUTHOR_KEYS)[keep]
+    dates = columns.first(SVN_DATE_KEYS)[keep]
+
+    return [
+        SvnEntry(norm, filename, rev_raw, rev_int, author, date)
+        for norm, filename, rev_raw, rev_int, author, date in zip(
+            norm_names.tolist(), filenames.tolist(), revisions_raw.tolist(), revisions_int, authors.tolist(), dates.tolist()
+        )
+    ]
+
+
+def build_checklist_entries(checklist_rows: Rows, include_raw: bool = False) -> List[ChecklistEntry]:
+    """
+    Normalize checklist rows into comparison entries; rows without a filename are dropped.
+    With include_raw each entry keeps its row, which only_in_checklist then returns as "raw".
+    """
+    columns = _Columns(checklist_rows)
+    if not len(columns):
+        return []
+
+    filenames = columns.first(CHECKLIST_FILE_KEYS)
+    keep = _truthy(filenames)
+    if not keep.any():
+        return []
+
+    filenames = filenames[keep]
+    norm_names = normalize_filenames_for_match(filenames)
+    versions = columns.first(CHECKLIST_VERSION_KEYS)[keep]
+    versions_raw = normalize_version_strings(versions)
+    versions_int = extract_ints_from_versions(versions)
+
+    conflicts = _truthy(columns.get("inter_sheet_conflict"))[keep]
+    comments = columns.get("conflict_comment")[keep]
+    raw_rows = _raw_rows(checklist_rows) if include_raw else None
+    return [
+        ChecklistEntry(norm, filename, version_raw, version_int, conflict, comment, raw_rows[i] if include_raw else None)
+        for i, norm, filename, version_raw, version_int, conflict, comment in zip(
+            filenames.index.tolist(), norm_names.tolist(), filenames.tolist(), versions_raw.tolist(), versions_int,
+            conflicts.tolist(), comments.tolist()
+        )
+    ]
+
+
+def _group_by_norm_name(entries: List[ChecklistEntry]) -> Dict[str, List[ChecklistEntry]]:
+    """Entries keyed by normalized filename; a list per key to handle collisions (same name, different extension)."""
+    grouped: Dict[str, List[ChecklistEntry]] = {}
+    for entry in entries:
+        grouped.setdefault(entry.norm_name, []).append(entry)
+    return grouped
+
+
+# Alphabet of normalized filenames; any other character is counted in one extra column
+_NAME_CHARS = {ch: i for i, ch in enumerate("abcdefghijklmnopqrstuvwxyz0123456789 ")}
+
+
+def _char_counts(names: Sequence[str]) -> np.ndarray:
+    """Character counts of each name, one row per name."""
+    counts = np.zeros((len(names), len(_NAME_CHARS) + 1), dtype=np.int32)
+    for row, name in enumerate(names):
+        for ch, n in Counter(name).items():
+            counts[row, _NAME_CHARS.get(ch, len(_NAME_CHARS))] += n
+    return counts
+
+
+class SvnIndex:
+    """
+    An SVN report normalized once, for matching against any number of checklists.
+
+    by_name holds entry positions per normalized filename, in report order.
+    With fuzzy=True the character counts of those names are kept as well:
+    difflib's ratio never exceeds quick_ratio (2 * shared characters / total
+    length), which only depends on the counts, so a comparison can skip the
+    fuzzy search for SVN names no checklist name comes close to. Comparisons
+    keep their matched state to themselves, so one index can serve many of
+    them (or be sent to worker processes).
+    """
+
+    def __init__(self, svn_rows: Rows, fuzzy: bool = False):
+        with phase("compare.normalize_svn"):
+            self.entries = build_svn_entries(svn_rows)
+            self.by_name: Dict[str, List[int]] = {}
+            for pos, entry in enumerate(self.entries):
+                self.by_name.setdefault(entry.norm_name, []).append(pos)
+            self.names = list(self.by_name)
+            self.name_chars = _char_counts(self.names) if fuzzy else None
+
+    def fuzzy_candidates(self, checklist_keys: Iterable[str], fuzzy_threshold: float) -> Optional[Set[str]]:
+        """
+        SVN names that could fuzzy-match one of checklist_keys (a superset of
+        those that will), or None when every name has to be tried.
+        """
+        if self.name_chars is None or fuzzy_threshold <= 0:
+            return None
+        # An empty name is scored against every candidate (see FuzzyMatcher.best_match)
+        candidates = {""}
+        name_lengths = self.name_chars.sum(axis=1)
+        keys = [key for key in set(checklist_keys) if key]
+        for key, key_chars in zip(keys, _char_counts(keys)):
+            shared = np.minimum(self.name_chars, key_chars).sum(axis=1)
+            close = 2.0 * shared / (name_lengths + len(key)) >= fuzzy_threshold
+            candidates.update(self.names[i] for i in np.flatnonzero(close))
+        return candidates
+
+    def unmatched(self, svn_matched: List[bool]) -> List[int]:
+        """Positions of the entries not matched, in the order compare_data lists them."""
+        return [pos for positions in self.by_name.values() for pos in positions if not svn_matched[pos]]
+
+
+def _versions_equal(s_entry: SvnEntry, c_entry: ChecklistEntry) -> bool:
+    s_ver_int = s_entry.last_changed_revision_int
+    c_ver_int = c_entry.version_closed_int
+    if s_ver_int is not None and c_ver_int is not None:
+        return s_ver_int == c_ver_int
+    s_ver_raw = s_entry.last_changed_revision_raw
+    c_ver_raw = c_entry.version_closed_raw
+    return s_ver_raw != "" and c_ver_raw != "" and s_ver_raw == c_ver_raw
+
+
+def _only_in_svn_entry(s_entry: SvnEntry) -> Dict[str, Any]:
+    return {
+        "filename": s_entry.filename_original,
+        "normalized_filename": s_entry.norm_name,
+        "last_changed_revision_raw": s_entry.last_changed_revision_raw,
+        "last_changed_revision_int": s_entry.last_changed_revision_int,
+        "last_changed_author": s_entry.last_changed_author,
+        "last_changed_date": s_entry.last_changed_date
+    }
+
+
+# One match found by a pass: (SVN entry position, result entry, counts as a match)
+Record = Tuple[int, Dict[str, Any], bool]
+
+
+def _record(s_pos: int, s_entry: SvnEntry, c_entry: ChecklistEntry, result_entry: Dict[str, Any]) -> Record:
+    # Add inter-sheet conflict info if present
+    if c_entry.inter_sheet_conflict:
+        result_entry["inter_sheet_conflict"] = True
+        result_entry["conflict_comment"] = c_entry.conflict_comment
+
+    # Treat inter-sheet conflicts as mismatches, even if max version matches SVN
+    is_match = not c_entry.inter_sheet_conflict and _versions_equal(s_entry, c_entry)
+    return s_pos, result_entry, is_match
+
+
+def _match_exact_group(
+    svn_entries: List[SvnEntry],
+    s_key: str,
+    s_positions: List[int],
+    c_entries: List[ChecklistEntry],
+    svn_matched: List[bool]
+) -> List[Record]:
+    """Exact pass over the SVN and checklist entries sharing one normalized name."""
+    records = []
+    
+    # Try to match up entries within this group
+    # Strategy: 
+    # 1. Exact filename match (case-insensitive)
+    # 2. If 1-to-1 remaining, match them
+    
+    # Helper to find match
+    for s_pos in s_positions:
+        if svn_matched[s_pos]:
             continue
-        norm = normalize_filename_for_match(filename)
-        svn_rev_raw = r.get("Last Changed Revision") or r.get("Last Changed Revision".lower()) or r.get("WC Revision") or r.get("revision") or r.get("Revision")
-        svn_auth = r.get("Last Changed Author") or r.get("Last Changed Author".lower()) or r.get("last changed author") or r.get("Last Changed Author")
-        svn_date = r.get("Last Changed Date") or r.get("Last Changed Date".lower()) or r.get("last changed date")
+        s_entry = svn_entries[s_pos]
+            
+        best_c_match = None
         
-        entry = {
-            "raw": r,
-            "norm_name": norm,
-            "filename_original": filename,
-            "last_changed_revision_raw": normalize_version_string(svn_rev_raw),
-            "last_changed_revision_int": extract_int_from_version(svn_rev_raw),
-            "last_changed_author": svn_auth,
-            "last_changed_date": svn_date,
-            "matched": False
-        }
+        # 1. Try exact filename match
+        for c_entry in c_entries:
+            if not c_entry.matched and s_entry.filename_original.lower() == c_entry.filename_original.lower():
+                best_c_match = c_entry
+                break
         
-        if norm not in svn_map:
-            svn_map[norm] = []
-        svn_map[norm].append(entry)
-
-    checklist_map: Dict[str, List[Dict[str, Any]]] = {}
-    checklist_norm_list: List[str] = []
-    for r in checklist_rows:
-        filename = r.get("filename") or r.get("Filename") or r.get("File")
-        if not filename:
-            continue
-        norm = normalize_filename_for_match(filename)
-        checklist_norm_list.append(norm)
+        # 2. If no exact match, and both have only 1 unmatched entry, match them
+        if not best_c_match:
+            unmatched_s = [x for x in s_positions if not svn_matched[x]]
+            unmatched_c = [x for x in c_entries if not x.matched]
+            if len(unmatched_s) == 1 and len(unmatched_c) == 1:
+                best_c_match = unmatched_c[0]
         
-        entry = {
-            "raw": r,
-            "norm_name": norm,
-            "filename_original": filename,
-            "version_closed_raw": normalize_version_string(r.get("version_closed") or r.get("Version") or r.get("version")),
-            "version_closed_int": extract_int_from_version(r.get("version_closed") or r.get("Version") or r.get("version")),
-            "matched": False,
-            "inter_sheet_conflict": r.get("inter_sheet_conflict", False),
-            "conflict_comment": r.get("conflict_comment", None)
-        }
-        
-        if norm not in checklist_map:
-            checklist_map[norm] = []
-        checklist_map[norm].append(entry)
+        if best_c_match:
+            # Found a match
+            svn_matched[s_pos] = True
+            best_c_match.matched = True
 
-    # Matching process
-    matches = []
-    mismatches = []
-    only_in_svn = []
-    only_in_checklist = []
+            records.append(_record(s_pos, s_entry, best_c_match, {
+                "filename": s_entry.filename_original,
+                "normalized_filename": s_key,
+                "matched_checklist_filename": best_c_match.filename_original,
+                "svn_revision_raw": s_entry.last_changed_revision_raw,
+                "svn_revision_int": s_entry.last_changed_revision_int,
+                "checklist_version_raw": best_c_match.version_closed_raw,
+                "checklist_version_int": best_c_match.version_closed_int,
+                "last_changed_author": s_entry.last_changed_author,
+                "last_changed_date": s_entry.last_changed_date,
+                "match_type": "exact",
+                "score": 1.0
+            }))
+    return records
 
-    # First pass: exact normalized matches
-    for s_key, s_entries in svn_map.items():
-        if s_key in checklist_map:
-            c_entries = checklist_map[s_key]
-            
-            # Try to match up entries within this group
-            # Strategy: 
-            # 1. Exact filename match (case-insensitive)
-            # 2. If 1-to-1 remaining, match them
-            
-            # Helper to find match
-            for s_entry in s_entries:
-                if s_entry["matched"]:
-                    continue
-                    
-                best_c_match = None
-                
-                # 1. Try exact filename match
-                for c_entry in c_entries:
-                    if not c_entry["matched"] and s_entry["filename_original"].lower() == c_entry["filename_original"].lower():
-                        best_c_match = c_entry
-                        break
-                
-                # 2. If no exact match, and both have only 1 unmatched entry, match them
-                if not best_c_match:
-                    unmatched_s = [x for x in s_entries if not x["matched"]]
-                    unmatched_c = [x for x in c_entries if not x["matched"]]
-                    if len(unmatched_s) == 1 and len(unmatched_c) == 1:
-                        best_c_match = unmatched_c[0]
-                
-                if best_c_match:
-                    # Found a match
-                    s_entry["matched"] = True
-                    best_c_match["matched"] = True
-                    
-                    s_ver_int = s_entry["last_changed_revision_int"]
-                    c_ver_int = best_c_match["version_closed_int"]
-                    s_ver_raw = s_entry["last_changed_revision_raw"]
-                    c_ver_raw = best_c_match["version_closed_raw"]
-
-                    version_equal = False
-                    if s_ver_int is not None and c_ver_int is not None:
-                        version_equal = (s_ver_int == c_ver_int)
-                    else:
-                        version_equal = (s_ver_raw != "" and c_ver_raw != "" and s_ver_raw == c_ver_raw)
-
-                    result_entry = {
-                        "filename": s_entry["filename_original"],
-                        "normalized_filename": s_key,
-                        "matched_checklist_filename": best_c_match["filename_original"],
-                        "svn_revision_raw": s_ver_raw,
-                        "svn_revision_int": s_ver_int,
-                        "checklist_version_raw": c_ver_raw,
-                        "checklist_version_int": c_ver_int,
-                        "last_changed_author": s_entry["last_changed_author"],
-                        "last_changed_date": s_entry["last_changed_date"],
-                        "match_type": "exact",
-                        "score": 1.0
-                    }
-                    
-                    # Add inter-sheet conflict info if present
-                    if best_c_match["inter_sheet_conflict"]:
-                        result_entry["inter_sheet_conflict"] = True
-                        result_entry["conflict_comment"] = best_c_match["conflict_comment"]
-                    
-                    # Treat inter-sheet conflicts as mismatches, even if max version matches SVN
-                    if best_c_match["inter_sheet_conflict"]:
-                        mismatches.append(result_entry)
-                    elif version_equal:
-                        matches.append(result_entry)
-                    else:
-                        mismatches.append(result_entry)
-
-    # Second pass: Fuzzy matching for unmatched SVN entries
-    # Get all unmatched SVN entries
-    unmatched_svn_entries = []
-    for s_list in svn_map.values():
-        for s in s_list:
-            if not s["matched"]:
-                unmatched_svn_entries.append(s)
-                
-    # Get all unmatched Checklist entries (candidates)
-    unmatched_checklist_entries = []
-    for c_list in checklist_map.values():
-        for c in c_list:
-            if not c["matched"]:
-                unmatched_checklist_entries.append(c)
-                
+
+def _match_fuzzy(
+    svn_entries: List[SvnEntry],
+    unmatched_svn: List[int],
+    unmatched_checklist_entries: List[ChecklistEntry],
+    fuzzy_threshold: float,
+    svn_matched: List[bool],
+    svn_candidates: Optional[Set[str]] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None
+) -> List[Record]:
+    """
+    Fuzzy pass: each unmatched SVN entry, in order, takes the best scoring
+    checklist name still unmatched. SVN names outside svn_candidates (when
+    given) are known not to reach the threshold and are not searched.
+    """
+    records = []
     # Map normalized names to list of unmatched checklist entries for fuzzy search
     # We need a list of unique normalized keys from unmatched checklist entries to run fuzzy match against
-    checklist_candidate_keys = list(set(c["norm_name"] for c in unmatched_checklist_entries))
+    # (sorted: ties go to the same key whatever the set's iteration order)
+    checklist_candidate_keys = sorted(set(c.norm_name for c in unmatched_checklist_entries))
+    # Indexed search over the candidate keys: same best match as fuzzy_best_match
+    # at this threshold, without scoring every key against every SVN entry
+    fuzzy_index = FuzzyMatcher(checklist_candidate_keys)
+    unmatched_by_key: Dict[str, List[ChecklistEntry]] = {}
+    for c in unmatched_checklist_entries:
+        unmatched_by_key.setdefault(c.norm_name, []).append(c)
 
-    for s_entry in unmatched_svn_entries:
-        s_key = s_entry["norm_name"]
-        best_candidate_key, score = fuzzy_best_match(s_key, checklist_candidate_keys)
+    for fuzzy_done, s_pos in enumerate(unmatched_svn, start=1):
+        s_entry = svn_entries[s_pos]
+        s_key = s_entry.norm_name
+        if svn_candidates is not None and s_key not in svn_candidates:
+            best_candidate_key, score = None, 0.0
+        else:
+            best_candidate_key, score = fuzzy_index.best_match(s_key, fuzzy_threshold)
         
         if best_candidate_key and score >= fuzzy_threshold:
             # Find an unmatched checklist entry with this key
@@ -194,88 +389,115 @@ def compare_data(svn_rows: List[Dict[str, Any]], checklist_rows: List[Dict[str,
             # Or we could try to find the "best" one among them?
             
             # Get candidates with this key
-            candidates = [c for c in unmatched_checklist_entries if c["norm_name"] == best_candidate_key and not c["matched"]]
+            candidates = unmatched_by_key.get(best_candidate_key, [])
             
             if candidates:
-                c_entry = candidates[0]
-                c_entry["matched"] = True
-                s_entry["matched"] = True
+                c_entry = candidates.pop(0)
+                c_entry.matched = True
+                svn_matched[s_pos] = True
                 
                 # If we used up all candidates for this key, remove from search list (optional optimization)
-                if len(candidates) == 1:
-                    checklist_candidate_keys.remove(best_candidate_key)
-
-                s_ver_int = s_entry["last_changed_revision_int"]
-                c_ver_int = c_entry["version_closed_int"]
-                s_ver_raw = s_entry["last_changed_revision_raw"]
-                c_ver_raw = c_entry["version_closed_raw"]
+                if not candidates:
+                    fuzzy_index.discard(best_candidate_key)
 
-                version_equal = False
-                if s_ver_int is not None and c_ver_int is not None:
-                    version_equal = (s_ver_int == c_ver_int)
-                else:
-                    version_equal = (s_ver_raw != "" and c_ver_raw != "" and s_ver_raw == c_ver_raw)
-
-                result_entry = {
-                    "filename": s_entry["filename_original"],
+                records.append(_record(s_pos, s_entry, c_entry, {
+                    "filename": s_entry.filename_original,
                     "normalized_filename": s_key,
-                    "matched_checklist_filename": c_entry["filename_original"],
+                    "matched_checklist_filename": c_entry.filename_original,
                     "matched_checklist_normalized": best_candidate_key,
-                    "svn_revision_raw": s_ver_raw,
-                    "svn_revision_int": s_ver_int,
-                    "checklist_version_raw": c_ver_raw,
-                    "checklist_version_int": c_ver_int,
-                    "last_changed_author": s_entry["last_changed_author"],
-                    "last_changed_date": s_entry["last_changed_date"],
+                    "svn_revision_raw": s_entry.last_changed_revision_raw,
+                    "svn_revision_int": s_entry.last_changed_revision_int,
+                    "checklist_version_raw": c_entry.version_closed_raw,
+                    "checklist_version_int": c_entry.version_closed_int,
+                    "last_changed_author": s_entry.last_changed_author,
+                    "last_changed_date": s_entry.last_changed_date,
                     "match_type": "fuzzy",
                     "score": score
-                }
-                
-                # Add inter-sheet conflict info if present
-                if c_entry["inter_sheet_conflict"]:
-                    result_entry["inter_sheet_conflict"] = True
-                    result_entry["conflict_comment"] = c_entry["conflict_comment"]
-                
-                # Treat inter-sheet conflicts as mismatches, even if max version matches SVN
-                if c_entry["inter_sheet_conflict"]:
-                    mismatches.append(result_entry)
-                elif version_equal:
-                    matches.append(result_entry)
-                else:
-                    mismatches.append(result_entry)
+                }))
             else:
                 # Should not happen if logic is correct
                 pass
-        
-        if not s_entry["matched"]:
-            # No fuzzy match found
-            only_in_svn.append({
-                "filename": s_entry["filename_original"],
-                "normalized_filename": s_entry["norm_name"],
-                "last_changed_revision_raw": s_entry["last_changed_revision_raw"],
-                "last_changed_revision_int": s_entry["last_changed_revision_int"],
-                "last_changed_author": s_entry["last_changed_author"],
-                "last_changed_date": s_entry["last_changed_date"]
-            })
 
+        if progress:
+            progress(fuzzy_done, len(unmatched_svn), "Fuzzy matching")
+    return records
+
+
+def _only_in_checklist_entry(c: ChecklistEntry) -> Dict[str, Any]:
+    entry = {
+        "filename": c.filename_original,
+        "normalized_filename": c.norm_name,
+        "version_closed_raw": c.version_closed_raw,
+        "version_closed_int": c.version_closed_int
+    }
+    if c.raw is not None:
+        entry["raw"] = c.raw
+    
+    # Add inter-sheet conflict info if present
+    if c.inter_sheet_conflict:
+        entry["inter_sheet_conflict"] = True
+        entry["conflict_comment"] = c.conflict_comment
+    return entry
+
+
+def _shared_keys(index: SvnIndex, checklist_map: Dict[str, List[ChecklistEntry]]) -> List[str]:
+    """Normalized names present on both sides (join of the two key sets, in SVN order)."""
+    return pd.DataFrame({"norm_name": list(index.by_name)}).merge(
+        pd.DataFrame({"norm_name": list(checklist_map)}), on="norm_name", how="inner"
+    )["norm_name"].tolist()
+
+
+def _match_checklist(
+    index: SvnIndex,
+    checklist_rows: Rows,
+    fuzzy_threshold: float,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    include_raw: bool = False
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]], List[bool]]:
+    """
+    Match one checklist against an indexed SVN report.
+    Returns (matches, mismatches, only_in_checklist, matched flag per SVN entry).
+    """
+    svn_matched = [False] * len(index.entries)
+    with phase("compare.normalize_checklist"):
+        checklist_map = _group_by_norm_name(build_checklist_entries(checklist_rows, include_raw))
+
+    # First pass: exact normalized matches
+    records = []
+    with phase("compare.exact"):
+        for s_key in _shared_keys(index, checklist_map):
+            records += _match_exact_group(index.entries, s_key, index.by_name[s_key], checklist_map[s_key], svn_matched)
+
+    # Second pass: Fuzzy matching for unmatched SVN entries against unmatched checklist entries
+    with phase("compare.fuzzy"):
+        unmatched_checklist_entries = [c for c_list in checklist_map.values() for c in c_list if not c.matched]
+        # SVN names outside this set can't reach the threshold against any candidate
+        svn_candidates = index.fuzzy_candidates({c.norm_name for c in unmatched_checklist_entries}, fuzzy_threshold)
+        records += _match_fuzzy(
+            index.entries, index.unmatched(svn_matched), unmatched_checklist_entries,
+            fuzzy_threshold, svn_matched, svn_candidates, progress
+        )
+
+    matches = [result for _, result, is_match in records if is_match]
+    mismatches = [result for _, result, is_match in records if not is_match]
     # Collect remaining unmatched checklist entries
-    for c_list in checklist_map.values():
-        for c in c_list:
-            if not c["matched"]:
-                entry = {
-                    "filename": c["filename_original"],
-                    "normalized_filename": c["norm_name"],
-                    "version_closed_raw": c["version_closed_raw"],
-                    "version_closed_int": c["version_closed_int"],
-                    "raw": c["raw"]
-                }
-                
-                # Add inter-sheet conflict info if present
-                if c["inter_sheet_conflict"]:
-                    entry["inter_sheet_conflict"] = True
-                    entry["conflict_comment"] = c["conflict_comment"]
-                
-                only_in_checklist.append(entry)
+    only_in_checklist = [_only_in_checklist_entry(c) for c_list in checklist_map.values() for c in c_list if not c.matched]
+    return matches, mismatches, only_in_checklist, svn_matched
+
+
+def compare_with_svn_index(
+    index: SvnIndex,
+    checklist_rows: Rows,
+    fuzzy_threshold: float = 0.85,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    include_raw: bool = False
+) -> Dict[str, Any]:
+    """compare_data against an already indexed SVN report; the result is the same."""
+    matches, mismatches, only_in_checklist, svn_matched = _match_checklist(
+        index, checklist_rows, fuzzy_threshold, progress, include_raw
+    )
+    only_in_svn = [_only_in_svn_entry(index.entries[pos]) for pos in index.unmatched(svn_matched)]
+    count_rows(len(index.entries) + len(checklist_rows))
 
     return {
         "status": "ok",
@@ -290,3 +512,167 @@ def compare_data(svn_rows: List[Dict[str, Any]], checklist_rows: List[Dict[str,
         "only_in_svn": only_in_svn,
         "only_in_checklist": only_in_checklist
     }
+
+
+def compare_data(
+    svn_rows: Rows,
+    checklist_rows: Rows,
+    fuzzy_threshold: float = 0.85,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    include_raw: bool = False
+) -> Dict[str, Any]:
+    """
+    Match SVN report rows against checklist rows: exact normalized names first,
+    then fuzzy matching for what is left. progress, when given, receives
+    (SVN entries done, total, stage) during the fuzzy pass. With include_raw
+    each only_in_checklist entry also carries its checklist row as "raw".
+    """
+    return compare_with_svn_index(SvnIndex(svn_rows), checklist_rows, fuzzy_threshold, progress, include_raw)
+
+
+# SVN index of the batch, set once per worker process by the pool initializer
+_batch_svn_index: Optional[SvnIndex] = None
+
+
+def _set_batch_svn_index(index: SvnIndex) -> None:
+    global _batch_svn_index
+    _batch_svn_index = index
+
+
+def _compare_checklist_for_batch(
+    filename: str,
+    checklist_path: str,
+    sheet_name: str,
+    fuzzy_threshold: float,
+    include_raw: bool = False,
+    index: Optional[SvnIndex] = None
+) -> Dict[str, Any]:
+    """
+    One checklist of a package, run in a worker process. Errors are returned in
+    the entry (HTTPException does not survive the trip back from the worker).
+    """
+    from app.services.extractor import extract_hyperlinks_with_versions_from_path
+
+    index = _batch_svn_index if index is None else index
+    entry: Dict[str, Any] = {"filename": filename}
+    try:
+        checklist_rows = extract_hyperlinks_with_versions_from_path(checklist_path, sheet_name=sheet_name)
+        matches, mismatches, only_in_checklist, svn_matched = _match_checklist(
+            index, checklist_rows, fuzzy_threshold, include_raw=include_raw
+        )
+    except HTTPException as e:
+        entry.update(status="error", error=e.detail)
+        return entry
+    except Exception as e:
+        entry.update(status="error", error=str(e))
+        return entry
+
+    entry.update(
+        status="ok",
+        summary={"matches": len(matches), "mismatches": len(mismatches), "only_in_checklist": len(only_in_checklist)},
+        matches=matches,
+        mismatches=mismatches,
+        only_in_checklist=only_in_checklist,
+        matched_svn=[pos for pos, matched in enumerate(svn_matched) if matched]
+    )
+    return entry
+
+
+def compare_package_with_index(
+    index: SvnIndex,
+    checklists: List[Tuple[str, str]],
+    sheet_name: str = "Test Scenario Remarks",
+    fuzzy_threshold: float = 0.85,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    include_raw: bool = False
+) -> Dict[str, Any]:
+    """
+    Compare every checklist of a review package against one indexed SVN report.
+
+    The checklists are read and matched in parallel across a process pool
+    (in the calling process when it is itself a worker process), each
+    exactly as compare_data would match it on its own.
+
+    Args:
+        index: SvnIndex of the report, built with fuzzy=True
+        checklists: (original checklist filename, path) pairs
+        sheet_name: Checklist sheet to read, as for /upload-review-checklist
+        fuzzy_threshold: Fuzzy matching threshold, as for compare_data
+        max_workers: Worker processes (None = one per CPU core)
+        progress: Optional callback receiving (checklists done, total, stage)
+        include_raw: Return the checklist row of only_in_checklist entries, as for compare_data
+
+    Returns:
+        {"status", "summary", "mismatches", "only_in_svn", "results"}:
+          - mismatches: the mismatches of every checklist, each tagged with its "checklist"
+          - only_in_svn: SVN files that no checklist of the package matched
+          - results: one entry per checklist in input order, with filename and
+            status; "ok" entries carry summary, matches, mismatches and
+            only_in_checklist, "error" entries an error message
+    """
+    jobs = [(filename, str(path), sheet_name, fuzzy_threshold, include_raw) for filename, path in checklists]
+
+    results = []
+    workers = batch_pools.workers_for(len(jobs), max_workers)
+    if workers <= 1:
+        for job in jobs:
+            results.append(_compare_checklist_for_batch(*job, index=index))
+            if progress:
+                progress(len(results), len(jobs), "Comparing checklists")
+    else:
+        # Workers come from the server's shared batch budget; the index goes to each worker once, not with every checklist
+        pool = batch_pools.create(workers, _set_batch_svn_index, (index,))
+        try:
+            futures = [pool.submit(_compare_checklist_for_batch, *job) for job in jobs]
+            for future in futures:
+                results.append(future.result())
+                if progress:
+                    progress(len(results), len(jobs), "Comparing checklists")
+        finally:
+            # A cancelled or failed batch drops the checklists not started yet
+            pool.shutdown(cancel_futures=True)
+
+    compared = [r for r in results if r["status"] == "ok"]
+    matched_anywhere = [False] * len(index.entries)
+    for result in compared:
+        for pos in result.pop("matched_svn"):
+            matched_anywhere[pos] = True
+    mismatches = [{"checklist": r["filename"], **m} for r in compared for m in r["mismatches"]]
+    only_in_svn = [_only_in_svn_entry(index.entries[pos]) for pos in index.unmatched(matched_anywhere)]
+
+    return {
+        "status": "ok",
+        "summary": {
+            "checklists": len(results),
+            "compared": len(compared),
+            "errors": len(results) - len(compared),
+            "svn_files": len(index.entries),
+            "matches": sum(r["summary"]["matches"] for r in compared),
+            "mismatches": len(mismatches),
+            "only_in_svn": len(only_in_svn),
+            "only_in_checklist": sum(r["summary"]["only_in_checklist"] for r in compared)
+        },
+        "mismatches": mismatches,
+        "only_in_svn": only_in_svn,
+        "results": results
+    }
+
+
+def compare_package(
+    svn_rows: Rows,
+    checklists: List[Tuple[str, str]],
+    sheet_name: str = "Test Scenario Remarks",
+    fuzzy_threshold: float = 0.85,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    include_raw: bool = False
+) -> Dict[str, Any]:
+    """
+    Compare many checklists against one SVN report, indexing the report once.
+    See compare_package_with_index for the arguments and the result.
+    """
+    if progress:
+        progress(0, len(checklists), "Indexing SVN report")
+    index = SvnIndex(svn_rows, fuzzy=True)
+    return compare_package_with_index(index, checklists, sheet_name, fuzzy_threshold, max_workers, progress, include_raw)
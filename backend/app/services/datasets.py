@@ -0,0 +1,90 @@
+"""
+Server-side SVN report datasets.
+
+Uploading a report returns a 100-row preview for the UI. The full parsed
+frame is kept here under a dataset_id (the SHA-256 of the report) so
+/compare-both can run against every row without the client sending the
+report back. In memory, entries expire after DATASET_TTL_SECONDS and the
+least recently used ones are dropped beyond DATASET_MAX_ENTRIES.
+
+The upload and the comparison may reach different server processes, or come
+hours apart, so every frame is also written to DATASET_DIR (a parse cache
+disk tier, LRU-bounded by DATASET_DISK_MAX_BYTES) where any process finds it.
+"""
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from app.core.config import DATASET_DIR, DATASET_DISK_MAX_BYTES, DATASET_MAX_ENTRIES, DATASET_TTL_SECONDS
+from app.services.parse_cache import ParseCache
+
+if TYPE_CHECKING:
+    # Annotations only; frames come in from the parsers
+    import pandas as pd
+
+DATASET_ID_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class DatasetStore:
+    def __init__(self, max_entries: int, ttl_seconds: float, disk: Optional[ParseCache] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = disk if disk is not None and disk.disk_dir is not None else None
+        self._entries: "OrderedDict[str, Tuple[float, pd.DataFrame]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, frame: "pd.DataFrame", dataset_id: str) -> str:
+        """Keep a frame under dataset_id (the SHA-256 of its report) and return the id."""
+        self._remember(dataset_id, frame)
+        if self.disk is not None:
+            self.disk.put(dataset_id, pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL))
+        return dataset_id
+
+    def get(self, dataset_id: str) -> Optional["pd.DataFrame"]:
+        """The frame for dataset_id, or None if it is unknown or expired."""
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            entry = self._entries.get(dataset_id)
+            if entry is not None:
+                # Using a dataset keeps it alive
+                self._entries[dataset_id] = (now, entry[1])
+                self._entries.move_to_end(dataset_id)
+                return entry[1]
+
+        # Ids come from clients and end up in a path
+        if self.disk is None or not DATASET_ID_PATTERN.fullmatch(dataset_id):
+            return None
+        blob = self.disk.get(dataset_id)
+        if blob is None:
+            return None
+        frame = pickle.loads(blob)
+        self._remember(dataset_id, frame)
+        return frame
+
+    def discard(self, dataset_id: str) -> None:
+        with self._lock:
+            self._entries.pop(dataset_id, None)
+
+    def _remember(self, dataset_id: str, frame: "pd.DataFrame") -> None:
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            self._entries[dataset_id] = (time.monotonic(), frame)
+            self._entries.move_to_end(dataset_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _evict_expired(self, now: float) -> None:
+        while self._entries:
+            dataset_id, (last_used, _) = next(iter(self._entries.items()))
+            if now - last_used < self.ttl_seconds:
+                break
+            del self._entries[dataset_id]
+
+
+svn_datasets = DatasetStore(
+    DATASET_MAX_ENTRIES, DATASET_TTL_SECONDS, ParseCache(0, DATASET_DIR, DATASET_DISK_MAX_BYTES)
+)
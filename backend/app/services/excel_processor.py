@@ -1,18 +1,39 @@
 import re
+import zipfile
 from typing import Dict, Optional, List
 from pathlib import Path
 from openpyxl import load_workbook
+from app.core.executors import batch_pools
+from app.core.metrics import timed
+from app.services.workbook_reader import read_sheet_hyperlinks
+from app.services.workbook_writer import rewrite_hyperlink_targets
+
+
+def replace_build_pattern(address: Optional[str], new_build_pattern: str) -> Optional[str]:
+    """
+    Swap the first _0<digits> build pattern of an address (every occurrence of it)
+    for new_build_pattern. Returns None when the address has no build pattern.
+    """
+    if not address:
+        return None
+    build_match = re.search(r'_0\d+', address)
+    if not build_match:
+        return None
+    return address.replace(build_match.group(0), new_build_pattern)
+
 
 class ExcelHyperlinkProcessor:
     """Process and update hyperlinks in Excel files with build numbers."""
     
+    REQUIRED_SHEETS = ['Test Case Remarks', 'Test Scenario Remarks']
+    
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.workbook = None
         self.hyperlinks_data = []
         
     def load_workbook(self):
-        """Load the Excel workbook."""
+        """Load the full (writable) Excel workbook."""
         try:
             self.workbook = load_workbook(self.file_path)
         except Exception as e:
@@ -22,56 +43,62 @@ class ExcelHyperlinkProcessor:
         """
         Extract hyperlinks from 'Test Case Remarks' and 'Test Scenario Remarks' sheets.
         Returns JSON with file names, addresses, and build numbers.
+        
+        Unless the workbook is already loaded (and possibly modified), the hyperlinks
+        are read straight from the .xlsx parts without building the cell model.
         """
-        if not self.workbook:
-            self.load_workbook()
+        if self.workbook:
+            sheet_links = self._hyperlinks_from_workbook()
+        else:
+            try:
+                sheet_links = read_sheet_hyperlinks(self.file_path, self.REQUIRED_SHEETS)
+            except Exception:
+                # Not a plain OOXML package; let openpyxl load it (or report why it can't)
+                self.load_workbook()
+                sheet_links = self._hyperlinks_from_workbook()
         
-        required_sheets = ['Test Case Remarks', 'Test Scenario Remarks']
         self.hyperlinks_data = []
         errors = []
         
-        for sheet_name in required_sheets:
-            if sheet_name not in self.workbook.sheetnames:
+        for sheet_name in self.REQUIRED_SHEETS:
+            if sheet_name not in sheet_links:
                 errors.append(f"Sheet '{sheet_name}' not found in the workbook")
                 continue
             
-            sheet = self.workbook[sheet_name]
-            
-            # Iterate through all cells to find hyperlinks
-            for row in sheet.iter_rows():
-                for cell in row:
-                    if cell.hyperlink:
-                        hyperlink_address = cell.hyperlink.target
-                        
-                        # Extract build number
-                        build_match = re.search(r'_0(\d+)', hyperlink_address)
-                        
-                        if build_match:
-                            build_number = build_match.group(1)  # Gets digits after _0
-                            
-                            # Extract file name from URL
-                            file_name = hyperlink_address.split('/')[-1] if '/' in hyperlink_address else hyperlink_address
-                            
-                            hyperlink_info = {
-                                'sheet_name': sheet_name,
-                                'cell_reference': cell.coordinate,
-                                'file_name': file_name,
-                                'file_address': hyperlink_address,
-                                'build': build_number,
-                                'full_build_pattern': f"_0{build_number}"
-                            }
-                            
-                            self.hyperlinks_data.append(hyperlink_info)
-                        else:
-                            # Check if there's a build pattern without leading zero
-                            invalid_build = re.search(r'_(\d+)(?!/)', hyperlink_address)
-                            if invalid_build and not invalid_build.group(0).startswith('_0'):
-                                errors.append({
-                                    'sheet': sheet_name,
-                                    'cell': cell.coordinate,
-                                    'address': hyperlink_address,
-                                    'error': f"Invalid build pattern found: {invalid_build.group(0)}. Build must have leading zero (e.g., _0212)"
-                                })
+            for coordinate, hyperlink_address in sheet_links[sheet_name].items():
+                if not hyperlink_address:
+                    # In-document link (no file address)
+                    continue
+                
+                # Extract build number
+                build_match = re.search(r'_0(\d+)', hyperlink_address)
+                
+                if build_match:
+                    build_number = build_match.group(1)  # Gets digits after _0
+                    
+                    # Extract file name from URL
+                    file_name = hyperlink_address.split('/')[-1] if '/' in hyperlink_address else hyperlink_address
+                    
+                    hyperlink_info = {
+                        'sheet_name': sheet_name,
+                        'cell_reference': coordinate,
+                        'file_name': file_name,
+                        'file_address': hyperlink_address,
+                        'build': build_number,
+                        'full_build_pattern': f"_0{build_number}"
+                    }
+                    
+                    self.hyperlinks_data.append(hyperlink_info)
+                else:
+                    # Check if there's a build pattern without leading zero
+                    invalid_build = re.search(r'_(\d+)(?!/)', hyperlink_address)
+                    if invalid_build and not invalid_build.group(0).startswith('_0'):
+                        errors.append({
+                            'sheet': sheet_name,
+                            'cell': coordinate,
+                            'address': hyperlink_address,
+                            'error': f"Invalid build pattern found: {invalid_build.group(0)}. Build must have leading zero (e.g., _0212)"
+                        })
         
         result = {
             'status': 'success' if not errors else 'partial_success',
@@ -82,10 +109,28 @@ class ExcelHyperlinkProcessor:
         
         return result
     
+    def _hyperlinks_from_workbook(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """Collect {sheet: {coordinate: target}} from the loaded workbook, in row-major order."""
+        sheet_links = {}
+        for sheet_name in self.REQUIRED_SHEETS:
+            if sheet_name not in self.workbook.sheetnames:
+                continue
+            sheet_links[sheet_name] = {
+                cell.coordinate: cell.hyperlink.target
+                for row in self.workbook[sheet_name].iter_rows()
+                for cell in row
+                if cell.hyperlink
+            }
+        return sheet_links
+    
     def update_build_numbers(self, new_build: str, output_file_path: Optional[str] = None) -> Dict:
         """
         Update all hyperlinks with new build number.
         
+        Unless the workbook is already loaded, the .xlsx package is copied entry by
+        entry and only the sheet .rels parts holding the hyperlink targets are
+        rewritten, so the rest of the file comes out byte-for-byte identical.
+        
         Args:
             new_build: New build number (e.g., '213')
             output_file_path: Path for the updated file. If None, generates automatically.
@@ -93,74 +138,177 @@ class ExcelHyperlinkProcessor:
         Returns:
             JSON with update status and details.
         """
-        if not self.workbook:
-            self.load_workbook()
-        
         # Ensure build number doesn't have leading underscore or zero
         new_build = new_build.lstrip('_0')
         new_build_pattern = f"_0{new_build}"
         
-        required_sheets = ['Test Case Remarks', 'Test Scenario Remarks']
-        updated_count = 0
-        update_details = []
+        # Output file path
+        if not output_file_path:
+            file_path = Path(self.file_path)
+            output_file_path = file_path.parent / f"{file_path.stem}_build_{new_build}{file_path.suffix}"
         
-        for sheet_name in required_sheets:
+        if not self.workbook:
+            try:
+                sheet_changes = self._rewrite_package(new_build_pattern, output_file_path)
+            except (zipfile.BadZipFile, KeyError):
+                # Not a plain OOXML package, go through openpyxl instead
+                sheet_changes = None
+            except Exception as e:
+                return self._update_result('error', f"Failed to save updated file: {str(e)}", new_build, [], None)
+            
+            if sheet_changes is not None:
+                update_details = self._update_details(sheet_changes, new_build)
+                return self._update_result(
+                    'success', f"Successfully updated {len(update_details)} hyperlinks",
+                    new_build, update_details, output_file_path
+                )
+            
+            self.load_workbook()
+        
+        sheet_changes = {}
+        for sheet_name in self.REQUIRED_SHEETS:
             if sheet_name not in self.workbook.sheetnames:
                 continue
             
             sheet = self.workbook[sheet_name]
+            sheet_changes[sheet_name] = {}
             
             for row in sheet.iter_rows():
                 for cell in row:
                     if cell.hyperlink:
                         old_address = cell.hyperlink.target
+                        new_address = replace_build_pattern(old_address, new_build_pattern)
                         
-                        # Find and replace build pattern
-                        build_match = re.search(r'_0\d+', old_address)
-                        
-                        if build_match:
-                            old_build_pattern = build_match.group(0)
-                            new_address = old_address.replace(old_build_pattern, new_build_pattern)
-                            
+                        if new_address is not None:
                             # Update the hyperlink
                             cell.hyperlink.target = new_address
-                            
-                            updated_count += 1
-                            update_details.append({
-                                'sheet': sheet_name,
-                                'cell': cell.coordinate,
-                                'old_address': old_address,
-                                'new_address': new_address,
-                                'old_build': old_build_pattern.lstrip('_0'),
-                                'new_build': new_build
-                            })
+                            sheet_changes[sheet_name][cell.coordinate] = (old_address, new_address)
         
-        # Save to new file
-        if not output_file_path:
-            file_path = Path(self.file_path)
-            output_file_path = file_path.parent / f"{file_path.stem}_build_{new_build}{file_path.suffix}"
+        update_details = self._update_details(sheet_changes, new_build)
         
+        # Save to new file
         try:
             self.workbook.save(output_file_path)
             status = 'success'
-            message = f"Successfully updated {updated_count} hyperlinks"
+            message = f"Successfully updated {len(update_details)} hyperlinks"
         except Exception as e:
             status = 'error'
             message = f"Failed to save updated file: {str(e)}"
             output_file_path = None
         
-        result = {
+        return self._update_result(status, message, new_build, update_details, output_file_path)
+    
+    def _rewrite_package(self, new_build_pattern: str, output_file_path) -> Dict[str, Dict[str, tuple]]:
+        """Rewrite hyperlink targets at the zip level; returns {sheet: {cell: (old, new)}}."""
+        return rewrite_hyperlink_targets(
+            self.file_path,
+            output_file_path,
+            self.REQUIRED_SHEETS,
+            lambda address: replace_build_pattern(address, new_build_pattern),
+        )
+    
+    def _update_details(self, sheet_changes: Dict[str, Dict[str, tuple]], new_build: str) -> List[Dict]:
+        update_details = []
+        for sheet_name in self.REQUIRED_SHEETS:
+            for coordinate, (old_address, new_address) in sheet_changes.get(sheet_name, {}).items():
+                old_build_pattern = re.search(r'_0\d+', old_address).group(0)
+                update_details.append({
+                    'sheet': sheet_name,
+                    'cell': coordinate,
+                    'old_address': old_address,
+                    'new_address': new_address,
+                    'old_build': old_build_pattern.lstrip('_0'),
+                    'new_build': new_build
+                })
+        return update_details
+    
+    def _update_result(self, status: str, message: str, new_build: str, update_details: List[Dict], output_file_path) -> Dict:
+        return {
             'status': status,
             'message': message,
             'new_build': new_build,
-            'updated_count': updated_count,
+            'updated_count': len(update_details),
             'output_file': str(output_file_path) if output_file_path else None,
             'updates': update_details
         }
-        
-        return result
     
     def close(self):
         """Close the workbook."""
         if self.workbook:
             self.workbook.close()
+
+
+@timed("hyperlinks.extract")
+def extract_hyperlinks_from_file(file_path: str) -> Dict:
+    """extract_hyperlinks for one workbook; module-level so it can run in a worker process."""
+    processor = ExcelHyperlinkProcessor(file_path)
+    try:
+        return processor.extract_hyperlinks()
+    finally:
+        processor.close()
+
+
+def extract_and_update_file(file_path: str, new_build: str, output_file_path: str) -> Dict:
+    """Extract hyperlinks, then update build numbers: two reads of the workbook, by one worker call."""
+    processor = ExcelHyperlinkProcessor(file_path)
+    try:
+        return {
+            'extraction': processor.extract_hyperlinks(),
+            'update': processor.update_build_numbers(new_build, output_file_path)
+        }
+    finally:
+        processor.close()
+
+
+@timed("hyperlinks.update")
+def update_build_numbers_for_file(file_path: str, new_build: str, output_file_path: str) -> Dict:
+    """
+    Update one workbook and never raise, so a single bad file doesn't sink a batch.
+    Module-level so it can run in a worker process.
+    """
+    processor = ExcelHyperlinkProcessor(file_path)
+    try:
+        return processor.update_build_numbers(new_build, output_file_path)
+    except Exception as e:
+        return {
+            'status': 'error',
+            'message': str(e),
+            'new_build': new_build.lstrip('_0'),
+            'updated_count': 0,
+            'output_file': None,
+            'updates': []
+        }
+    finally:
+        processor.close()
+
+
+def update_build_numbers_batch(
+    jobs: List[tuple],
+    new_build: str,
+    max_workers: Optional[int] = None
+) -> List[Dict]:
+    """
+    Update many workbooks in parallel across a process pool.
+    
+    Args:
+        jobs: (input_path, output_path) pairs
+        new_build: New build number (e.g., '213')
+        max_workers: Worker processes (None = one per CPU core)
+    
+    Returns:
+        update_build_numbers results, in the same order as jobs.
+    """
+    if not jobs:
+        return []
+    
+    workers = batch_pools.workers_for(len(jobs), max_workers)
+    if workers == 1:
+        return [update_build_numbers_for_file(src, new_build, dest) for src, dest in jobs]
+    
+    # Workers come from the server's shared batch budget (see app.core.executors)
+    pool = batch_pools.create(workers)
+    try:
+        futures = [pool.submit(update_build_numbers_for_file, src, new_build, dest) for src, dest in jobs]
+        return [future.result() for future in futures]
+    finally:
+        pool.shutdown(cancel_futures=True)
@@ -1,33 +1,26 @@
-import shutil
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable
 import pandas as pd
-import openpyxl
-from fastapi import UploadFile, HTTPException
+from openpyxl.utils import get_column_letter
+from fastapi import HTTPException
+from app.core.metrics import count_rows, timed
 from app.utils.common import cell_fill_rgb
+from app.services.workbook_reader import open_workbook_readonly, read_sheet_hyperlinks, SheetRows
+from app.services.parse_cache import cached_parse
 
-def save_upload_file(upload_file: UploadFile, dest: Path) -> None:
-    with dest.open("wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
-
-def extract_from_excel_file(path: Path, max_preview_rows: int = 100) -> Dict[str, Any]:
+@cached_parse
+@timed("parse.svn_report")
+def read_excel_frame(path: Path) -> pd.DataFrame:
     try:
         df = pd.read_excel(path)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to read excel file: {e}")
+    count_rows(len(df))
+    return df
 
-    headers = list(df.columns)
-    nrows = int(len(df))
-    preview_df = df.head(max_preview_rows).fillna("")
-    preview = preview_df.to_dict(orient="records")
-    sample_values = []
-    if headers:
-        first_col = headers[0]
-        sample_values = [str(x).strip() for x in df[first_col].dropna().astype(str).unique().tolist()]
-
-    return {"filename": path.name, "headers": headers, "nrows": nrows, "preview": preview, "sample_values": sample_values}
-
-def extract_from_csv_file(path: Path, max_preview_rows: int = 100) -> Dict[str, Any]:
+@cached_parse
+@timed("parse.svn_report")
+def read_csv_frame(path: Path) -> pd.DataFrame:
     df = None
     try:
         df = pd.read_csv(path, engine="python", sep=None)
@@ -43,7 +36,21 @@ def extract_from_csv_file(path: Path, max_preview_rows: int = 100) -> Dict[str,
 
     df = df.dropna(how="all")
     df = df[~(df.astype(str).apply(lambda x: "".join(x).strip(), axis=1) == "")]
+    count_rows(len(df))
+    return df
+
+def report_parser(path: Path) -> Callable[[Path], pd.DataFrame]:
+    """Parser for an SVN report: read_csv_frame for .csv, read_excel_frame for anything else."""
+    if path.suffix.lower() == ".csv":
+        return read_csv_frame
+    return read_excel_frame
+
+def read_report_frame(path: Path) -> pd.DataFrame:
+    """Parse an SVN report into a DataFrame."""
+    return report_parser(path)(path)
 
+def summarize_frame(df: pd.DataFrame, filename: str, max_preview_rows: int = 100) -> Dict[str, Any]:
+    """Headers, row count, first rows and first-column values of a parsed report, for the UI."""
     headers = list(df.columns)
     nrows = int(len(df))
     preview_df = df.head(max_preview_rows).fillna("")
@@ -53,8 +60,16 @@ def extract_from_csv_file(path: Path, max_preview_rows: int = 100) -> Dict[str,
         first_col = headers[0]
         sample_values = [str(x).strip() for x in df[first_col].dropna().astype(str).unique().tolist()]
 
-    return {"filename": path.name, "headers": headers, "nrows": nrows, "preview": preview, "sample_values": sample_values}
+    return {"filename": filename, "headers": headers, "nrows": nrows, "preview": preview, "sample_values": sample_values}
 
+def extract_from_excel_file(path: Path, max_preview_rows: int = 100) -> Dict[str, Any]:
+    return summarize_frame(read_excel_frame(path), path.name, max_preview_rows)
+
+def extract_from_csv_file(path: Path, max_preview_rows: int = 100) -> Dict[str, Any]:
+    return summarize_frame(read_csv_frame(path), path.name, max_preview_rows)
+
+@cached_parse
+@timed("parse.checklist")
 def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str = "Test Scenario Remarks") -> List[Dict[str, Any]]:
     """
     Enhanced extraction that:
@@ -68,24 +83,37 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
         raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
 
     try:
-        workbook = openpyxl.load_workbook(p, data_only=True)
+        workbook = open_workbook_readonly(p)
+        # Read-only worksheets don't expose cell.hyperlink, read the targets separately
+        hyperlinks = read_sheet_hyperlinks(p, [sheet_name, "Test Case Remarks"])
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to open workbook: {e}")
 
+    def hyperlink_target(sheet_title: str, row_idx: int, col_idx: int):
+        return hyperlinks.get(sheet_title, {}).get(f"{get_column_letter(col_idx)}{row_idx}")
+
+    try:
+        rows = _extract_hyperlinks_with_versions(workbook, sheet_name, hyperlink_target)
+    finally:
+        workbook.close()
+    count_rows(len(rows))
+    return rows
+
+def _extract_hyperlinks_with_versions(workbook, sheet_name: str, hyperlink_target) -> List[Dict[str, Any]]:
     # ========== PART 1: Extract from Test Scenario Remarks (PRIMARY) ==========
     test_scenario_results = {}  # Dict[normalized_filename, dict]
     
     if sheet_name in workbook.sheetnames:
-        sheet = workbook[sheet_name]
+        sheet = SheetRows(workbook[sheet_name])
         
         # Section 1: "REVIEWED AGAINST"
         doc_name_col = None
         doc_revision_col = None
         reviewed_against_header_row = None
 
-        for row_idx in range(1, min(21, sheet.max_row + 1)):
-            for col_idx in range(1, sheet.max_column + 1):
-                cell_value = sheet.cell(row_idx, col_idx).value
+        for row_idx, row in sheet.iter_rows(max_row=20):
+            for col_idx, cell in enumerate(row, start=1):
+                cell_value = cell.value
                 if cell_value:
                     cell_value_str = str(cell_value).strip().lower()
                     if cell_value_str == "document name":
@@ -97,7 +125,7 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
                 break
 
         if doc_name_col and doc_revision_col and reviewed_against_header_row:
-            for row_idx in range(reviewed_against_header_row + 1, min(reviewed_against_header_row + 5, sheet.max_row + 1)):
+            for row_idx, _ in sheet.iter_rows(min_row=reviewed_against_header_row + 1, max_row=reviewed_against_header_row + 4):
                 doc_name_cell = sheet.cell(row_idx, doc_name_col)
                 doc_revision_cell = sheet.cell(row_idx, doc_revision_col)
                 
@@ -105,12 +133,7 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
                 if not doc_name:
                     break
                 
-                hyperlink_url = None
-                if getattr(doc_name_cell, "hyperlink", None):
-                    try:
-                        hyperlink_url = doc_name_cell.hyperlink.target
-                    except Exception:
-                        pass
+                hyperlink_url = hyperlink_target(sheet.title, row_idx, doc_name_col)
                 
                 doc_name_str = str(doc_name).strip()
                 doc_revision_str = str(doc_revision_cell.value).strip() if doc_revision_cell.value else None
@@ -132,9 +155,9 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
         version_closed_col = None
         header_row = None
 
-        for row_idx in range(1, min(21, sheet.max_row + 1)):
-            for col_idx in range(1, sheet.max_column + 1):
-                cell_value = sheet.cell(row_idx, col_idx).value
+        for row_idx, row in sheet.iter_rows(max_row=20):
+            for col_idx, cell in enumerate(row, start=1):
+                cell_value = cell.value
                 if cell_value:
                     cell_value_str = str(cell_value).strip().lower()
                     if "filename" in cell_value_str:
@@ -146,7 +169,7 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
                 break
 
         if filename_col and version_closed_col and header_row:
-            for row_idx in range(header_row + 1, sheet.max_row + 1):
+            for row_idx, _ in sheet.iter_rows(min_row=header_row + 1):
                 filename_cell = sheet.cell(row_idx, filename_col)
                 version_cell = sheet.cell(row_idx, version_closed_col)
 
@@ -175,12 +198,7 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
                 if not filename:
                     continue
 
-                hyperlink_url = None
-                if getattr(filename_cell, "hyperlink", None):
-                    try:
-                        hyperlink_url = filename_cell.hyperlink.target
-                    except Exception:
-                        pass
+                hyperlink_url = hyperlink_target(sheet.title, row_idx, filename_col)
 
                 filename_str = str(filename).strip()
                 version_closed_str = str(version_cell.value).strip() if version_cell.value else None
@@ -200,16 +218,16 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
     test_case_results = {}  # Dict[normalized_filename, dict]
     
     if "Test Case Remarks" in workbook.sheetnames:
-        tc_sheet = workbook["Test Case Remarks"]
+        tc_sheet = SheetRows(workbook["Test Case Remarks"])
         
         # Find "ARTIFACT(S) UNDER REVIEW" section
         tc_filename_col = None
         tc_version_closed_col = None
         tc_header_row = None
 
-        for row_idx in range(1, min(21, tc_sheet.max_row + 1)):
-            for col_idx in range(1, tc_sheet.max_column + 1):
-                cell_value = tc_sheet.cell(row_idx, col_idx).value
+        for row_idx, row in tc_sheet.iter_rows(max_row=20):
+            for col_idx, cell in enumerate(row, start=1):
+                cell_value = cell.value
                 if cell_value:
                     cell_value_str = str(cell_value).strip().lower()
                     if "filename" in cell_value_str:
@@ -222,7 +240,7 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
 
         # Extract from ARTIFACT(S) UNDER REVIEW section
         if tc_filename_col and tc_version_closed_col and tc_header_row:
-            for row_idx in range(tc_header_row + 1, tc_sheet.max_row + 1):
+            for row_idx, _ in tc_sheet.iter_rows(min_row=tc_header_row + 1):
                 filename_cell = tc_sheet.cell(row_idx, tc_filename_col)
                 version_cell = tc_sheet.cell(row_idx, tc_version_closed_col)
 
@@ -251,12 +269,7 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
                 if not filename:
                     continue
 
-                hyperlink_url = None
-                if getattr(filename_cell, "hyperlink", None):
-                    try:
-                        hyperlink_url = filename_cell.hyperlink.target
-                    except Exception:
-                        pass
+                hyperlink_url = hyperlink_target(tc_sheet.title, row_idx, tc_filename_col)
 
                 filename_str = str(filename).strip()
                 version_closed_str = str(version_cell.value).strip() if version_cell.value else None
@@ -277,7 +290,7 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
         items_col = None
         items_header_row = None
         
-        for row_idx in range(1, min(30, tc_sheet.max_row + 1)):
+        for row_idx, _ in tc_sheet.iter_rows(max_row=29):
             cell_value = tc_sheet.cell(row_idx, 1).value  # Column A
             if cell_value:
                 cell_value_str = str(cell_value).strip().lower()
@@ -287,7 +300,7 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
                     break
         
         if items_header_row:
-            for row_idx in range(items_header_row + 1, tc_sheet.max_row + 1):
+            for row_idx, _ in tc_sheet.iter_rows(min_row=items_header_row + 1):
                 item_cell = tc_sheet.cell(row_idx, items_col)
                 
                 # Check for green background (end marker)
@@ -316,12 +329,7 @@ def extract_hyperlinks_with_versions_from_path(file_path: str, sheet_name: str =
                     continue
                 
                 # Check if cell has hyperlink
-                hyperlink_url = None
-                if getattr(item_cell, "hyperlink", None):
-                    try:
-                        hyperlink_url = item_cell.hyperlink.target
-                    except Exception:
-                        pass
+                hyperlink_url = hyperlink_target(tc_sheet.title, row_idx, items_col)
                 
                 # Only process if there's a hyperlink
                 if hyperlink_url:
@@ -0,0 +1,438 @@
+"""
+Incremental SVN vs checklist comparison.
+
+Re-running /compare-both after a checklist fix used to redo the whole
+comparison. An incremental run keeps what it computed under a run_id (a hash
+of its inputs):
+  - the indexed SVN report
+  - a fingerprint of the rows behind every normalized name, on both sides
+  - the exact-pass outcome of every name present on both sides
+  - the fuzzy-pass outcome of every fuzzy group: SVN and checklist names
+    linked by "could score above the threshold" (see SvnIndex), which the
+    fuzzy pass matches independently of each other
+A later run re-evaluates only the names whose rows changed and the fuzzy
+groups that contain them, and takes everything else over. Its result is the
+one compare_data gives, plus a delta section against the previous run.
+
+Runs are kept in memory for COMPARE_RUN_TTL_SECONDS, the most recently used
+COMPARE_RUN_MAX_ENTRIES of them.
+"""
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.config import COMPARE_RUN_MAX_ENTRIES, COMPARE_RUN_TTL_SECONDS
+from app.core.metrics import timed
+from app.services.comparator import (
+    ChecklistEntry,
+    Record,
+    Rows,
+    SvnEntry,
+    SvnIndex,
+    _char_counts,
+    _group_by_norm_name,
+    _match_exact_group,
+    _match_fuzzy,
+    _only_in_checklist_entry,
+    _only_in_svn_entry,
+    _shared_keys,
+    build_checklist_entries,
+)
+
+RESULT_SECTIONS = ("matches", "mismatches", "only_in_svn", "only_in_checklist")
+
+# Outcome of a pass over a group, independent of where the group's entries sit in the inputs:
+# ([(SVN entry index in the group, result entry, counts as a match)], indexes of the matched checklist entries)
+Outcome = Tuple[List[Tuple[int, Dict[str, Any], bool]], List[int]]
+
+
+def rows_digest(rows: Rows) -> str:
+    """Content hash of report or checklist rows (row dicts or a DataFrame)."""
+    return hashlib.sha256(pickle.dumps(rows, protocol=4)).hexdigest()
+
+
+def _svn_fingerprint(entry: SvnEntry) -> tuple:
+    return (
+        entry.filename_original, entry.last_changed_revision_raw, entry.last_changed_revision_int,
+        entry.last_changed_author, entry.last_changed_date
+    )
+
+
+def _checklist_fingerprint(entry: ChecklistEntry) -> tuple:
+    # The raw row, when kept, is part of only_in_checklist entries
+    return (
+        entry.filename_original, entry.version_closed_raw, entry.version_closed_int,
+        entry.inter_sheet_conflict, entry.conflict_comment, pickle.dumps(entry.raw, protocol=4)
+    )
+
+
+@dataclass
+class ComparisonRun:
+    run_id: str
+    svn_digest: str
+    fuzzy_threshold: float
+    index: SvnIndex
+    svn_groups: Dict[str, tuple]
+    checklist_groups: Dict[str, tuple]
+    # Per shared name: ((SVN fingerprints, checklist fingerprints), outcome)
+    exact: Dict[str, Tuple[tuple, Outcome]]
+    # Per fuzzy group signature: (outcome, names of the group)
+    fuzzy: Dict[tuple, Tuple[Outcome, Set[str]]]
+    result: Dict[str, Any]
+    # Groups re-evaluated and taken over by this run
+    evaluated: Dict[str, int]
+
+
+class ComparisonRunStore:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, ComparisonRun]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, run: ComparisonRun) -> None:
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            self._entries[run.run_id] = (time.monotonic(), run)
+            self._entries.move_to_end(run.run_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, run_id: str) -> Optional[ComparisonRun]:
+        """The run for run_id, or None if it is unknown or expired."""
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            entry = self._entries.get(run_id)
+            if entry is None:
+                return None
+            self._entries[run_id] = (now, entry[1])
+            self._entries.move_to_end(run_id)
+            return entry[1]
+
+    def latest_for_svn(self, svn_digest: str, fuzzy_threshold: float) -> Optional[ComparisonRun]:
+        """Most recent run on the same SVN report and threshold, to reuse its work."""
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            for _, run in reversed(self._entries.values()):
+                if run.svn_digest == svn_digest and run.fuzzy_threshold == fuzzy_threshold:
+                    return run
+        return None
+
+    def _evict_expired(self, now: float) -> None:
+        while self._entries:
+            run_id, (last_used, _) = next(iter(self._entries.items()))
+            if now - last_used < self.ttl_seconds:
+                break
+            del self._entries[run_id]
+
+
+comparison_runs = ComparisonRunStore(COMPARE_RUN_MAX_ENTRIES, COMPARE_RUN_TTL_SECONDS)
+
+
+def _fuzzy_groups(
+    index: SvnIndex,
+    unmatched_svn: List[int],
+    unmatched_checklist_entries: List[ChecklistEntry],
+    fuzzy_threshold: float
+) -> List[Tuple[List[int], List[ChecklistEntry]]]:
+    """
+    Split the fuzzy pass into independent groups of (SVN positions, checklist
+    entries), both in pass order. A name is only linked to names it could
+    score >= fuzzy_threshold against, so a best match never crosses groups.
+    Entries without any link can't be matched and are left out.
+    """
+    if not unmatched_svn or not unmatched_checklist_entries:
+        return []
+    if fuzzy_threshold <= 0:
+        return [(unmatched_svn, unmatched_checklist_entries)]
+
+    parent: Dict[tuple, tuple] = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    svn_names = list(dict.fromkeys(index.entries[pos].norm_name for pos in unmatched_svn))
+    checklist_keys = sorted({c.norm_name for c in unmatched_checklist_entries})
+    rows = {name: row for row, name in enumerate(index.names)}
+    name_chars = index.name_chars[[rows[name] for name in svn_names]]
+    name_lengths = name_chars.sum(axis=1)
+    keys = [key for key in checklist_keys if key]
+    for key, key_chars in zip(keys, _char_counts(keys)):
+        shared = np.minimum(name_chars, key_chars).sum(axis=1)
+        for i in np.flatnonzero(2.0 * shared / (name_lengths + len(key)) >= fuzzy_threshold):
+            parent[find(("svn", svn_names[i]))] = find(("checklist", key))
+    # Empty names only ever match each other
+    if "" in checklist_keys and "" in svn_names:
+        parent[find(("svn", ""))] = find(("checklist", ""))
+
+    groups: Dict[tuple, Tuple[List[int], List[ChecklistEntry]]] = {}
+    for pos in unmatched_svn:
+        node = ("svn", index.entries[pos].norm_name)
+        if node in parent:
+            groups.setdefault(find(node), ([], []))[0].append(pos)
+    for c in unmatched_checklist_entries:
+        node = ("checklist", c.norm_name)
+        if node in parent:
+            groups.setdefault(find(node), ([], []))[1].append(c)
+    return list(groups.values())
+
+
+def _relative(records: List[Record], svn_positions: List[int], c_entries: List[ChecklistEntry]) -> Outcome:
+    at = {pos: i for i, pos in enumerate(svn_positions)}
+    return (
+        [(at[pos], result, is_match) for pos, result, is_match in records],
+        [j for j, c in enumerate(c_entries) if c.matched]
+    )
+
+
+def _apply(outcome: Outcome, svn_positions: List[int], c_entries: List[ChecklistEntry], svn_matched: List[bool]) -> List[Record]:
+    records = []
+    for i, result, is_match in outcome[0]:
+        svn_matched[svn_positions[i]] = True
+        records.append((svn_positions[i], result, is_match))
+    for j in outcome[1]:
+        c_entries[j].matched = True
+    return records
+
+
+def _key_diff(before: Dict[str, tuple], after: Dict[str, tuple]) -> Dict[str, List[str]]:
+    return {
+        "added": [key for key in after if key not in before],
+        "removed": [key for key in before if key not in after],
+        "changed": [key for key in after if key in before and after[key] != before[key]]
+    }
+
+
+def _section_diff(before: List[Dict[str, Any]], after: List[Dict[str, Any]], keys: Optional[Set[str]]) -> Tuple[list, list]:
+    """(added, removed) entries of one result section, looking only at the given normalized names (None = all)."""
+    def counted(entries):
+        picked = [e for e in entries if keys is None or e["normalized_filename"] in keys]
+        return Counter(json.dumps(e, sort_keys=True, default=str) for e in picked), picked
+
+    before_counts, before_entries = counted(before)
+    after_counts, after_entries = counted(after)
+    added, removed = after_counts - before_counts, before_counts - after_counts
+
+    def take(entries, wanted):
+        picked = []
+        for e in entries:
+            text = json.dumps(e, sort_keys=True, default=str)
+            if wanted[text] > 0:
+                wanted[text] -= 1
+                picked.append(e)
+        return picked
+
+    return take(after_entries, added), take(before_entries, removed)
+
+
+def run_comparison(
+    svn_rows: Rows,
+    checklist_rows: Rows,
+    fuzzy_threshold: float = 0.85,
+    previous: Optional[ComparisonRun] = None,
+    reuse: Optional[ComparisonRun] = None,
+    svn_digest: Optional[str] = None,
+    include_raw: bool = False
+) -> Tuple[ComparisonRun, Optional[Dict[str, Any]]]:
+    """
+    Compare, taking over the work of reuse (or previous) where its inputs are unchanged.
+    Returns the new run and, when previous is given, the delta against it.
+    """
+    svn_digest = svn_digest or rows_digest(svn_rows)
+    run_id = hashlib.sha256(
+        f"{svn_digest}:{rows_digest(checklist_rows)}:{fuzzy_threshold!r}:{include_raw!r}".encode()
+    ).hexdigest()
+    reuse = reuse or previous
+    if reuse is not None and reuse.run_id == run_id:
+        # Same inputs: nothing to re-evaluate
+        run = replace(reuse, evaluated={
+            "exact_keys": 0, "reused_exact_keys": len(reuse.exact), "fuzzy_groups": 0, "reused_fuzzy_groups": len(reuse.fuzzy)
+        })
+    else:
+        run = _compare(run_id, svn_digest, svn_rows, checklist_rows, fuzzy_threshold, reuse, include_raw)
+    if previous is None:
+        return run, None
+    return run, _delta(previous, run)
+
+
+def _compare(
+    run_id: str,
+    svn_digest: str,
+    svn_rows: Rows,
+    checklist_rows: Rows,
+    fuzzy_threshold: float,
+    reuse: Optional[ComparisonRun],
+    include_raw: bool = False
+) -> ComparisonRun:
+    if reuse is not None and reuse.svn_digest == svn_digest:
+        index, svn_groups = reuse.index, reuse.svn_groups
+    else:
+        index = SvnIndex(svn_rows, fuzzy=True)
+        svn_groups = {
+            key: tuple(_svn_fingerprint(index.entries[pos]) for pos in positions)
+            for key, positions in index.by_name.items()
+        }
+    if reuse is not None and reuse.fuzzy_threshold != fuzzy_threshold:
+        # Outcomes depend on the threshold
+        reuse = None
+    checklist_map = _group_by_norm_name(build_checklist_entries(checklist_rows, include_raw))
+    checklist_groups = {key: tuple(_checklist_fingerprint(c) for c in entries) for key, entries in checklist_map.items()}
+
+    svn_matched = [False] * len(index.entries)
+    records: List[Record] = []
+    stats = Counter()
+
+    # First pass: exact normalized matches, per shared name
+    exact = {}
+    for key in _shared_keys(index, checklist_map):
+        positions, c_entries = index.by_name[key], checklist_map[key]
+        fingerprints = (svn_groups[key], checklist_groups[key])
+        known = reuse.exact.get(key) if reuse is not None else None
+        if known is not None and known[0] == fingerprints:
+            outcome = known[1]
+            records += _apply(outcome, positions, c_entries, svn_matched)
+            stats["reused_exact_keys"] += 1
+        else:
+            group_records = _match_exact_group(index.entries, key, positions, c_entries, svn_matched)
+            outcome = _relative(group_records, positions, c_entries)
+            records += group_records
+            stats["exact_keys"] += 1
+        exact[key] = (fingerprints, outcome)
+
+    # Second pass: fuzzy matching, per fuzzy group
+    unmatched_svn = index.unmatched(svn_matched)
+    unmatched_checklist_entries = [c for entries in checklist_map.values() for c in entries if not c.matched]
+    fuzzy = {}
+    fuzzy_records: Dict[int, Record] = {}
+    for positions, c_entries in _fuzzy_groups(index, unmatched_svn, unmatched_checklist_entries, fuzzy_threshold):
+        if not positions or not c_entries:
+            continue
+        signature = (
+            tuple(_svn_fingerprint(index.entries[pos]) for pos in positions),
+            tuple(_checklist_fingerprint(c) for c in c_entries)
+        )
+        known = reuse.fuzzy.get(signature) if reuse is not None else None
+        if known is not None:
+            outcome = known[0]
+            group_records = _apply(outcome, positions, c_entries, svn_matched)
+            stats["reused_fuzzy_groups"] += 1
+        else:
+            group_records = _match_fuzzy(index.entries, positions, c_entries, fuzzy_threshold, svn_matched)
+            outcome = _relative(group_records, positions, c_entries)
+            stats["fuzzy_groups"] += 1
+        names = {index.entries[pos].norm_name for pos in positions} | {c.norm_name for c in c_entries}
+        fuzzy[signature] = (outcome, names)
+        fuzzy_records.update((record[0], record) for record in group_records)
+
+    # Fuzzy matches are listed in the order of the pass, after the exact ones
+    records += [fuzzy_records[pos] for pos in unmatched_svn if pos in fuzzy_records]
+    matches = [result for _, result, is_match in records if is_match]
+    mismatches = [result for _, result, is_match in records if not is_match]
+    only_in_svn = [_only_in_svn_entry(index.entries[pos]) for pos in index.unmatched(svn_matched)]
+    only_in_checklist = [_only_in_checklist_entry(c) for entries in checklist_map.values() for c in entries if not c.matched]
+
+    result = {
+        "status": "ok",
+        "summary": {
+            "matches": len(matches),
+            "mismatches": len(mismatches),
+            "only_in_svn": len(only_in_svn),
+            "only_in_checklist": len(only_in_checklist)
+        },
+        "matches": matches,
+        "mismatches": mismatches,
+        "only_in_svn": only_in_svn,
+        "only_in_checklist": only_in_checklist
+    }
+    return ComparisonRun(
+        run_id=run_id,
+        svn_digest=svn_digest,
+        fuzzy_threshold=fuzzy_threshold,
+        index=index,
+        svn_groups=svn_groups,
+        checklist_groups=checklist_groups,
+        exact=exact,
+        fuzzy=fuzzy,
+        result=result,
+        evaluated={
+            "exact_keys": stats["exact_keys"],
+            "reused_exact_keys": stats["reused_exact_keys"],
+            "fuzzy_groups": stats["fuzzy_groups"],
+            "reused_fuzzy_groups": stats["reused_fuzzy_groups"]
+        }
+    )
+
+
+def _delta(previous: ComparisonRun, run: ComparisonRun) -> Dict[str, Any]:
+    """What changed in the inputs and in the result since previous."""
+    svn_keys = _key_diff(previous.svn_groups, run.svn_groups)
+    checklist_keys = _key_diff(previous.checklist_groups, run.checklist_groups)
+
+    if previous.fuzzy_threshold != run.fuzzy_threshold:
+        touched = None
+    else:
+        # Names whose entries may sit differently in the result: changed rows, and every
+        # group (exact or fuzzy) that one of the two runs had and the other did not
+        touched = set()
+        for diff in (svn_keys, checklist_keys):
+            for keys in diff.values():
+                touched.update(keys)
+        touched.update(key for key, known in previous.exact.items() if run.exact.get(key) != known)
+        touched.update(key for key, known in run.exact.items() if previous.exact.get(key) != known)
+        for signature, (_, names) in previous.fuzzy.items():
+            if signature not in run.fuzzy:
+                touched.update(names)
+        for signature, (_, names) in run.fuzzy.items():
+            if signature not in previous.fuzzy:
+                touched.update(names)
+
+    added, removed = {}, {}
+    for section in RESULT_SECTIONS:
+        added[section], removed[section] = _section_diff(previous.result[section], run.result[section], touched)
+    return {
+        "previous_run_id": previous.run_id,
+        "svn": svn_keys,
+        "checklist": checklist_keys,
+        "summary": {
+            section: run.result["summary"][section] - previous.result["summary"][section]
+            for section in RESULT_SECTIONS
+        },
+        "added": added,
+        "removed": removed
+    }
+
+
+@timed("compare.incremental")
+def compare_incremental(
+    svn_rows: Rows,
+    checklist_rows: Rows,
+    fuzzy_threshold: float = 0.85,
+    previous_run_id: Optional[str] = None,
+    include_raw: bool = False
+) -> Dict[str, Any]:
+    """
+    compare_data, reusing earlier runs on the same SVN report.
+
+    Returns the compare_data result plus run_id (pass it as previous_run_id
+    next time), evaluated (groups re-evaluated vs taken over) and delta: the
+    changes since previous_run_id, or None when no previous run was given or
+    it has expired.
+    """
+    svn_digest = rows_digest(svn_rows)
+    previous = comparison_runs.get(previous_run_id) if previous_run_id else None
+    reuse = previous or comparison_runs.latest_for_svn(svn_digest, fuzzy_threshold)
+    run, delta = run_comparison(svn_rows, checklist_rows, fuzzy_threshold, previous, reuse, svn_digest, include_raw)
+    comparison_runs.put(run)
+    return {**run.result, "run_id": run.run_id, "evaluated": run.evaluated, "delta": delta}
@@ -0,0 +1,299 @@
+"""
+Background jobs for long validations.
+
+Submitting returns a job ID right away; the service function then runs on the
+CPU worker pool (batches: on an I/O thread, from which they start their own
+process pool) while clients poll /api/jobs/{id} for status and progress.
+
+Worker processes can't touch the job table, so each running job gets a small
+directory under JOB_DIR: the worker writes progress.json there (throttled)
+and checks for a "cancel" file at every progress call, which is how a running
+job is cancelled. Finished jobs are kept for JOB_RESULT_TTL_SECONDS, in memory
+or, when JOB_DB_PATH is set, in a SQLite table that survives restarts and is
+shared by all server processes (required when running more than one).
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import JOB_DB_PATH, JOB_DIR, JOB_MAX_CONCURRENT, JOB_RESULT_TTL_SECONDS
+from app.core.executors import WorkerPool, cpu_pool
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Minimum time between two progress.json writes
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when a cancel was requested."""
+
+
+class ProgressReporter:
+    """
+    progress(done, total, stage) callback handed to the service function.
+    Runs in the worker: writes progress.json and raises JobCancelled once the
+    job's cancel file exists.
+    """
+
+    def __init__(self, job_dir: str):
+        self.progress_path = os.path.join(job_dir, "progress.json")
+        self.cancel_path = os.path.join(job_dir, "cancel")
+        self._last_write = 0.0
+
+    def __call__(self, done: int, total: int, stage: str) -> None:
+        now = time.monotonic()
+        if done < total and now - self._last_write < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_write = now
+        if os.path.exists(self.cancel_path):
+            raise JobCancelled()
+        tmp_path = f"{self.progress_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": done, "total": total, "stage": stage}, f)
+        os.replace(tmp_path, self.progress_path)
+
+
+def _run_job(func: Callable, job_dir: str, args: tuple, kwargs: dict) -> Any:
+    """Worker entry point: call func with a progress reporter for job_dir."""
+    reporter = ProgressReporter(job_dir)
+    if os.path.exists(reporter.cancel_path):
+        raise JobCancelled()
+    return func(*args, progress=reporter, **kwargs)
+
+
+def _start_time(pid: int) -> Optional[str]:
+    """When pid started (clock ticks since boot, from /proc), so a reused pid isn't taken for the old process."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+def process_owner() -> List[Any]:
+    """[pid, start time] of the current process, stored with each job it runs."""
+    return [os.getpid(), _start_time(os.getpid())]
+
+
+def _owner_alive(owner: Optional[List[Any]]) -> bool:
+    if not owner:
+        return False
+    pid, started = owner
+    if pid == os.getpid():
+        return started == _start_time(pid)
+    if started is not None:
+        return _start_time(pid) == started
+    if os.name == "nt":
+        # os.kill would terminate it; the desktop app runs a single server process
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    """
+    Job records by ID, in memory and optionally in SQLite.
+
+    Without a database the table belongs to one process, so a server with
+    several worker processes needs db_path: every process then reads the jobs
+    of the others from SQLite. A job left unfinished by a process that has
+    exited is marked failed when it is read.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _write(self, job: Dict[str, Any]) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, updated_at) VALUES (?, ?, ?)",
+                (job["id"], json.dumps(job, default=str), time.time()),
+            )
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = json.loads(row[0])
+        if job["status"] not in FINISHED_STATES and not _owner_alive(job.get("owner")):
+            # The process that ran it is gone
+            job.update(status=FAILED, error="Interrupted by a server restart", finished_at=time.time())
+            self._write(job)
+        return job
+
+    def save(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = job
+            if self._db is not None:
+                self._write(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job; with a database, one run by another process is read from there."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None and self._db is not None:
+                job = self._read(job_id)
+            return job
+
+    def purge(self, finished_before: float) -> None:
+        """Drop jobs that finished before the given time."""
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job["finished_at"] is not None and job["finished_at"] < finished_before]:
+                del self._jobs[job_id]
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "DELETE FROM jobs WHERE json_extract(data, '$.finished_at') < ?", (finished_before,)
+                    )
+
+
+class JobManager:
+    def __init__(self, store: JobStore, ttl_seconds: float, max_concurrent: int, job_dir: Path):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.job_dir = job_dir
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _dir_for(self, job_id: str) -> Path:
+        return self.job_dir / job_id
+
+    def submit(
+        self, kind: str, func: Callable, *args, cleanup: Iterable[Path] = (), notice: Optional[Dict[str, Any]] = None,
+        pool: WorkerPool = cpu_pool, **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Queue func(*args, progress=..., **kwargs) on the CPU pool and return the job.
+        Paths (files or directories) in cleanup are deleted once the job is over, whatever its outcome.
+        notice holds fields added to a dict result (e.g. a warning about the inputs); polling shows it right away.
+        Batches that start their own process pool pass pool=io_pool, so they run in this process.
+        """
+        self.purge_expired()
+        job_id = uuid.uuid4().hex
+        self._dir_for(job_id).mkdir(parents=True, exist_ok=True)
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "status": QUEUED,
+            "progress": None,
+            "error": None,
+            "result": None,
+            "created_at": time.time(),
+            "finished_at": None,
+            "owner": process_owner(),
+        }
+        if notice:
+            job["notice"] = notice
+        self.store.save(job)
+        task = asyncio.get_running_loop().create_task(self._run(job, pool, func, args, kwargs, list(cleanup)))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job
+
+    async def _run(
+        self, job: Dict[str, Any], pool: WorkerPool, func: Callable, args: tuple, kwargs: dict, cleanup: List[Path]
+    ) -> None:
+        job_dir = self._dir_for(job["id"])
+        try:
+            async with self._slots:
+                if (job_dir / "cancel").exists():
+                    raise JobCancelled()
+                job["status"] = RUNNING
+                job["started_at"] = time.time()
+                self.store.save(job)
+                job["result"] = await pool.run(_run_job, func, str(job_dir), args, kwargs)
+                job["status"] = SUCCEEDED
+        except (JobCancelled, asyncio.CancelledError):
+            job["status"] = CANCELLED
+        except HTTPException as e:
+            job.update(status=FAILED, error=e.detail, status_code=e.status_code)
+        except Exception as e:
+            logger.exception(f"Job {job['id']} ({job['kind']}) failed")
+            job.update(status=FAILED, error=str(e))
+        finally:
+            job["progress"] = self._read_progress(job["id"]) or job["progress"]
+            job["finished_at"] = time.time()
+            self.store.save(job)
+            shutil.rmtree(job_dir, ignore_errors=True)
+            for path in cleanup:
+                try:
+                    if Path(path).is_dir():
+                        shutil.rmtree(path)
+                    else:
+                        Path(path).unlink()
+                except Exception:
+                    pass
+
+    def _read_progress(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._dir_for(job_id) / "progress.json", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self.purge_expired()
+        job = self.store.get(job_id)
+        if job is not None and job["status"] == RUNNING:
+            job["progress"] = self._read_progress(job_id) or job["progress"]
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Ask a job to stop; queued jobs stop at once, running ones at their next progress call."""
+        job = self.get(job_id)
+        if job is None or job["status"] in FINISHED_STATES:
+            return job
+        job_dir = self._dir_for(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / "cancel").touch()
+        if job["status"] == QUEUED and job_id in self._tasks:
+            self._tasks[job_id].cancel()
+        return job
+
+    def purge_expired(self) -> None:
+        self.store.purge(time.time() - self.ttl_seconds)
+
+
+def job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """A job without its result and owning process, for polling."""
+    return {key: value for key, value in job.items() if key not in ("result", "owner")}
+
+
+jobs = JobManager(
+    JobStore(JOB_DB_PATH),
+    JOB_RESULT_TTL_SECONDS,
+    JOB_MAX_CONCURRENT or cpu_pool.max_workers,
+    JOB_DIR,
+)
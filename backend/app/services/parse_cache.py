@@ -0,0 +1,253 @@
+"""
+Content-addressed cache of parse results.
+
+The same SVN report and checklist get uploaded again and again across
+/upload-excel, /upload-review-checklist, /upload-both and /compare-both.
+Results are keyed by the SHA-256 of the file bytes plus the parser and its
+arguments, so a re-upload under any name skips pandas/openpyxl entirely.
+
+Entries are stored pickled: hits always return a fresh copy (callers are
+free to mutate what they get) and the stored size is exact. The memory tier
+is LRU-bounded by PARSE_CACHE_MAX_BYTES; the optional disk tier under
+PARSE_CACHE_DIR is bounded by PARSE_CACHE_DISK_MAX_BYTES and only ever holds
+files written by this process.
+
+Unpickling runs code, and PARSE_CACHE_DIR sits in the shared temp directory
+by default: the disk tier is only used when its directory belongs to this
+user (it is created with mode 0700), and only files owned by this user are
+read back.
+"""
+import functools
+import hashlib
+import importlib
+import inspect
+import logging
+import os
+import pickle
+import stat
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from app.core.config import PARSE_CACHE_DIR, PARSE_CACHE_DISK_MAX_BYTES, PARSE_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+# Digests already known for a file version: {(path, size, mtime_ns): sha256 hex}
+_known_digests: "OrderedDict[tuple, str]" = OrderedDict()
+_KNOWN_DIGESTS_MAX = 256
+_known_digests_lock = threading.Lock()
+
+
+def owned_by_user(st: os.stat_result) -> bool:
+    # No uids on Windows, where the temp directory is per user anyway
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+def make_private_dir(path: Path) -> bool:
+    """Create path for this user only; False when it exists as a link or someone else's directory."""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or not owned_by_user(st):
+        return False
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return True
+
+
+def _file_version(path: Union[str, Path]) -> tuple:
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def record_file_sha256(path: Union[str, Path], digest: str) -> None:
+    """Remember a digest computed elsewhere (e.g. while the upload was written)."""
+    version = _file_version(path)
+    with _known_digests_lock:
+        _known_digests[version] = digest
+        while len(_known_digests) > _KNOWN_DIGESTS_MAX:
+            _known_digests.popitem(last=False)
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    version = _file_version(path)
+    with _known_digests_lock:
+        if version in _known_digests:
+            return _known_digests[version]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    record_file_sha256(path, digest.hexdigest())
+    return digest.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, max_bytes: int, disk_dir: Optional[Path] = None, disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir if disk_max_bytes > 0 else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if self.disk_dir is not None and not make_private_dir(self.disk_dir):
+            logger.warning(f"Parse cache directory {self.disk_dir} is not owned by this user; disk tier disabled")
+            self.disk_dir = None
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Pickled result for key, or None on a miss."""
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                return blob
+
+        if self.disk_dir is None:
+            return None
+        path = self.disk_dir / f"{key}.pkl"
+        try:
+            with open(path, "rb") as f:
+                if not owned_by_user(os.fstat(f.fileno())):
+                    logger.warning(f"Ignoring parse cache entry {path} not owned by this user")
+                    return None
+                blob = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        self._remember(key, blob)
+        return blob
+
+    def put(self, key: str, blob: bytes) -> None:
+        self._remember(key, blob)
+        if self.disk_dir is not None and len(blob) <= self.disk_max_bytes:
+            self._write_disk(key, blob)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = blob
+            self._size += len(blob)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _write_disk(self, key: str, blob: bytes) -> None:
+        path = self.disk_dir / f"{key}.pkl"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(blob)
+            os.replace(tmp_path, path)
+            self._trim_disk()
+        except OSError as e:
+            logger.warning(f"Could not write parse cache entry {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _trim_disk(self) -> None:
+        """Drop the least recently used files until the tier fits its budget."""
+        files = []
+        for path in self.disk_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda item: item[0]):
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+parse_cache = ParseCache(PARSE_CACHE_MAX_BYTES, PARSE_CACHE_DIR, PARSE_CACHE_DISK_MAX_BYTES)
+
+
+# Undecorated parsers by "module:qualname", so worker processes can run them
+_parsers: Dict[str, Callable] = {}
+
+
+def _call_parser(name: str, *args, **kwargs) -> Any:
+    """Run a parser without the cache; a picklable entry point for worker processes."""
+    if name not in _parsers:
+        importlib.import_module(name.split(":", 1)[0])
+    return _parsers[name](*args, **kwargs)
+
+
+def cached_parse(func: Callable) -> Callable:
+    """
+    Cache a parser whose first argument is a file path.
+
+    The key covers the file content, the parser and all of its other
+    arguments (defaults included), so the same file parsed with another
+    sheet_name is a separate entry. Exceptions are not cached.
+    """
+    signature = inspect.signature(func)
+    path_param = next(iter(signature.parameters))
+    name = f"{func.__module__}:{func.__qualname__}"
+    _parsers[name] = func
+
+    def cache_key(path, *args, **kwargs) -> Optional[str]:
+        """Key for this call, or None when caching is off or the file can't be read."""
+        if parse_cache.max_bytes <= 0 and parse_cache.disk_dir is None:
+            return None
+        try:
+            content_hash = file_sha256(path)
+        except OSError:
+            # Let the parser report the missing/unreadable file its own way
+            return None
+        bound = signature.bind(path, *args, **kwargs)
+        bound.apply_defaults()
+        params = {k: v for k, v in bound.arguments.items() if k != path_param}
+        return hashlib.sha256(f"{name}\0{content_hash}\0{params!r}".encode("utf-8")).hexdigest()
+
+    @functools.wraps(func)
+    def wrapper(path, *args, **kwargs):
+        key = cache_key(path, *args, **kwargs)
+        if key is not None:
+            blob = parse_cache.get(key)
+            if blob is not None:
+                return pickle.loads(blob)
+
+        result = func(path, *args, **kwargs)
+        if key is not None:
+            parse_cache.put(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        return result
+
+    wrapper.cache_key = cache_key
+    wrapper.parser_name = name
+    return wrapper
+
+
+async def run_cached(run: Callable[..., Awaitable], parser: Callable, path, *args, **kwargs) -> Any:
+    """
+    Call a @cached_parse parser through an executor (e.g. run_cpu).
+
+    The cache is checked and filled in this process, so a worker process is
+    only used on a miss and its result is visible to later requests.
+    """
+    key = parser.cache_key(path, *args, **kwargs)
+    if key is not None:
+        blob = parse_cache.get(key)
+        if blob is not None:
+            return pickle.loads(blob)
+
+    result = await run(_call_parser, parser.parser_name, path, *args, **kwargs)
+    if key is not None:
+        parse_cache.put(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+    return result
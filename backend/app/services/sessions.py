@@ -0,0 +1,229 @@
+"""
+Workbook sessions.
+
+A review often runs several analyses on one checklist: hyperlink extraction,
+a build update, the versions extraction used by compare, traceability. A
+session keeps the uploaded workbook on the server under a session ID and
+memoizes each analysis result, so the file is uploaded once and every
+analysis parses it at most once.
+
+Each session is a directory under SESSION_DIR, so every server process sees
+it: the workbook (a link to the stored upload), session.json whose mtime is
+the last use, one pickle per analysis result and an "active-*" marker per
+analysis in progress.
+
+Sessions idle for SESSION_IDLE_SECONDS are closed, and the least recently
+used ones are closed while the total footprint (workbook size plus stored
+results) is above SESSION_MAX_BYTES. Sessions with an analysis in progress
+are never evicted.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import SESSION_DIR, SESSION_IDLE_SECONDS, SESSION_MAX_BYTES
+from app.core.executors import run_io
+from app.services.parse_cache import make_private_dir, owned_by_user
+from app.services.uploads import StoredUpload, upload_store
+
+SESSION_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+META_NAME = "session.json"
+
+
+class WorkbookSession:
+    def __init__(self, directory: Path, meta: Dict[str, Any]):
+        self.id = directory.name
+        self.dir = directory
+        self.meta = meta
+
+    @property
+    def path(self) -> Path:
+        return self.dir / f"workbook{Path(self.filename).suffix.lower()}"
+
+    @property
+    def filename(self) -> str:
+        return self.meta["filename"]
+
+    def _result_path(self, key: tuple) -> Path:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+        return self.dir / f"{key[0]}-{digest}.pkl"
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            "filename": self.filename,
+            "size": self.meta["size"],
+            "sha256": self.meta["sha256"],
+            "created_at": self.meta["created_at"],
+            "cached_analyses": sorted({path.name.rsplit("-", 1)[0] for path in self.dir.glob("*.pkl")}),
+        }
+
+
+def _dir_state(directory: Path, active_seconds: float) -> Optional[tuple]:
+    """(last used, footprint in bytes, has an analysis in progress) of a session directory."""
+    try:
+        last_used = directory.stat().st_mtime
+        size = 0
+        active = False
+        for entry in os.scandir(directory):
+            st = entry.stat()
+            if entry.name == META_NAME:
+                last_used = st.st_mtime
+            elif entry.name.startswith("active-"):
+                # Markers older than the idle time were left behind by a process that died
+                active = active or time.time() - st.st_mtime < active_seconds
+            elif not entry.name.endswith(".tmp"):
+                size += st.st_size
+    except OSError:
+        return None
+    return last_used, size, active
+
+
+def _load_result(path: Path) -> Optional[tuple]:
+    """(result,) stored at path, or None when there is none yet."""
+    try:
+        with open(path, "rb") as f:
+            if owned_by_user(os.fstat(f.fileno())):
+                return (pickle.loads(f.read()),)
+    except OSError:
+        pass
+    return None
+
+
+def _store_result(path: Path, result: Any) -> None:
+    tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    try:
+        tmp_path.write_bytes(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(tmp_path, path)
+    except OSError:
+        # Closed meanwhile: the result is still returned, just not kept
+        tmp_path.unlink(missing_ok=True)
+
+
+class SessionManager:
+    def __init__(self, root: Path, idle_seconds: float, max_bytes: int):
+        self.root = root
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+
+    def _dir_for(self, session_id: str) -> Optional[Path]:
+        if not SESSION_ID_PATTERN.fullmatch(session_id):
+            return None
+        return self.root / session_id
+
+    def create(self, stored: StoredUpload) -> WorkbookSession:
+        """Open a session that takes over the stored upload (released once the session has its own link)."""
+        try:
+            if not make_private_dir(self.root):
+                raise HTTPException(status_code=500, detail="Session directory is not owned by this server")
+            directory = self.root / uuid.uuid4().hex
+            directory.mkdir(mode=0o700)
+            meta = {
+                "filename": stored.filename,
+                "size": stored.size,
+                "sha256": stored.sha256,
+                "created_at": time.time(),
+            }
+            session = WorkbookSession(directory, meta)
+            try:
+                os.link(stored.path, session.path)
+            except OSError:
+                shutil.copyfile(stored.path, session.path)
+            # Written last: a directory without it is an unfinished session
+            tmp_path = directory / f"{META_NAME}.tmp"
+            tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp_path, directory / META_NAME)
+        finally:
+            upload_store.release(stored)
+        self.evict()
+        return session
+
+    def get(self, session_id: str) -> Optional[WorkbookSession]:
+        self.evict()
+        directory = self._dir_for(session_id)
+        if directory is None:
+            return None
+        meta_path = directory / META_NAME
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        return WorkbookSession(directory, meta)
+
+    def close(self, session_id: str) -> bool:
+        directory = self._dir_for(session_id)
+        if directory is None or not (directory / META_NAME).exists():
+            return False
+        shutil.rmtree(directory, ignore_errors=True)
+        return True
+
+    def evict(self) -> None:
+        """Close idle sessions, then the least recently used ones above the size cap."""
+        try:
+            directories = [Path(entry.path) for entry in os.scandir(self.root) if entry.is_dir()]
+        except OSError:
+            return
+        now = time.time()
+        candidates: List[tuple] = []
+        total = 0
+        for directory in directories:
+            state = _dir_state(directory, self.idle_seconds)
+            if state is None:
+                continue
+            last_used, size, active = state
+            if active:
+                total += size
+            elif now - last_used > self.idle_seconds:
+                shutil.rmtree(directory, ignore_errors=True)
+            else:
+                candidates.append((last_used, size, directory))
+                total += size
+        for _, size, directory in sorted(candidates, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+
+    async def run(self, session: WorkbookSession, compute: Callable[[], Awaitable]) -> Any:
+        """Await compute() while keeping the session from being evicted."""
+        marker = session.dir / f"active-{uuid.uuid4().hex}"
+        try:
+            marker.touch()
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Session not found or expired; upload the workbook again")
+        try:
+            return await compute()
+        finally:
+            marker.unlink(missing_ok=True)
+            try:
+                os.utime(session.dir / META_NAME)
+            except OSError:
+                pass
+
+    async def analyze(self, session: WorkbookSession, key: tuple, compute: Callable[[], Awaitable]) -> Any:
+        """
+        Result of the analysis identified by key (name and arguments) for this
+        session's workbook; compute() only runs the first time.
+        """
+        path = session._result_path(key)
+        cached = await run_io(_load_result, path)
+        if cached is not None:
+            return cached[0]
+
+        result = await self.run(session, compute)
+        await run_io(_store_result, path, result)
+        await run_io(self.evict)
+        return result
+
+
+sessions = SessionManager(SESSION_DIR, SESSION_IDLE_SECONDS, SESSION_MAX_BYTES)
@@ -1,7 +1,54 @@
-import openpyxl
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from typing import Callable, List, Dict, Optional, Iterable, Tuple
 import re
 from fastapi import HTTPException
+from app.core.metrics import count_rows, timed
+from app.utils.common import MultiPatternMatcher
+from app.services.workbook_reader import open_workbook_readonly, iter_sheet_rows
+
+# Headers are only searched for in the first rows of a sheet
+HEADER_SCAN_ROWS = 20
+
+# Case-insensitive match for "#Note" or "# Note"
+RE_NOTE_MARKER = re.compile(r'#\s*note', re.IGNORECASE)
+
+# progress(done, total, stage), called as work advances (used by the job API)
+ProgressCallback = Callable[[int, int, str], None]
+
+
+@dataclass
+class SheetMetadata:
+    """
+    Per-sheet facts gathered in the same pass that loads the sheet, so the
+    validator never has to rescan a sheet to answer note/header questions.
+    """
+    name: str
+    max_row: int = 0
+    last_note_row: Optional[int] = None
+    # {header text: (row, column)} for cells in the first HEADER_SCAN_ROWS rows,
+    # last occurrence wins
+    header_positions: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    def observe_row(self, row_idx: int, cell_values: Iterable[Tuple[int, str]]) -> None:
+        """Record one row given its non-empty (column, stripped text) pairs."""
+        self.max_row = row_idx
+        note_found = False
+        for col_idx, cell_value in cell_values:
+            if row_idx <= HEADER_SCAN_ROWS:
+                self.header_positions[cell_value] = (row_idx, col_idx)
+            if not note_found and '#' in cell_value and RE_NOTE_MARKER.search(cell_value):
+                self.last_note_row = row_idx
+                note_found = True
+
+
+def _row_texts(row) -> List[Tuple[int, str]]:
+    """Non-empty (column, stripped text) pairs of a row of cell values."""
+    texts = []
+    for col_idx, value in enumerate(row, start=1):
+        cell_value = str(value).strip() if value else ""
+        if cell_value:
+            texts.append((col_idx, cell_value))
+    return texts
 
 
 def find_last_note_row_index(sheet) -> Optional[int]:
@@ -14,29 +61,71 @@ def find_last_note_row_index(sheet) -> Optional[int]:
     Returns:
         Row index (1-indexed) of the last #Note marker, or None if not found
     """
-    last_note_row = None
-    for row_idx, row in enumerate(sheet.iter_rows(), start=1):
-        for cell in row:
-            cell_value = str(cell.value).strip() if cell.value else ""
-            # Case-insensitive match for "#Note" or "# Note"
-            if re.search(r'#\s*note', cell_value, re.IGNORECASE):
-                last_note_row = row_idx
-                break
-    return last_note_row
+    metadata = SheetMetadata(name=sheet.title)
+    for row_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+        metadata.observe_row(row_idx, _row_texts(row))
+    return metadata.last_note_row
+
+
+def build_requirement_index(
+    wb, req_ids: Iterable[str], progress: Optional[ProgressCallback] = None
+) -> Tuple[Dict[str, Dict[str, List[int]]], Dict[str, SheetMetadata]]:
+    """
+    Walk every sheet except General once, recording where each requirement ID
+    occurs together with the sheet's metadata (max row, last #Note row, headers).
+    
+    A requirement counts as found in a row when it is a substring of any cell in
+    that row, which is the same rule as checking `req_id in cell_value` per cell.
+    
+    Args:
+        wb: openpyxl workbook (read-only workbooks are streamed)
+        req_ids: Requirement IDs to look up
+        progress: Optional callback, called after each sheet with (sheets done, total sheets, stage)
+        
+    Returns:
+        Tuple of ({req_id: {sheet_name: [row_indices]}}, {sheet_name: SheetMetadata}),
+        with sheets in workbook order and rows in ascending order
+    """
+    matcher = MultiPatternMatcher(req_ids)
+    index: Dict[str, Dict[str, List[int]]] = {}
+    sheets: Dict[str, SheetMetadata] = {}
+    sheet_names = [name for name in wb.sheetnames if name != "General"]
+    
+    for sheet_number, sheet_name in enumerate(sheet_names, start=1):
+        metadata = SheetMetadata(name=sheet_name)
+        sheets[sheet_name] = metadata
+        
+        for row_idx, row in enumerate(iter_sheet_rows(wb[sheet_name], values_only=True), start=1):
+            texts = _row_texts(row)
+            metadata.observe_row(row_idx, texts)
+            
+            row_hits = set()
+            for _, cell_value in texts:
+                row_hits.update(matcher.find_all(cell_value))
+            for req_id in row_hits:
+                index.setdefault(req_id, {}).setdefault(sheet_name, []).append(row_idx)
+        
+        if progress:
+            progress(sheet_number, len(sheet_names), "Indexing TC sheets")
+    
+    return index, sheets
 
 
-def validate_tc_traceability(file_path: str) -> Dict:
+@timed("traceability.validate")
+def validate_tc_traceability(file_path: str, progress: Optional[ProgressCallback] = None) -> Dict:
     """
     Validates TC traceability across Excel workbook.
     
     Args:
         file_path: Path to the Excel file
+        progress: Optional callback receiving (done, total, stage) while sheets
+            are indexed and requirements are checked
         
     Returns:
         Dictionary with summary and validation results
     """
     try:
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = open_workbook_readonly(file_path)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to open workbook: {str(e)}")
     
@@ -44,39 +133,36 @@ def validate_tc_traceability(file_path: str) -> Dict:
         wb.close()
         raise HTTPException(status_code=400, detail="'General' sheet not found in workbook")
     
-    general_sheet = wb['General']
+    general_rows = list(iter_sheet_rows(wb['General'], values_only=True))
+    general_meta = SheetMetadata(name='General')
+    for row_idx, row in enumerate(general_rows, start=1):
+        general_meta.observe_row(row_idx, _row_texts(row))
+    
     results = []
     warnings = []
+    # Requirements that still need a sheet lookup, filled in after indexing
+    pending = []
+    
+    # Find the header row and column indices (searched in first 20 rows)
+    req_id_pos = general_meta.header_positions.get("Requirements ID")
+    tc_pos = general_meta.header_positions.get("Test Case associated")
     
-    # Find the header row and column indices
-    req_id_col = None
-    tc_col = None
-    header_row = None
-    
-    # Search for headers in first 20 rows
-    for row_idx in range(1, 21):
-        for col_idx, cell in enumerate(general_sheet[row_idx], start=1):
-            cell_value = str(cell.value).strip() if cell.value else ""
-            if cell_value == "Requirements ID":
-                req_id_col = col_idx
-                header_row = row_idx
-            elif cell_value == "Test Case associated":
-                tc_col = col_idx
-    
-    if not req_id_col or not tc_col:
+    if not req_id_pos or not tc_pos:
         wb.close()
         raise HTTPException(
             status_code=400, 
             detail="Could not find 'Requirements ID' or 'Test Case associated' columns in General sheet"
         )
+    header_row, req_id_col = req_id_pos
+    tc_col = tc_pos[1]
     
     # Extract requirements starting from row after header
-    for row_idx in range(header_row + 1, general_sheet.max_row + 1):
-        req_id_cell = general_sheet.cell(row_idx, req_id_col)
-        tc_cell = general_sheet.cell(row_idx, tc_col)
+    for row in general_rows[header_row:]:
+        req_id_value = row[req_id_col - 1] if req_id_col <= len(row) else None
+        tc_cell_value = row[tc_col - 1] if tc_col <= len(row) else None
         
-        req_id = str(req_id_cell.value).strip() if req_id_cell.value else ""
-        tc_value = str(tc_cell.value).strip() if tc_cell.value else ""
+        req_id = str(req_id_value).strip() if req_id_value else ""
+        tc_value = str(tc_cell_value).strip() if tc_cell_value else ""
         
         # Skip empty rows
         if not req_id or req_id == "None":
@@ -130,24 +216,17 @@ def validate_tc_traceability(file_path: str) -> Dict:
             elif part.startswith('TC_'):
                 expected_tcs.append(part)
         result["expected_tcs"] = expected_tcs
-        
-        # Search for requirement ID in all sheets except General
+        results.append(result)
+        pending.append((result, expected_tcs))
+    
+    count_rows(len(results))
+    # Walk every TC sheet once and answer all requirement lookups from the index
+    requirement_index, sheet_metadata = build_requirement_index(wb, [r["requirement_id"] for r, _ in pending], progress)
+    
+    for checked, (result, expected_tcs) in enumerate(pending, start=1):
+        req_id = result["requirement_id"]
         # Track both the sheet name and the row where it was found
-        found_sheets_data = {}  # {sheet_name: [row_indices]}
-        
-        for sheet_name in wb.sheetnames:
-            if sheet_name == "General":
-                continue
-            
-            sheet = wb[sheet_name]
-            for row_idx, row in enumerate(sheet.iter_rows(), start=1):
-                for cell in row:
-                    cell_value = str(cell.value).strip() if cell.value else ""
-                    if req_id in cell_value:
-                        if sheet_name not in found_sheets_data:
-                            found_sheets_data[sheet_name] = []
-                        found_sheets_data[sheet_name].append(row_idx)
-                        break
+        found_sheets_data = requirement_index.get(req_id, {})  # {sheet_name: [row_indices]}
         
         # Process found sheets with #Note filtering for unexpected sheets
         found_sheets = []
@@ -158,9 +237,8 @@ def validate_tc_traceability(file_path: str) -> Dict:
             is_unexpected = sheet_name not in expected_tcs
             
             if is_unexpected:
-                # Find the last #Note row in this sheet
-                sheet = wb[sheet_name]
-                last_note_row = find_last_note_row_index(sheet)
+                # Last #Note row was recorded while the sheet was indexed
+                last_note_row = sheet_metadata[sheet_name].last_note_row
                 
                 # Determine if requirement appears before or after #Note
                 has_before_note = False
@@ -200,7 +278,8 @@ def validate_tc_traceability(file_path: str) -> Dict:
             result["status"] = "fail"
             result["error"] = f"Requirement {req_id} found in unexpected sheets: {', '.join(extra_sheets)}"
         
-        results.append(result)
+        if progress:
+            progress(checked, len(pending), "Checking requirements")
     
     wb.close()
     
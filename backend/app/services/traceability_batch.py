@@ -0,0 +1,154 @@
+"""
+Batch traceability validation.
+
+Validates a whole set of traceability matrices (a directory, a .zip, or a
+batch upload) across a process pool. Results are produced one entry per
+workbook as soon as it is done, which is what the NDJSON endpoint streams,
+followed by an aggregate summary:
+
+    {"type": "file", "filename": ..., "status": "pass" | "fail" | "error", ...}
+    {"type": "summary", "total_files": ..., "status": "pass" | "fail", ...}
+
+Also usable from the command line:
+
+    python -m app.services.traceability_batch <directory or .zip> [--workers N] [--max-memory-mb MB]
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import BATCH_MAX_WORKERS, BATCH_WORKER_MAX_MEMORY_MB
+from app.core.executors import batch_pools
+from app.services.uploads import extract_zip_workbooks
+
+# openpyxl (read-only) workbooks; .xls matrices are not supported by the validator
+TRACEABILITY_SUFFIXES = (".xlsx", ".xlsm")
+
+
+def find_workbooks(source: Path, work_dir: Path) -> List[Tuple[str, Path]]:
+    """
+    (name, path) pairs for every workbook under a directory (recursively, names
+    relative to it) or inside a .zip archive (extracted into work_dir).
+    """
+    if source.is_dir():
+        return [
+            (path.relative_to(source).as_posix(), path)
+            for path in sorted(source.rglob("*"))
+            if path.is_file() and path.name.lower().endswith(TRACEABILITY_SUFFIXES) and not path.name.startswith("~$")
+        ]
+    if source.suffix.lower() == ".zip":
+        return extract_zip_workbooks(source, work_dir, TRACEABILITY_SUFFIXES)
+    raise HTTPException(status_code=400, detail=f"{source} is neither a directory nor a .zip archive")
+
+
+def validate_workbook(filename: str, path: str) -> Dict:
+    """Validate one matrix; failures to validate are reported in the entry rather than raised."""
+    from app.services.tc_traceability import validate_tc_traceability
+
+    try:
+        result = validate_tc_traceability(path)
+    except HTTPException as e:
+        return {"type": "file", "filename": filename, "status": "error", "error": e.detail}
+    except MemoryError:
+        return {"type": "file", "filename": filename, "status": "error", "error": "Worker memory limit exceeded"}
+    except Exception as e:
+        return {"type": "file", "filename": filename, "status": "error", "error": str(e)}
+
+    status = "pass" if result["summary"]["failed"] == 0 else "fail"
+    return {"type": "file", "filename": filename, "status": status, **result}
+
+
+def create_pool(file_count: int, max_workers: Optional[int] = None, max_memory_mb: int = 0) -> ProcessPoolExecutor:
+    """
+    Process pool sized for a batch (None = one worker per CPU core, never more
+    than files), taken from the shared batch budget (see app.core.executors).
+    """
+    return batch_pools.create(batch_pools.workers_for(file_count, max_workers), max_memory_mb=max_memory_mb)
+
+
+def submit_batch(pool: ProcessPoolExecutor, inputs: Iterable[Tuple[str, Path]]) -> Dict[Future, str]:
+    """Queue every workbook on the pool; returns {future: filename}."""
+    return {pool.submit(validate_workbook, name, str(path)): name for name, path in inputs}
+
+
+def result_entry(future: Future, filename: str) -> Dict:
+    """Entry of a finished future, including the case of a worker that died (e.g. killed for memory)."""
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        return {"type": "file", "filename": filename, "status": "error", "error": "Worker process terminated unexpectedly"}
+    except Exception as e:
+        return {"type": "file", "filename": filename, "status": "error", "error": str(e)}
+
+
+def iter_validation_results(
+    inputs: List[Tuple[str, Path]],
+    max_workers: Optional[int] = None,
+    max_memory_mb: int = 0
+) -> Iterator[Dict]:
+    """Validate workbooks in parallel, yielding each entry as soon as its workbook is done."""
+    with create_pool(len(inputs), max_workers, max_memory_mb) as pool:
+        futures = submit_batch(pool, inputs)
+        try:
+            for future in as_completed(futures):
+                yield result_entry(future, futures[future])
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def summarize_batch(entries: List[Dict]) -> Dict:
+    """Aggregate pass/fail summary of the per-file entries."""
+    validated = [e for e in entries if e["status"] != "error"]
+    passed_files = sum(1 for e in validated if e["status"] == "pass")
+    return {
+        "type": "summary",
+        "status": "pass" if entries and passed_files == len(entries) else "fail",
+        "total_files": len(entries),
+        "passed_files": passed_files,
+        "failed_files": len(validated) - passed_files,
+        "error_files": len(entries) - len(validated),
+        "total_requirements": sum(e["summary"]["total_requirements"] for e in validated),
+        "passed": sum(e["summary"]["passed"] for e in validated),
+        "failed": sum(e["summary"]["failed"] for e in validated),
+        "warnings": sum(len(e["summary"]["warnings"]) for e in validated)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate every traceability matrix of a directory or .zip; prints NDJSON")
+    parser.add_argument("source", help="Directory (searched recursively) or .zip archive of .xlsx/.xlsm matrices")
+    parser.add_argument("--workers", type=int, default=BATCH_MAX_WORKERS, help="Worker processes (default: one per CPU core)")
+    parser.add_argument("--max-memory-mb", type=int, default=BATCH_WORKER_MAX_MEMORY_MB, help="Memory limit per worker in MB (0 = unlimited)")
+    args = parser.parse_args(argv)
+
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        try:
+            inputs = find_workbooks(Path(args.source), work_dir)
+        except HTTPException as e:
+            parser.error(e.detail)
+        if not inputs:
+            parser.error(f"No .xlsx/.xlsm workbooks found in {args.source}")
+
+        entries = []
+        for entry in iter_validation_results(inputs, args.workers, args.max_memory_mb):
+            entries.append(entry)
+            print(json.dumps(entry), flush=True)
+        summary = summarize_batch(entries)
+        print(json.dumps(summary), flush=True)
+        return 0 if summary["status"] == "pass" else 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Upload storage.
+
+Starlette has already spooled an UploadFile by the time a handler runs; the
+only other write is the copy into UPLOAD_DIR that the parsers (and worker
+processes) need as a real path. That copy is streamed in chunks which also
+feed an incremental SHA-256 and the size limit, so:
+  - an upload over UPLOAD_MAX_BYTES is rejected with 413 as soon as it
+    crosses the limit, not after it has been written out
+  - the parse cache gets the digest for free instead of re-reading the file
+  - identical uploads in flight at the same time share one file
+    (UPLOAD_DIR/blobs/<sha256><suffix>), released when the last user is done
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import UPLOAD_DIR, UPLOAD_MAX_BYTES
+from app.core.metrics import timed
+from app.services.parse_cache import record_file_sha256
+
+CHUNK_SIZE = 1 << 20
+
+
+@timed("upload")
+def copy_stream(source: BinaryIO, target: BinaryIO, max_bytes: int = UPLOAD_MAX_BYTES) -> Tuple[str, int]:
+    """
+    Copy source to target in chunks, returning (sha256 hex, size).
+    Raises HTTPException(413) once more than max_bytes have been read.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+        digest.update(chunk)
+        target.write(chunk)
+    return digest.hexdigest(), size
+
+
+def copy_upload(upload: UploadFile, dest: Path, max_bytes: int = UPLOAD_MAX_BYTES) -> Tuple[str, int]:
+    """Write an upload to dest (removed again if it is too large); returns (sha256 hex, size)."""
+    try:
+        with dest.open("wb") as buffer:
+            digest, size = copy_stream(upload.file, buffer, max_bytes)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    record_file_sha256(dest, digest)
+    return digest, size
+
+
+def _unique_name(name: str, used: set) -> str:
+    """Make a file name unique within a batch by appending _1, _2, ..."""
+    candidate = name
+    counter = 0
+    while candidate.lower() in used:
+        counter += 1
+        candidate = f"{Path(name).stem}_{counter}{Path(name).suffix}"
+    used.add(candidate.lower())
+    return candidate
+
+
+def extract_zip_workbooks(zip_path: Path, input_dir: Path, suffixes: Tuple[str, ...], used_names: Optional[set] = None) -> List[tuple]:
+    """
+    Extract the workbooks of a .zip archive into input_dir, flattening folders.
+    Returns (unique base name, extracted path) pairs in archive order.
+    """
+    used_names = set() if used_names is None else used_names
+    inputs = []
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            for info in archive.infolist():
+                # Only the base name is used, so entries can't escape input_dir
+                member_name = Path(info.filename).name
+                if info.is_dir() or not member_name.lower().endswith(suffixes) or member_name.startswith("~$"):
+                    continue
+                name = _unique_name(member_name, used_names)
+                with archive.open(info) as src, (input_dir / name).open("wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                inputs.append((name, input_dir / name))
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail=f"Invalid zip archive: {Path(zip_path).name}")
+    return inputs
+
+
+def collect_batch_inputs(files: List[UploadFile], work_dir: Path, input_dir: Path, suffixes: Tuple[str, ...]) -> List[tuple]:
+    """
+    Save every workbook of a batch upload into input_dir, unpacking .zip archives.
+    Only files ending in one of suffixes are kept from archives; other uploads are rejected.
+    Returns (original name, saved path) pairs in upload order.
+    """
+    used_names = set()
+    inputs = []
+    for upload in files:
+        fname = Path(upload.filename or f"workbook{suffixes[0]}").name
+        if fname.lower().endswith(".zip"):
+            zip_path = work_dir / _unique_name(fname, used_names)
+            copy_upload(upload, zip_path)
+            # Keep the name the client used in the error message
+            try:
+                inputs.extend(extract_zip_workbooks(zip_path, input_dir, suffixes, used_names))
+            except HTTPException:
+                raise HTTPException(status_code=400, detail=f"Invalid zip archive: {fname}")
+        elif fname.lower().endswith(suffixes):
+            name = _unique_name(fname, used_names)
+            copy_upload(upload, input_dir / name)
+            inputs.append((name, input_dir / name))
+        else:
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {fname}. Upload {'/'.join(suffixes)} files or a .zip of them")
+    return inputs
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    filename: str
+    sha256: str
+    size: int
+
+
+class UploadStore:
+    """Content-addressed upload files with in-process reference counting."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._refs: Dict[Path, int] = {}
+        self._lock = threading.Lock()
+
+    def save(self, upload: UploadFile, default_name: str = "upload") -> StoredUpload:
+        """Write an upload once; callers must release() the result when done."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        filename = Path(upload.filename or default_name).name
+        suffix = Path(filename).suffix.lower()
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as buffer:
+                digest, size = copy_stream(upload.file, buffer, self.max_bytes)
+        except BaseException:
+            os.remove(tmp_name)
+            raise
+
+        path = self.root / f"{digest}{suffix}"
+        with self._lock:
+            if path in self._refs:
+                # Same content is already on disk for another request
+                os.remove(tmp_name)
+            else:
+                os.replace(tmp_name, path)
+                record_file_sha256(path, digest)
+            self._refs[path] = self._refs.get(path, 0) + 1
+        return StoredUpload(path=path, filename=filename, sha256=digest, size=size)
+
+    def release(self, stored: Optional[StoredUpload]) -> None:
+        if stored is None:
+            return
+        with self._lock:
+            count = self._refs.get(stored.path, 0) - 1
+            if count > 0:
+                self._refs[stored.path] = count
+                return
+            self._refs.pop(stored.path, None)
+            try:
+                stored.path.unlink()
+            except OSError:
+                pass
+
+
+upload_store = UploadStore(UPLOAD_DIR / "blobs", UPLOAD_MAX_BYTES)
@@ -0,0 +1,402 @@
+"""
+Read-only workbook access.
+
+openpyxl's default loader builds a Cell object for every cell of every sheet,
+which is what pushes large checklists past 1 GB. Everything that only reads a
+workbook goes through this module instead:
+  - open_workbook_readonly / iter_sheet_rows stream rows with read_only=True
+  - SheetRows gives cached random access to the rows that were actually read
+  - iter_sheet_columns streams a few columns of a wide sheet, converting only
+    the cells of those columns
+  - read_sheet_hyperlinks pulls hyperlink targets straight from the .xlsx parts,
+    since read-only worksheets do not expose cell.hyperlink. It skips over
+    <sheetData> at the byte level and only XML-parses what follows it
+    (merged ranges and <hyperlinks>), so no cell is ever materialized
+Fills are still available on read-only cells (ReadOnlyCell.fill), so
+cell_fill_rgb works unchanged on the cells returned here.
+
+Code that needs to write (e.g. update_build_numbers) keeps using the full model.
+"""
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import XMLPullParser, fromstring, iterparse
+
+import openpyxl
+from openpyxl.cell.read_only import EMPTY_CELL, ReadOnlyCell
+from openpyxl.worksheet._reader import WorkSheetParser
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string, range_boundaries, get_column_letter
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+REL_OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+# Size of the decompressed chunks read from a worksheet part
+CHUNK_SIZE = 1 << 20
+
+# First element start tag (the <worksheet ...> root, carrying the namespace declarations)
+RE_ROOT_START = re.compile(rb"<(?![?!])[^>]*>")
+# End of the cell data: </sheetData> or an empty <sheetData/>, with an optional prefix
+RE_SHEET_DATA_END = re.compile(rb"</(?:[\w.-]+:)?sheetData\s*>|<(?:[\w.-]+:)?sheetData\s*/>")
+# Longest possible match above, kept between chunks so a tag split across two chunks is still found
+SHEET_DATA_END_OVERLAP = 64
+
+
+def open_workbook_readonly(path: Union[str, Path], data_only: bool = True):
+    """Open a workbook in streaming read-only mode. Callers must close() it."""
+    return openpyxl.load_workbook(path, read_only=True, data_only=data_only)
+
+
+def iter_sheet_rows(sheet, values_only: bool = False) -> Iterator[tuple]:
+    """
+    Stream the rows of a read-only worksheet starting at row 1.
+
+    The <dimension> tag written by some tools is stale, so it is ignored and
+    every row present in the sheet is returned. Missing rows come back as
+    empty tuples, so enumerate(..., start=1) gives the real row numbers.
+    """
+    sheet.reset_dimensions()
+    return sheet.iter_rows(values_only=values_only)
+
+
+class SheetRows:
+    """
+    Random access (row, column) over a streamed read-only sheet.
+
+    Rows are pulled from the underlying stream only as far as they are asked
+    for and kept afterwards, so scanning the first 20 rows for headers and
+    stopping at an end marker never parses the rest of the sheet.
+    """
+
+    def __init__(self, sheet):
+        self.title = sheet.title
+        self._stream = iter_sheet_rows(sheet)
+        self._rows: List[tuple] = []
+        self._exhausted = False
+
+    def _fill_to(self, row_idx: int) -> None:
+        while not self._exhausted and len(self._rows) < row_idx:
+            try:
+                self._rows.append(next(self._stream))
+            except StopIteration:
+                self._exhausted = True
+
+    def row(self, row_idx: int) -> tuple:
+        """Cells of a 1-indexed row; empty tuple past the end of the sheet."""
+        self._fill_to(row_idx)
+        if row_idx <= len(self._rows):
+            return self._rows[row_idx - 1]
+        return ()
+
+    def cell(self, row_idx: int, col_idx: int):
+        """Cell at a 1-indexed position, or EMPTY_CELL when absent."""
+        row = self.row(row_idx)
+        if col_idx <= len(row):
+            return row[col_idx - 1]
+        return EMPTY_CELL
+
+    def iter_rows(self, min_row: int = 1, max_row: Optional[int] = None) -> Iterator[Tuple[int, tuple]]:
+        """Yield (row_idx, cells) from min_row until max_row or the end of the sheet."""
+        row_idx = min_row
+        while max_row is None or row_idx <= max_row:
+            self._fill_to(row_idx)
+            if row_idx > len(self._rows):
+                return
+            yield row_idx, self._rows[row_idx - 1]
+            row_idx += 1
+
+
+def _row_number(row_attr: str) -> int:
+    """Row number from a <row r="..."> attribute, which some writers emit as a float."""
+    try:
+        return int(row_attr)
+    except ValueError:
+        return int(float(row_attr))
+
+
+def iter_sheet_columns(path: Union[str, Path], sheet_name: str, columns: List[int], min_row: int = 1) -> Iterator[Tuple[int, List]]:
+    """
+    Stream some columns of a sheet, from min_row to the end.
+
+    Every cell of the sheet still goes through the XML parser, but only the
+    cells in the requested columns are converted (shared strings, numbers,
+    dates), which is where openpyxl spends most of its time on wide sheets.
+    Cells are the read-only cells openpyxl would return with data_only=True;
+    absent cells come back as EMPTY_CELL.
+
+    Args:
+        path: Path to the .xlsx/.xlsm file
+        sheet_name: Sheet to read (KeyError if missing)
+        columns: 1-indexed column numbers, in the order the cells are wanted
+        min_row: First row to return (1-indexed)
+
+    Yields:
+        (row_idx, cells) for every row present in the sheet from min_row on
+    """
+    positions = {column: idx for idx, column in enumerate(columns)}
+    letters = [get_column_letter(column) for column in columns]
+    row_tag = f"{{{NS_MAIN}}}row"
+
+    wb = open_workbook_readonly(path)
+    try:
+        sheet = wb[sheet_name]
+        # Same cell conversion settings openpyxl uses when streaming the sheet itself
+        parser = WorkSheetParser(
+            None, sheet._shared_strings, data_only=True, epoch=wb.epoch,
+            date_formats=wb._date_formats, timedelta_formats=wb._timedelta_formats
+        )
+        row_idx = 0
+        with sheet._get_source() as source:
+            for _, element in iterparse(source):
+                if element.tag != row_tag:
+                    continue
+                row_attr = element.get("r")
+                row_idx = _row_number(row_attr) if row_attr else row_idx + 1
+                if row_idx < min_row:
+                    element.clear()
+                    continue
+
+                cells = [EMPTY_CELL] * len(columns)
+                found = {}
+                for idx, col_idx in enumerate(columns):
+                    # Dense rows: the cell sits at its column position, no need to walk the row
+                    if col_idx <= len(element) and element[col_idx - 1].get("r") == f"{letters[idx]}{row_idx}":
+                        found[idx] = element[col_idx - 1]
+                if len(found) < len(columns):
+                    found = {}
+                    col_idx = 0
+                    for element_cell in element:
+                        coordinate = element_cell.get("r")
+                        col_idx = column_index_from_string(coordinate.rstrip("0123456789")) if coordinate else col_idx + 1
+                        if col_idx in positions:
+                            found[positions[col_idx]] = element_cell
+                for idx, element_cell in found.items():
+                    parser.row_counter = row_idx
+                    data = parser.parse_cell(element_cell)
+                    cells[idx] = ReadOnlyCell(sheet, row_idx, columns[idx], data["value"], data["data_type"], data["style_id"])
+                element.clear()
+                yield row_idx, cells
+    finally:
+        wb.close()
+
+
+def rels_path_for(part: str) -> str:
+    """Path of the .rels file that holds a part's relationships."""
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def read_relationships(archive: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    Parse the .rels file belonging to a part into {rId: (target, target_mode)}.
+
+    Internal targets are made absolute within the archive, the same way
+    openpyxl does it; external targets (URLs, file paths) are kept verbatim.
+    """
+    folder = posixpath.dirname(part)
+    try:
+        root = fromstring(archive.read(rels_path_for(part)))
+    except KeyError:
+        return {}
+
+    rels = {}
+    for rel in root.iter(f"{{{NS_PKG_REL}}}Relationship"):
+        target = rel.get("Target")
+        mode = rel.get("TargetMode")
+        if target is not None and mode != "External":
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(folder, target))
+        rels[rel.get("Id")] = (target, mode)
+    return rels
+
+
+def _workbook_part(archive: zipfile.ZipFile) -> str:
+    """Locate the workbook part through the package relationships."""
+    root = fromstring(archive.read("_rels/.rels"))
+    for rel in root.iter(f"{{{NS_PKG_REL}}}Relationship"):
+        if rel.get("Type") == REL_OFFICE_DOCUMENT:
+            return rel.get("Target").lstrip("/")
+    return "xl/workbook.xml"
+
+
+def sheet_parts(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """Map sheet names to their worksheet part paths, in workbook order."""
+    workbook_part = _workbook_part(archive)
+    # Worksheet targets are relative to the workbook part's folder
+    wb_rels = {}
+    folder = posixpath.dirname(workbook_part)
+    root = fromstring(archive.read(rels_path_for(workbook_part)))
+    for rel in root.iter(f"{{{NS_PKG_REL}}}Relationship"):
+        target = rel.get("Target")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(folder, target))
+        wb_rels[rel.get("Id")] = target
+
+    parts = {}
+    root = fromstring(archive.read(workbook_part))
+    for sheet in root.iter(f"{{{NS_MAIN}}}sheet"):
+        target = wb_rels.get(sheet.get(f"{{{NS_REL}}}id"))
+        if target:
+            parts[sheet.get("name")] = target
+    return parts
+
+
+def _coordinate_key(coordinate: str) -> Tuple[int, int]:
+    column, row = coordinate_from_string(coordinate)
+    return row, column_index_from_string(column)
+
+
+class _SheetDataNotFound(Exception):
+    """The worksheet part could not be split around <sheetData>."""
+
+
+def _sheet_tail_chunks(source) -> Iterator[bytes]:
+    """
+    Yield a worksheet part with its <sheetData> element cut out.
+
+    The root start tag comes first so namespace prefixes still resolve, then
+    everything after the end of <sheetData>. Raises _SheetDataNotFound when the
+    part doesn't have the expected shape.
+    """
+    buffer = b""
+    root_end = None
+    while root_end is None:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            raise _SheetDataNotFound()
+        buffer += chunk
+        match = RE_ROOT_START.search(buffer)
+        if match:
+            if match.group(0).endswith(b"/>"):
+                # Empty <worksheet/>: nothing to skip
+                yield buffer
+                yield source.read()
+                return
+            root_end = match.end()
+    yield buffer[:root_end]
+    buffer = buffer[root_end:]
+
+    while True:
+        match = RE_SHEET_DATA_END.search(buffer)
+        if match:
+            yield buffer[match.end():]
+            break
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            raise _SheetDataNotFound()
+        buffer = buffer[-SHEET_DATA_END_OVERLAP:] + chunk
+
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_hyperlinks(chunks: Iterator[bytes]) -> Dict[str, Optional[str]]:
+    """
+    Collect {cell coordinate: relationship id} from worksheet XML chunks.
+
+    Mirrors openpyxl's binding rules: range refs apply to every cell of the
+    range except the hidden cells of merged ranges, and a single ref pointing
+    inside a merged range is bound to that range's top-left cell.
+    """
+    links: List[Tuple[str, Optional[str]]] = []
+    merged: List[Tuple[int, int, int, int]] = []
+
+    parser = XMLPullParser(events=("end",))
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            tag = elem.tag
+            if tag == f"{{{NS_MAIN}}}hyperlink":
+                links.append((elem.get("ref"), elem.get(f"{{{NS_REL}}}id")))
+            elif tag == f"{{{NS_MAIN}}}mergeCell":
+                merged.append(range_boundaries(elem.get("ref")))
+            elif tag == f"{{{NS_MAIN}}}row":
+                # Only reached on the fallback path; cell data is not needed
+                elem.clear()
+    parser.close()
+
+    def merge_start(row: int, col: int) -> Optional[Tuple[int, int]]:
+        for min_col, min_row, max_col, max_row in merged:
+            if min_row <= row <= max_row and min_col <= col <= max_col:
+                return min_row, min_col
+        return None
+
+    hyperlinks: Dict[str, Optional[str]] = {}
+    for ref, rel_id in links:
+        if not ref:
+            continue
+        if ":" in ref:
+            min_col, min_row, max_col, max_row = range_boundaries(ref)
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    start = merge_start(row, col)
+                    if start is not None and start != (row, col):
+                        continue
+                    hyperlinks[f"{get_column_letter(col)}{row}"] = rel_id
+        else:
+            row, col = _coordinate_key(ref)
+            start = merge_start(row, col)
+            if start is not None:
+                row, col = start
+            hyperlinks[f"{get_column_letter(col)}{row}"] = rel_id
+
+    return dict(sorted(hyperlinks.items(), key=lambda item: _coordinate_key(item[0])))
+
+
+def _read_whole_part(archive: zipfile.ZipFile, part: str) -> Iterator[bytes]:
+    with archive.open(part) as source:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def sheet_hyperlink_ids(archive: zipfile.ZipFile, part: str) -> Dict[str, Optional[str]]:
+    """
+    {cell coordinate: relationship id} for the hyperlinks of a worksheet part,
+    in row-major order. The id is None for in-document links.
+    """
+    try:
+        with archive.open(part) as source:
+            return _parse_hyperlinks(_sheet_tail_chunks(source))
+    except _SheetDataNotFound:
+        # Unusual layout: parse the whole part instead of skipping the cell data
+        return _parse_hyperlinks(_read_whole_part(archive, part))
+
+
+def read_sheet_hyperlinks(path: Union[str, Path], sheet_names: List[str]) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Read hyperlink targets of the given sheets without loading any cell data.
+
+    Args:
+        path: Path to the .xlsx/.xlsm file
+        sheet_names: Sheets to read; names missing from the workbook are skipped
+
+    Returns:
+        {sheet_name: {cell coordinate: target}} with coordinates in row-major
+        order. Targets are None for links without a relationship (in-document links).
+    """
+    result = {}
+    with zipfile.ZipFile(path) as archive:
+        parts = sheet_parts(archive)
+        for sheet_name in sheet_names:
+            part = parts.get(sheet_name)
+            if part is None:
+                continue
+            rels = read_relationships(archive, part)
+            result[sheet_name] = {
+                coordinate: rels[rel_id][0] if rel_id in rels else None
+                for coordinate, rel_id in sheet_hyperlink_ids(archive, part).items()
+            }
+    return result
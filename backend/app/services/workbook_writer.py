@@ -0,0 +1,135 @@
+"""
+Zip-level workbook rewriting.
+
+Saving through openpyxl re-serializes every part of the workbook and drops
+whatever openpyxl does not model (macros, some drawings, custom XML). Changing
+hyperlink targets only requires touching the sheet .rels parts, so this module
+copies the .xlsx package entry by entry, streams every other entry through
+unchanged and rewrites only the Target attributes that need it.
+"""
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from xml.etree.ElementTree import fromstring
+from xml.sax.saxutils import escape
+
+from app.services.workbook_reader import CHUNK_SIZE, read_relationships, rels_path_for, sheet_hyperlink_ids, sheet_parts
+
+# A single <Relationship .../> element and its Id / Target attributes
+RE_RELATIONSHIP = re.compile(rb"<(?:[\w.-]+:)?Relationship\b[^>]*>")
+RE_ID_ATTR = re.compile(rb"""\bId\s*=\s*(["'])(.*?)\1""")
+RE_TARGET_ATTR = re.compile(rb"""\bTarget\s*=\s*(["'])(.*?)\1""")
+
+
+def _rewrite_rels_xml(xml: bytes, rel_ids: Set[str], rewrite: Callable[[str], Optional[str]]) -> bytes:
+    """
+    Pass the Target of the given relationships through rewrite, leaving every
+    other byte of the part alone.
+    """
+    def replace_relationship(match: re.Match) -> bytes:
+        tag = match.group(0)
+        id_match = RE_ID_ATTR.search(tag)
+        target_match = RE_TARGET_ATTR.search(tag)
+        if not id_match or not target_match or id_match.group(2).decode("utf-8") not in rel_ids:
+            return tag
+
+        # Let the XML parser undo the attribute escaping
+        quote = target_match.group(1)
+        raw_target = fromstring(b"<r Target=" + quote + target_match.group(2) + quote + b"/>").get("Target")
+        new_target = rewrite(raw_target)
+        if new_target is None:
+            return tag
+
+        value = escape(new_target, {'"': "&quot;", "'": "&apos;"}).encode("utf-8")
+        return tag[:target_match.start(2)] + value + tag[target_match.end(2):]
+
+    return RE_RELATIONSHIP.sub(replace_relationship, xml)
+
+
+def _copy_info(info: zipfile.ZipInfo) -> zipfile.ZipInfo:
+    """Fresh ZipInfo carrying over name, timestamp, compression and attributes."""
+    out = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    out.compress_type = info.compress_type
+    out.comment = info.comment
+    out.create_system = info.create_system
+    out.external_attr = info.external_attr
+    out.internal_attr = info.internal_attr
+    return out
+
+
+def rewrite_hyperlink_targets(
+    path: Union[str, Path],
+    output_path: Union[str, Path],
+    sheet_names: List[str],
+    rewrite: Callable[[str], Optional[str]],
+) -> Dict[str, Dict[str, Tuple[str, str]]]:
+    """
+    Copy a workbook while rewriting the hyperlink targets of some sheets.
+
+    Args:
+        path: Source .xlsx/.xlsm file
+        output_path: Destination file (may be the same as path)
+        sheet_names: Sheets whose hyperlinks are rewritten; missing sheets are skipped
+        rewrite: Called with each distinct target; returns the new target or None to keep it
+
+    Returns:
+        {sheet_name: {cell coordinate: (old_target, new_target)}} for every cell whose
+        hyperlink changed, in row-major order. Sheets found in the workbook are always
+        present, even with no changes.
+    """
+    changes: Dict[str, Dict[str, Tuple[str, str]]] = {}
+    new_parts: Dict[str, bytes] = {}
+
+    with zipfile.ZipFile(path) as archive:
+        parts = sheet_parts(archive)
+        for sheet_name in sheet_names:
+            part = parts.get(sheet_name)
+            if part is None:
+                continue
+
+            rels = read_relationships(archive, part)
+            rewritten: Dict[str, Optional[str]] = {}
+            sheet_changes: Dict[str, Tuple[str, str]] = {}
+
+            for coordinate, rel_id in sheet_hyperlink_ids(archive, part).items():
+                if rel_id not in rels or rels[rel_id][0] is None:
+                    continue
+                old_target = rels[rel_id][0]
+                if rel_id not in rewritten:
+                    rewritten[rel_id] = rewrite(old_target)
+                new_target = rewritten[rel_id]
+                if new_target is None:
+                    continue
+                sheet_changes[coordinate] = (old_target, new_target)
+
+            changes[sheet_name] = sheet_changes
+            changed_ids = {rel_id for rel_id, new_target in rewritten.items() if new_target is not None}
+            if changed_ids:
+                rels_part = rels_path_for(part)
+                new_parts[rels_part] = _rewrite_rels_xml(archive.read(rels_part), changed_ids, rewrite)
+
+        # Write next to the destination and move into place, so output_path == path is safe
+        output_path = Path(output_path)
+        fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, suffix=output_path.suffix)
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_name, "w") as out:
+                out.comment = archive.comment
+                for info in archive.infolist():
+                    out_info = _copy_info(info)
+                    if info.filename in new_parts:
+                        out.writestr(out_info, new_parts[info.filename])
+                        continue
+                    with archive.open(info) as src, out.open(out_info, "w") as dst:
+                        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            os.replace(tmp_name, output_path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+
+    return changes
@@ -1,7 +1,10 @@
 import re
 import difflib
+from collections import Counter, deque
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Iterable, FrozenSet
+
+import pandas as pd
 
 def strip_extension(name: str) -> str:
     # Path.stem removes extension, but for names that include paths we use basename then stem
@@ -57,6 +60,47 @@ def normalize_version_string(s: Optional[str]) -> str:
         return ""
     return str(s).strip()
 
+def _as_text(values: pd.Series) -> pd.Series:
+    """str() of every value, kept as an object column (pandas' string dtype is slower to iterate)."""
+    return values.astype(object).map(str).astype(object)
+
+def normalize_filenames_for_match(names: pd.Series) -> pd.Series:
+    """
+    Column version of normalize_filename_for_match for non-empty names.
+    Gives the same string for every element, with one pass per step over
+    the whole column instead of two regex calls per row.
+    """
+    s = _as_text(names).str.strip().str.lower()
+    # Split off the text after the last dot, like rsplit(".", 1)
+    parts = s.str.rpartition(".")
+    has_extension = parts[1] == "."
+    stem = parts[0].where(has_extension, parts[2])
+    extension = parts[2].where(has_extension, "")
+
+    # A single substitution is enough: after it only isolated spaces remain
+    stem = stem.str.replace(r"[^0-9a-z]+", " ", regex=True).str.strip()
+    return stem.where(extension == "", stem + " " + extension)
+
+def normalize_version_strings(values: pd.Series) -> pd.Series:
+    """Column version of normalize_version_string (None -> "")."""
+    values = values.astype(object)
+    return _as_text(values).str.strip().where(values.map(lambda v: v is not None), "")
+
+def extract_ints_from_versions(values: pd.Series) -> List[Optional[int]]:
+    """
+    Column version of extract_int_from_version, as a list of Python ints/None
+    (a pandas integer column can't hold None next to arbitrary sizes).
+    Revisions repeat a lot, so each distinct string is parsed once.
+    """
+    values = values.astype(object)
+    codes, uniques = pd.factorize(_as_text(values))
+    digits = pd.Series(uniques, dtype=object).str.extract(r"(\d+)", expand=False)
+    parsed = [int(d) if isinstance(d, str) else None for d in digits.tolist()]
+    return [
+        parsed[code] if v is not None else None
+        for v, code in zip(values.tolist(), codes.tolist())
+    ]
+
 def fuzzy_best_match(key: str, candidates: List[str]) -> Tuple[Optional[str], float]:
     """
     Return (best_candidate, score) using difflib.SequenceMatcher ratio.
@@ -73,6 +117,127 @@ def fuzzy_best_match(key: str, candidates: List[str]) -> Tuple[Optional[str], fl
             best = c
     return best, best_score
 
+def _min_matches_for_ratio(total_length: int, threshold: float) -> int:
+    """Smallest matching-character count M with 2*M/total_length >= threshold (difflib's formula)."""
+    if total_length == 0:
+        return 0
+    m = max(0, int(threshold * total_length / 2.0) - 1)
+    while m <= total_length and 2.0 * m / total_length < threshold:
+        m += 1
+    return m
+
+def _trigrams(s: str) -> Counter:
+    return Counter(s[i:i + 3] for i in range(len(s) - 2))
+
+class FuzzyMatcher:
+    """
+    Indexed replacement for calling fuzzy_best_match over the same candidate list
+    many times.
+
+    best_match(key, threshold) returns exactly what fuzzy_best_match(key, candidates)
+    returns whenever that score reaches threshold (same candidate on ties: the
+    earliest one in list order), and (None, 0.0) otherwise. Candidates that cannot
+    reach the threshold are pruned before any SequenceMatcher runs:
+      - length: ratio <= 2*min(la, lb) / (la + lb)
+      - trigrams: the matching blocks form a common subsequence of M characters,
+        so the strings share at least la - 2 - 3*(la - M) - 2*(lb - M) trigrams.
+        Only candidates holding one of the key's rarest trigrams (enough of them
+        that a candidate missing all of them would fall short) are looked at.
+      - real_quick_ratio / quick_ratio against the best score found so far.
+    """
+
+    def __init__(self, candidates: Iterable[str]):
+        self._candidates: List[str] = list(candidates)
+        self._alive: List[bool] = [True] * len(self._candidates)
+        self._positions: Dict[str, List[int]] = {}
+        self._by_length: Dict[int, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._matchers: Dict[int, difflib.SequenceMatcher] = {}
+
+        for pos, candidate in enumerate(self._candidates):
+            self._positions.setdefault(candidate, []).append(pos)
+            self._by_length.setdefault(len(candidate), []).append(pos)
+            for gram in _trigrams(candidate):
+                self._postings.setdefault(gram, []).append(pos)
+
+    def discard(self, candidate: str) -> None:
+        """Remove the first remaining occurrence of candidate (like list.remove, but silent)."""
+        for pos in self._positions.get(candidate, []):
+            if self._alive[pos]:
+                self._alive[pos] = False
+                return
+
+    def _matcher(self, pos: int) -> difflib.SequenceMatcher:
+        # seq2 is the candidate, as in SequenceMatcher(None, key, candidate);
+        # difflib caches everything about seq2, so keep one matcher per candidate
+        matcher = self._matchers.get(pos)
+        if matcher is None:
+            matcher = difflib.SequenceMatcher(None, "", self._candidates[pos])
+            self._matchers[pos] = matcher
+        return matcher
+
+    def _brute_force(self, key: str) -> Tuple[Optional[str], float]:
+        alive = [c for pos, c in enumerate(self._candidates) if self._alive[pos]]
+        return fuzzy_best_match(key, alive)
+
+    def best_match(self, key: str, threshold: float) -> Tuple[Optional[str], float]:
+        if threshold <= 0 or not key:
+            best, score = self._brute_force(key)
+            return (best, score) if score >= threshold else (None, 0.0)
+
+        la = len(key)
+        lengths = [
+            lb for lb in self._by_length
+            if 2.0 * min(la, lb) / (la + lb) >= threshold
+        ]
+        if not lengths:
+            return None, 0.0
+
+        # Trigrams every surviving candidate must share with key, over the length window
+        required = None
+        for lb in lengths:
+            m = _min_matches_for_ratio(la + lb, threshold)
+            need = max(la - 2 - 3 * (la - m) - 2 * (lb - m), lb - 2 - 3 * (lb - m) - 2 * (la - m))
+            required = need if required is None else min(required, need)
+
+        key_grams = _trigrams(key)
+        if required <= 0 or not key_grams:
+            # Too short/loose for the trigram filter: check the whole length window
+            positions = set()
+            for lb in lengths:
+                positions.update(self._by_length[lb])
+        else:
+            # Rarest trigrams first; once the grams left over can't add up to
+            # `required`, every valid candidate has been reached through a posting list
+            remaining = sum(key_grams.values())
+            positions = set()
+            for gram in sorted(key_grams, key=lambda g: len(self._postings.get(g, ()))):
+                if remaining < required:
+                    break
+                positions.update(self._postings.get(gram, ()))
+                remaining -= key_grams[gram]
+
+        length_ok = set(lengths)
+        best_pos = None
+        best_score = 0.0
+        for pos in sorted(positions):
+            if not self._alive[pos] or len(self._candidates[pos]) not in length_ok:
+                continue
+            bar = max(threshold, best_score)
+            matcher = self._matcher(pos)
+            matcher.set_seq1(key)
+            # A later candidate only wins with a strictly higher score
+            if matcher.real_quick_ratio() < bar or matcher.quick_ratio() < bar:
+                continue
+            score = matcher.ratio()
+            if score > best_score and score >= threshold:
+                best_pos = pos
+                best_score = score
+
+        if best_pos is None:
+            return None, 0.0
+        return self._candidates[best_pos], best_score
+
 def cell_fill_rgb(cell) -> Optional[str]:
     try:
         f = cell.fill
@@ -87,3 +252,68 @@ def cell_fill_rgb(cell) -> Optional[str]:
         return None
     except Exception:
         return None
+
+class MultiPatternMatcher:
+    """
+    Aho-Corasick automaton answering "which of these patterns occur in text".
+    Gives the same result as running `pattern in text` for every pattern,
+    but walks each text only once. Results are memoized per distinct text,
+    since spreadsheet cells repeat a lot.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        self._cache: Dict[str, FrozenSet[str]] = {}
+
+        for pattern in set(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = (pattern,)
+
+        # Breadth-first pass to wire failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> FrozenSet[str]:
+        """Return the set of patterns that occur as substrings of text."""
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+
+        result = frozenset(found)
+        self._cache[text] = result
+        return result
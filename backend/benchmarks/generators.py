@@ -0,0 +1,194 @@
+"""
+Synthetic inputs for the benchmarks, shaped like the real files.
+
+Every generator is deterministic for a given (rows, seed) and writes with
+openpyxl's write-only mode, so even the 100k-row workbooks are quick to make:
+  - checklist: "Test Scenario Remarks" (reviewed-against documents, then the
+    artifacts with SVN hyperlinks and a green end marker) and "Test Case
+    Remarks" (some artifacts again, with other versions, plus linked items)
+  - SVN report: CSV export covering most checklist artifacts, a few renamed
+  - traceability matrix: "General" requirement/TC table plus one sheet per TC
+  - CIA sheet: "HLR Change and Impact" with 30 columns and requirements per
+    SIT, along with the TC workbook of one of the SITs
+"""
+import csv
+import random
+from pathlib import Path
+from typing import List, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+
+WORDS = [
+    "ccpu", "icr", "exit", "cond", "can", "lin", "nvm", "diag", "com", "pwm", "adc", "wdg", "boot",
+    "sched", "init", "cfg", "drv", "mon", "safety", "power", "sensor", "ctrl", "fault", "timer"
+]
+EXTENSIONS = [".c", ".h", ".stp", ".trf", ".docx"]
+GREEN = PatternFill(start_color="FF00B050", end_color="FF00B050", fill_type="solid")
+SIT_COUNT = 20
+
+
+def artifact_names(rows: int, seed: int = 0) -> List[str]:
+    """Distinct artifact paths like "src/can_diag_init_00042.c"."""
+    rnd = random.Random(seed)
+    return [
+        f"{rnd.choice(['src', 'inc', 'test', 'doc'])}/"
+        + "_".join(rnd.sample(WORDS, rnd.randint(2, 3)))
+        + f"_{i:05d}{rnd.choice(EXTENSIONS)}"
+        for i in range(rows)
+    ]
+
+
+def _revision(i: int) -> int:
+    """Revision the checklist closes artifact i on (the SVN report mostly agrees)."""
+    return (i * 7919) % 99999 + 1
+
+
+def _svn_link(name: str, build: int) -> str:
+    return f"http://svn.example.com/repo/project/trunk_0{build}/{name}"
+
+
+def _linked(ws, value: str, link: str) -> WriteOnlyCell:
+    cell = WriteOnlyCell(ws, value=value)
+    cell.hyperlink = link
+    return cell
+
+
+def write_checklist(path: Path, rows: int, seed: int = 0) -> Path:
+    """Review checklist with `rows` artifacts under review."""
+    rnd = random.Random(seed)
+    names = artifact_names(rows, seed)
+    wb = Workbook(write_only=True)
+
+    ts = wb.create_sheet("Test Scenario Remarks")
+    ts.append(["Review checklist"])
+    ts.append([])
+    ts.append([None, "Document Name", "Document Revision"])
+    for doc in ("SW_Requirements_Spec.docx", "SW_Architecture.docx"):
+        ts.append([None, _linked(ts, doc, _svn_link(f"doc/{doc}", 1234)), str(rnd.randint(100, 999))])
+    for _ in range(4):
+        ts.append([])
+    ts.append([None, "Filename", "Version on which the review is closed", "Comments"])
+    for i, name in enumerate(names):
+        basename = name.rsplit("/", 1)[-1]
+        ts.append([None, _linked(ts, basename, _svn_link(name, 1234)), str(_revision(i)), "OK"])
+    marker = WriteOnlyCell(ts, value=None)
+    marker.fill = GREEN
+    ts.append([None, marker])
+    ts.append([None, "after the marker.c", "1"])
+
+    tc = wb.create_sheet("Test Case Remarks")
+    tc.append(["Filename", "Version on which closed"])
+    for name in rnd.sample(names, rows // 10):
+        tc.append([name.rsplit("/", 1)[-1], str(rnd.randint(1, 99999))])
+    marker = WriteOnlyCell(tc, value=None)
+    marker.fill = GREEN
+    tc.append([marker])
+    tc.append(["Items"])
+    for name in rnd.sample(names, rows // 10):
+        tc.append([_linked(tc, name.rsplit("/", 1)[-1], _svn_link(name, 1234))])
+
+    wb.save(path)
+    return path
+
+
+def write_svn_csv(path: Path, rows: int, seed: int = 0) -> Path:
+    """
+    SVN report with `rows` files: the checklist's artifacts (same seed), some
+    renamed slightly so the fuzzy pass has work and a few replaced by
+    unrelated files. One in ten has moved on from the checklist's revision.
+    """
+    rnd = random.Random(seed + 1)
+    names = artifact_names(rows, seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["File", "Last Changed Revision", "Last Changed Author", "Last Changed Date"])
+        for i, name in enumerate(names):
+            basename = name.rsplit("/", 1)[-1]
+            roll = rnd.random()
+            if roll < 0.05:
+                basename = basename.replace("_", "-", 1)
+            elif roll < 0.10:
+                basename = f"legacy_{i:05d}.c"
+            revision = _revision(i) if rnd.random() >= 0.1 else _revision(i) + 1
+            writer.writerow([basename, revision, rnd.choice(["alice", "bob", "carol"]), "2024-05-17 10:21:00"])
+    return path
+
+
+def write_traceability(path: Path, rows: int, seed: int = 0) -> Path:
+    """Traceability matrix with `rows` requirements spread over TC sheets of ~500 rows."""
+    rnd = random.Random(seed)
+    tc_count = max(2, rows // 500)
+    tc_names = [f"TC_{k:03d}" for k in range(tc_count)]
+    coverage = {tc: [] for tc in tc_names}
+
+    wb = Workbook(write_only=True)
+    general = wb.create_sheet("General")
+    general.append(["Requirements ID", "Test Case associated", "Comment"])
+    for i in range(rows):
+        req = f"REQ_{i:06d}"
+        if rnd.random() < 0.02:
+            general.append([req, "N/A", "Not testable"])
+            continue
+        expected = rnd.sample(tc_names, 2 if rnd.random() < 0.2 else 1)
+        general.append([req, ", ".join(expected), None])
+        for tc in expected:
+            # A few requirements are missing from their TC sheet
+            if rnd.random() > 0.01:
+                coverage[tc].append(req)
+
+    for tc in tc_names:
+        ws = wb.create_sheet(tc)
+        ws.append(["Step", "Description", "Requirement"])
+        for step, req in enumerate(coverage[tc], start=1):
+            ws.append([step, f"Check the behaviour covered by {req}", req])
+        ws.append(["# Note"])
+        ws.append([f"See also {rnd.choice(tc_names)}"])
+    wb.save(path)
+    return path
+
+
+def sit_names() -> List[str]:
+    return [f"Feature_{k:02d}_SIT" for k in range(SIT_COUNT)]
+
+
+def write_cia(directory: Path, rows: int, seed: int = 0) -> Tuple[Path, Path, str]:
+    """
+    CIA workbook with `rows` HLR rows (header on row 3, SIT_COUNT SITs) and the
+    TC workbook of its first SIT, which lists nearly all of that SIT's HLRs.
+    Returns (CIA path, TC path, TC filename).
+    """
+    rnd = random.Random(seed)
+    sits = sit_names()
+    tc_ids = []
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("HLR Change and Impact")
+    ws.append(["Change Impact Analysis"])
+    ws.append([])
+    headers = [f"Column {i}" for i in range(1, 31)]
+    headers[3] = "SIT name"
+    headers[20] = "New HLR ID"
+    ws.append(headers)
+    for i in range(rows):
+        row = [f"text {i}"] * 30
+        row_sits = rnd.sample(sits, 2 if rnd.random() < 0.1 else 1)
+        row[3] = "; ".join(row_sits)
+        row[20] = rnd.choice([f"CL {10000000 + i}.001", f"{10000000 + i}.1", "N/A"])
+        ws.append(row)
+        if sits[0] in row_sits and row[20] != "N/A" and rnd.random() > 0.02:
+            tc_ids.append(row[20])
+    cia_path = directory / "CIA.xlsx"
+    wb.save(cia_path)
+
+    tc_filename = sits[0].replace("_SIT", "_TC") + ".xlsx"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("General")
+    ws.append(["Requirements ID", "Description"])
+    for hlr in tc_ids:
+        ws.append([hlr, "covered"])
+    ws.append(["CL 99999999.001", "not in the CIA"])
+    tc_path = directory / tc_filename
+    wb.save(tc_path)
+    return cia_path, tc_path, tc_filename
@@ -0,0 +1,251 @@
+"""
+Benchmark runner for the parsing and comparison services.
+
+    python -m benchmarks.run [--sizes 1k,10k,100k] [--only compare_data ...] [--repeat 3]
+                             [--data-dir DIR] [--save results.json]
+                             [--baseline baseline.json] [--tolerance 0.25]
+
+Inputs are generated once per size (see benchmarks.generators) and kept in
+--data-dir when given, so later runs reuse them. Each benchmark is timed
+(best of --repeat runs) and then run once more under tracemalloc for its
+peak traced memory. The parse cache is off while benchmarks run.
+
+--save writes the results as JSON; a saved file passed as --baseline makes
+the run report every benchmark that got slower or hungrier than the baseline
+by more than --tolerance, and exit with status 1 if there is any.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import cached_property
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from benchmarks import generators
+
+DEFAULT_SIZES = "1k,10k"
+
+
+def parse_size(text: str) -> int:
+    """"10k" -> 10000, "2500" -> 2500."""
+    text = text.strip().lower()
+    if text.endswith("k"):
+        return int(float(text[:-1]) * 1000)
+    return int(text)
+
+
+def size_label(rows: int) -> str:
+    return f"{rows // 1000}k" if rows % 1000 == 0 else str(rows)
+
+
+class Inputs:
+    """Generated input files for one size, created on first use."""
+
+    def __init__(self, directory: Path, rows: int):
+        self.directory = directory / size_label(rows)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.rows = rows
+
+    def _file(self, name: str, write: Callable[[Path], object]) -> Path:
+        path = self.directory / name
+        if not path.exists():
+            write(path)
+        return path
+
+    @cached_property
+    def checklist(self) -> Path:
+        return self._file("checklist.xlsx", lambda p: generators.write_checklist(p, self.rows))
+
+    @cached_property
+    def svn_csv(self) -> Path:
+        return self._file("svn.csv", lambda p: generators.write_svn_csv(p, self.rows))
+
+    @cached_property
+    def traceability(self) -> Path:
+        return self._file("traceability.xlsx", lambda p: generators.write_traceability(p, self.rows))
+
+    @cached_property
+    def cia(self) -> tuple:
+        """(CIA path, TC path, TC filename)."""
+        cia_dir = self.directory / "cia"
+        if not cia_dir.exists():
+            cia_dir.mkdir()
+            return generators.write_cia(cia_dir, self.rows)
+        tc_path = next(cia_dir.glob("*_TC.xlsx"))
+        return cia_dir / "CIA.xlsx", tc_path, tc_path.name
+
+
+# Each benchmark takes the inputs of a size and returns the call to measure;
+# anything done before returning (reading inputs) is not measured.
+
+def bench_extract_hyperlinks(inputs: Inputs) -> Callable[[], object]:
+    from app.services.excel_processor import extract_hyperlinks_from_file
+    path = str(inputs.checklist)
+    return lambda: extract_hyperlinks_from_file(path)
+
+
+def bench_update_build_numbers(inputs: Inputs) -> Callable[[], object]:
+    from app.services.excel_processor import update_build_numbers_for_file
+    path, output = str(inputs.checklist), str(inputs.directory / "checklist_updated.xlsx")
+    return lambda: update_build_numbers_for_file(path, "5678", output)
+
+
+def bench_extract_hyperlinks_with_versions(inputs: Inputs) -> Callable[[], object]:
+    from app.services.extractor import extract_hyperlinks_with_versions_from_path
+    path = str(inputs.checklist)
+    return lambda: extract_hyperlinks_with_versions_from_path(path)
+
+
+def bench_read_svn_report(inputs: Inputs) -> Callable[[], object]:
+    from app.services.extractor import read_report_frame
+    path = inputs.svn_csv
+    return lambda: read_report_frame(path)
+
+
+def bench_compare_data(inputs: Inputs) -> Callable[[], object]:
+    from app.services.comparator import compare_data
+    from app.services.extractor import extract_hyperlinks_with_versions_from_path, read_report_frame
+    # Same rows /compare-both compares for an uploaded report and checklist
+    svn_rows = read_report_frame(inputs.svn_csv).fillna("")
+    checklist_rows = extract_hyperlinks_with_versions_from_path(str(inputs.checklist))
+    return lambda: compare_data(svn_rows, checklist_rows)
+
+
+def bench_validate_tc_traceability(inputs: Inputs) -> Callable[[], object]:
+    from app.services.tc_traceability import validate_tc_traceability
+    path = str(inputs.traceability)
+    return lambda: validate_tc_traceability(path)
+
+
+def bench_compare_tc_vs_cia(inputs: Inputs) -> Callable[[], object]:
+    from app.services.cia_compare import compare_tc_vs_cia
+    cia_path, tc_path, tc_filename = inputs.cia
+    return lambda: compare_tc_vs_cia(str(tc_path), str(cia_path), tc_filename)
+
+
+BENCHMARKS: Dict[str, Callable[[Inputs], Callable[[], object]]] = {
+    "extract_hyperlinks": bench_extract_hyperlinks,
+    "update_build_numbers": bench_update_build_numbers,
+    "extract_hyperlinks_with_versions": bench_extract_hyperlinks_with_versions,
+    "read_svn_report": bench_read_svn_report,
+    "compare_data": bench_compare_data,
+    "validate_tc_traceability": bench_validate_tc_traceability,
+    "compare_tc_vs_cia": bench_compare_tc_vs_cia,
+}
+
+
+@contextmanager
+def parse_cache_disabled() -> Iterator[None]:
+    """Every repetition has to parse for real."""
+    from app.services.parse_cache import parse_cache
+
+    saved = parse_cache.max_bytes, parse_cache.disk_dir
+    parse_cache.max_bytes, parse_cache.disk_dir = 0, None
+    try:
+        yield
+    finally:
+        parse_cache.max_bytes, parse_cache.disk_dir = saved
+
+
+def measure(call: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best and mean wall time over repeat calls, then peak traced memory of one more call."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+        "peak_mb": peak / (1024 * 1024)
+    }
+
+
+def run_benchmarks(names: List[str], sizes: List[int], data_dir: Path, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Results keyed by "name[size]", e.g. "compare_data[10k]"."""
+    results = {}
+    with parse_cache_disabled():
+        for rows in sizes:
+            inputs = Inputs(data_dir, rows)
+            for name in names:
+                key = f"{name}[{size_label(rows)}]"
+                results[key] = measure(BENCHMARKS[name](inputs), repeat)
+                r = results[key]
+                print(f"{key:45} {r['seconds']:9.3f} s  {r['peak_mb']:9.1f} MB", flush=True)
+    return results
+
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """One line per metric worse than the baseline by more than tolerance (a fraction)."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric, unit in (("seconds", "s"), ("peak_mb", "MB")):
+            if base.get(metric) and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{key}: {metric} {result[metric]:.3f} {unit} vs baseline {base[metric]:.3f} {unit} "
+                    f"(+{(result[metric] / base[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time and memory-profile the services on synthetic inputs")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma-separated row counts, e.g. 1k,10k,100k (default: {DEFAULT_SIZES})")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark; the best one counts (default: 3)")
+    parser.add_argument("--data-dir", type=Path, help="Keep generated inputs here and reuse them (default: a temporary directory)")
+    parser.add_argument("--save", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="Results file from an earlier --save to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown/memory growth over the baseline (default: 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+    names = args.only or list(BENCHMARKS)
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+
+    if args.data_dir:
+        results = run_benchmarks(names, sizes, args.data_dir, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run_benchmarks(names, sizes, Path(tmp), args.repeat)
+
+    if args.save:
+        args.save.write_text(json.dumps({
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results
+        }, indent=2))
+
+    if baseline is None:
+        return 0
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Startup report: what the server imports before it can answer, and how long
+until /health responds.
+
+    python -m benchmarks.startup [--report build/startup-report.txt] [--top 25]
+                                 [--command dist/backend] [--max-health-seconds 1.0]
+
+The import part runs `python -X importtime -c "import app.main"` and lists
+the modules with the largest cumulative import time, and whether pandas,
+numpy or openpyxl (which the handlers import on first use) are loaded at
+startup. The /health part starts the server (by default `python -m
+app.main`; pass the PyInstaller executable with --command to include its
+unpacking) on a free port and polls until it answers. With
+--max-health-seconds the exit status is 1 when that takes longer.
+"""
+import argparse
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl")
+
+
+def import_times(module: str = "app.main") -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every module imported by `import module`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_health(command: List[str], timeout: float = 60.0) -> float:
+    """Seconds from starting the server command until GET /health answers 200."""
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command + ["--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {process.returncode} before /health answered")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"/health did not answer within {timeout:.0f} s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def format_report(rows: List[Tuple[str, int, int]], top: int, health_seconds: Optional[float], command: List[str]) -> str:
+    total_us = max((cumulative for _, _, cumulative in rows), default=0)
+    imported = {name for name, _, _ in rows}
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+    lines = [
+        f"Import of app.main: {total_us / 1e6:.3f} s, {len(rows)} modules",
+        f"Loaded at startup from {', '.join(HEAVY_MODULES)}: {', '.join(heavy) or 'none'}",
+    ]
+    if health_seconds is not None:
+        lines.append(f"/health answered after {health_seconds:.3f} s ({' '.join(command)})")
+    lines += ["", f"Top {top} modules by cumulative import time:", f"{'cumulative [s]':>15} {'self [s]':>10}  module"]
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        lines.append(f"{cumulative_us / 1e6:15.3f} {self_us / 1e6:10.3f}  {name}")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report startup import time and time to /health")
+    parser.add_argument("--report", type=Path, help="Also write the report to this file")
+    parser.add_argument("--top", type=int, default=25, help="Modules listed (default: 25)")
+    parser.add_argument("--command", nargs="+", help="Server command to time (default: python -m app.main)")
+    parser.add_argument("--no-health", action="store_true", help="Only report import times")
+    parser.add_argument("--max-health-seconds", type=float, help="Exit with status 1 when /health takes longer")
+    args = parser.parse_args(argv)
+
+    command = args.command or [sys.executable, "-m", "app.main"]
+    health_seconds = None if args.no_health else time_to_health(command)
+    report = format_report(import_times(), args.top, health_seconds, command)
+    print(report, end="")
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(report)
+
+    if args.max_health_seconds is not None and health_seconds is not None and health_seconds > args.max_health_seconds:
+        print(f"/health took {health_seconds:.3f} s, over the {args.max_health_seconds:.3f} s limit")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,21 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+import pytest
+from openpyxl import Workbook
+
+@pytest.fixture
+def checklist_bytes():
+    """Factory of checklist workbooks (as bytes) with one hyperlink in Test Case Remarks."""
+    def make(link: str) -> bytes:
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Test Case Remarks"
+        ws['A1'] = "Link"
+        ws['A1'].hyperlink = link
+        wb.create_sheet("Test Scenario Remarks")
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        return buffer.getvalue()
+    return make
@@ -0,0 +1,34 @@
+import json
+from benchmarks import run, startup
+from app.services.parse_cache import parse_cache
+
+def test_benchmarks_run_and_compare_against_baseline(tmp_path, capsys):
+    cache_settings = parse_cache.max_bytes, parse_cache.disk_dir
+    results_file = tmp_path / "results.json"
+    args = ["--sizes", "200", "--repeat", "1", "--data-dir", str(tmp_path / "data")]
+
+    assert run.main(args + ["--save", str(results_file)]) == 0
+    results = json.loads(results_file.read_text())["results"]
+    assert set(results) == {f"{name}[200]" for name in run.BENCHMARKS}
+    assert all(r["seconds"] > 0 and r["peak_mb"] > 0 for r in results.values())
+    assert (parse_cache.max_bytes, parse_cache.disk_dir) == cache_settings
+
+    # Inputs are reused from --data-dir; a generous tolerance absorbs timing noise
+    assert run.main(args + ["--only", "compare_data", "--baseline", str(results_file), "--tolerance", "100"]) == 0
+
+    tiny = {"results": {"compare_data[200]": {"seconds": 1e-9, "peak_mb": 1e-9}}}
+    baseline_file = tmp_path / "tiny.json"
+    baseline_file.write_text(json.dumps(tiny))
+    assert run.main(args + ["--only", "compare_data", "--baseline", str(baseline_file)]) == 1
+    assert "REGRESSION compare_data[200]: seconds" in capsys.readouterr().out
+
+def test_parse_size():
+    assert run.parse_size("10k") == 10000
+    assert run.parse_size("2500") == 2500
+    assert run.size_label(100000) == "100k"
+
+def test_startup_leaves_heavy_imports_to_first_use(capsys):
+    assert startup.main(["--no-health", "--top", "5"]) == 0
+    out = capsys.readouterr().out
+    assert "Loaded at startup from pandas, numpy, openpyxl: none" in out
+    assert "app.main" in out
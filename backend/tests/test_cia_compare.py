@@ -0,0 +1,117 @@
+import io
+import time
+import zipfile
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+from app.core.executors import batch_pools
+from app.main import app
+from app.services.cia_compare import (
+    extract_requirements_from_cia, normalize_req_id, normalize_req_ids, sit_name_mask,
+    _read_header_columns, _read_sheet_with_header
+)
+
+client = TestClient(app)
+
+def _cia_file(tmp_path, header_row):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "HLR Change and Impact"
+    ws['A1'] = "Change Impact Analysis"
+    headers = [f"Column {i}" for i in range(1, 31)]
+    headers[3] = "SIT name"
+    headers[20] = "New HLR ID"
+    for col_idx, header in enumerate(headers, start=1):
+        ws.cell(header_row, col_idx, header)
+    rows = [("A_SIT", "CL 12345678.001"), ("B_SIT; a_sit", 12345678.1), ("C_SIT", 99), ("A_SIT", "N/A"), (None, 5)]
+    for row_idx, (sit, hlr) in enumerate(rows, start=header_row + 1):
+        for col_idx in range(1, 31):
+            ws.cell(row_idx, col_idx, "filler")
+        ws.cell(row_idx, 4, sit)
+        ws.cell(row_idx, 21, hlr)
+    path = tmp_path / "cia.xlsx"
+    wb.save(path)
+    return str(path)
+
+@pytest.mark.parametrize("header_row", [3, 80])
+def test_extract_requirements_from_cia(tmp_path, header_row):
+    path = _cia_file(tmp_path, header_row)
+    ids, mapping = extract_requirements_from_cia(path, "A_SIT")
+    assert ids == ["12345678.001", "12345678.100"]
+    assert mapping == {"CL 12345678.001": "12345678.001", "12345678.1": "12345678.100"}
+
+def test_projected_read_matches_whole_sheet(tmp_path):
+    path = _cia_file(tmp_path, 3)
+    projected = _read_header_columns(path, "HLR Change and Impact", "SIT name", ["SIT name", "New HLR ID"])
+    whole = _read_sheet_with_header(path, "HLR Change and Impact", "SIT name", "CIA")
+    assert projected.to_dict("list") == whole[["SIT name", "New HLR ID"]].to_dict("list")
+    # Header past the scanned rows: the caller falls back to the whole-sheet read
+    assert _read_header_columns(_cia_file(tmp_path, 80), "HLR Change and Impact", "SIT name", ["SIT name"]) is None
+
+def test_vectorized_helpers_match_scalar_rules():
+    values = ["CL 12345678.001", "12,345.001", " 42 ", "CL12345678.1", "d_ICR_xyz", None, np.nan, 7, 1.5, 1e20, True,
+              "0.12345678901234567890123", "+5", "-3.25", ""]
+    series = pd.Series(values, index=[3, 3, 1, 0, 2, 5, 4, 9, 8, 7, 6, 10, 11, 12, 13], dtype=object)
+    assert normalize_req_ids(series).tolist() == [normalize_req_id(v) for v in values]
+
+    sits = pd.Series(["A_SIT", " a_sit ;B_SIT", "B_SIT", None, "XA_SIT", ";A_SIT"], dtype=object)
+    assert sit_name_mask(sits, " A_SIT").tolist() == [True, True, False, False, False, True]
+
+def _tc_bytes(req_ids):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "General"
+    ws['A1'] = "Requirements ID"
+    for row_idx, req_id in enumerate(req_ids, start=2):
+        ws.cell(row_idx, 1, req_id)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+def test_compare_cia_batch_matches_single_comparisons(tmp_path):
+    cia_path = _cia_file(tmp_path, 3)
+    tc_uploads = {
+        "A_TC.xlsx": _tc_bytes(["CL 12345678.001", "12345678.2"]),
+        "Unknown_TC.xlsx": _tc_bytes(["1"]),
+    }
+    packed = io.BytesIO()
+    with zipfile.ZipFile(packed, "w") as archive:
+        archive.writestr("tcs/C_TC.xlsx", _tc_bytes(["99"]))
+    cia_bytes = open(cia_path, "rb").read()
+
+    files = [("tc_files", (name, content)) for name, content in tc_uploads.items()]
+    files += [("tc_files", ("more.zip", packed.getvalue())), ("cia_file", ("cia.xlsx", cia_bytes))]
+    batch = client.post("/api/compare-cia-batch", files=files).json()
+
+    assert [r["tc_filename"] for r in batch["results"]] == ["A_TC.xlsx", "Unknown_TC.xlsx", "C_TC.xlsx"]
+    assert batch["summary"] == {
+        "total_files": 3, "compared": 2, "errors": 1, "files_passed": 1, "files_failed": 1,
+        "total_requirements": 3, "passed": 2, "failed": 1
+    }
+    # 'Unknown_SIT' is not in the CIA sheet; each entry matches the single-file endpoint
+    for (name, content), entry in zip(list(tc_uploads.items()) + [("C_TC.xlsx", _tc_bytes(["99"]))], batch["results"]):
+        single = client.post("/api/compare-cia", files={"tc_file": (name, content), "cia_file": ("cia.xlsx", cia_bytes)})
+        if entry["status"] == "ok":
+            assert {k: entry[k] for k in ("summary", "results", "details")} == single.json()
+        else:
+            assert entry["error"] == single.json()["detail"]
+
+def test_compare_cia_batch_job_matches_endpoint(tmp_path):
+    cia_bytes = open(_cia_file(tmp_path, 3), "rb").read()
+    files = [
+        ("tc_files", ("A_TC.xlsx", _tc_bytes(["CL 12345678.001"]))),
+        ("tc_files", ("B_TC.xlsx", _tc_bytes(["12345678.2"]))),
+        ("cia_file", ("cia.xlsx", cia_bytes)),
+    ]
+    with TestClient(app) as job_client:
+        job = job_client.post("/api/jobs/compare-cia-batch", files=files).json()
+        deadline = time.monotonic() + 30
+        while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+            time.sleep(0.05)
+            job = job_client.get(f"/api/jobs/{job['id']}").json()
+        assert job["status"] == "succeeded"
+        result = job_client.get(f"/api/jobs/{job['id']}/result").json()
+        assert result == job_client.post("/api/compare-cia-batch", files=files).json()
+    assert batch_pools.used == 0
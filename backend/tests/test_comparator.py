@@ -0,0 +1,111 @@
+import random
+import pandas as pd
+from openpyxl import Workbook
+from app.services.comparator import SvnIndex, compare_data, compare_package, compare_with_svn_index
+from app.utils.common import FuzzyMatcher, fuzzy_best_match
+
+SVN_ROWS = [
+    {"File": "module_a.c", "Last Changed Revision": "101", "Last Changed Author": "alice"},
+    {"File": "module_b.c", "Last Changed Revision": "102"},
+    {"File": "spec_v2.docx", "Last Changed Revision": "7"},
+    {"File": "report.html", "Last Changed Revision": "9"},
+    {"File": "orphan.c", "Last Changed Revision": "3"},
+]
+
+CHECKLIST_ROWS = [
+    {"filename": "module_a.c", "version_closed": "101"},
+    {"filename": "module_b.c", "version_closed": "99"},
+    {"filename": "spec-v2.docx", "version_closed": "7"},
+    {"filename": "unknown.h", "version_closed": "1"},
+]
+
+def test_compare_data():
+    result = compare_data(SVN_ROWS, CHECKLIST_ROWS)
+    
+    assert result['summary'] == {"matches": 2, "mismatches": 1, "only_in_svn": 1, "only_in_checklist": 1}
+    assert [m['filename'] for m in result['matches']] == ["module_a.c", "spec_v2.docx"]
+    assert result['mismatches'][0]['svn_revision_int'] == 102
+    assert result['mismatches'][0]['checklist_version_int'] == 99
+    # .html is in IGNORED_EXTENSIONS
+    assert [r['filename'] for r in result['only_in_svn']] == ["orphan.c"]
+    assert result['only_in_checklist'][0]['filename'] == "unknown.h"
+
+def test_fuzzy_matcher_agrees_with_fuzzy_best_match():
+    rnd = random.Random(7)
+    words = ["ccpu", "mod", "test", "main", "init", "cfg", "drv", "can"]
+    
+    def name():
+        return " ".join(rnd.choice(words) for _ in range(rnd.randint(1, 4))) + rnd.choice(["", " c", " h"])
+    
+    candidates = list({name() for _ in range(80)})
+    remaining = list(candidates)
+    matcher = FuzzyMatcher(candidates)
+    
+    for _ in range(200):
+        key = name()
+        expected = fuzzy_best_match(key, remaining)
+        if expected[1] >= 0.85:
+            assert matcher.best_match(key, 0.85) == expected
+        else:
+            assert matcher.best_match(key, 0.85) == (None, 0.0)
+        
+        if remaining and rnd.random() < 0.2:
+            removed = rnd.choice(remaining)
+            remaining.remove(removed)
+            matcher.discard(removed)
+
+def test_compare_data_keeps_raw_rows_on_request():
+    result = compare_data(SVN_ROWS, CHECKLIST_ROWS)
+    assert "raw" not in result['only_in_checklist'][0]
+    with_raw = compare_data(SVN_ROWS, CHECKLIST_ROWS, include_raw=True)
+    assert with_raw['only_in_checklist'][0]['raw'] == {"filename": "unknown.h", "version_closed": "1"}
+    with_raw['only_in_checklist'][0].pop('raw')
+    assert with_raw == result
+    # Entries are slotted records, not per-row dicts
+    assert not hasattr(SvnIndex(SVN_ROWS).entries[0], "__dict__")
+
+def test_compare_data_accepts_dataframe():
+    frame = pd.DataFrame(SVN_ROWS)
+    assert compare_data(frame.fillna(""), CHECKLIST_ROWS) == compare_data(frame.fillna("").to_dict(orient="records"), CHECKLIST_ROWS)
+
+def _checklist_workbook(path, rows):
+    wb = Workbook()
+    ts = wb.active
+    ts.title = "Test Scenario Remarks"
+    ts['B2'] = "Filename"
+    ts['C2'] = "Version on which the review is closed"
+    for i, (filename, version) in enumerate(rows, start=3):
+        ts[f'B{i}'] = filename
+        ts[f'C{i}'] = version
+    wb.save(path)
+    return path
+
+def test_svn_index_gives_compare_data_result():
+    index = SvnIndex(SVN_ROWS, fuzzy=True)
+    for threshold in (0.85, 0.5, 0.0):
+        assert compare_with_svn_index(index, CHECKLIST_ROWS, threshold) == compare_data(SVN_ROWS, CHECKLIST_ROWS, threshold)
+    # The index is left as it was: comparing again gives the same result
+    assert compare_with_svn_index(index, CHECKLIST_ROWS) == compare_data(SVN_ROWS, CHECKLIST_ROWS)
+
+def test_compare_package(tmp_path):
+    first = _checklist_workbook(tmp_path / "first.xlsx", [("module_a.c", "101"), ("module_b.c", "99")])
+    second = _checklist_workbook(tmp_path / "second.xlsx", [("spec-v2.docx", "7"), ("unknown.h", "1")])
+    broken = tmp_path / "broken.xlsx"
+    broken.write_bytes(b"not a workbook")
+    checklists = [("first.xlsx", str(first)), ("broken.xlsx", str(broken)), ("second.xlsx", str(second))]
+    
+    result = compare_package(SVN_ROWS, checklists, max_workers=2)
+    
+    assert result["summary"] == {
+        "checklists": 3, "compared": 2, "errors": 1, "svn_files": 4,
+        "matches": 2, "mismatches": 1, "only_in_svn": 1, "only_in_checklist": 1
+    }
+    assert [r["status"] for r in result["results"]] == ["ok", "error", "ok"]
+    assert result["mismatches"][0]["checklist"] == "first.xlsx"
+    assert result["mismatches"][0]["filename"] == "module_b.c"
+    # Files matched by one checklist only are still covered by the package
+    assert [r["filename"] for r in result["only_in_svn"]] == ["orphan.c"]
+    assert result["results"][2]["only_in_checklist"][0]["filename"] == "unknown.h"
+    # Each checklist is matched as compare_data would match it alone
+    alone = compare_data(SVN_ROWS, [{"filename": "module_a.c", "version_closed": "101"}, {"filename": "module_b.c", "version_closed": "99"}])
+    assert result["results"][0]["matches"] == alone["matches"]
@@ -0,0 +1,18 @@
+import hashlib
+import pandas as pd
+from app.services.datasets import DatasetStore
+from app.services.parse_cache import ParseCache
+
+def test_datasets_shared_through_disk(tmp_path):
+    frame = pd.DataFrame({"File": ["a.c", "b.c"], "Last Changed Revision": [1, 2]})
+    dataset_id = hashlib.sha256(b"report").hexdigest()
+    disk = lambda: ParseCache(0, tmp_path, 1024 * 1024)
+    store = DatasetStore(max_entries=8, ttl_seconds=0, disk=disk())
+    assert store.put(frame, dataset_id) == dataset_id
+
+    # Expired in memory, or asked for in another server process: read back from disk
+    other = DatasetStore(max_entries=8, ttl_seconds=3600, disk=disk())
+    for s in (store, other):
+        assert s.get(dataset_id).equals(frame)
+    assert other.get("../" + dataset_id) is None
+    assert DatasetStore(8, 3600).get(dataset_id) is None
@@ -0,0 +1,99 @@
+import io
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+from app.main import app
+
+client = TestClient(app)
+
+def _svn_csv(nrows: int) -> bytes:
+    lines = ["File,Last Changed Revision,Last Changed Author"]
+    lines += [f"module_{i}.c,{i},alice" for i in range(nrows)]
+    return "\n".join(lines).encode("utf-8")
+
+def test_compare_both_uses_full_svn_dataset():
+    response = client.post("/api/upload-excel", files={"file": ("svn.csv", _svn_csv(150), "text/csv")})
+    assert response.status_code == 200
+    svn_blob = response.json()["data"]
+    assert svn_blob["nrows"] == 150
+    assert len(svn_blob["preview"]) == 100
+    assert svn_blob["dataset_id"]
+
+    checklist = {"data": [{"filename": "module_149.c", "version_closed": "149"}]}
+    response = client.post("/api/compare-both", json={"svn": svn_blob, "checklist": checklist})
+    assert response.status_code == 200
+    result = response.json()
+    # Row 149 is past the preview and must still be compared
+    assert result["summary"] == {"matches": 1, "mismatches": 0, "only_in_svn": 149, "only_in_checklist": 0}
+
+    response = client.post("/api/compare-both", json={"svn_dataset_id": "missing", "checklist": checklist})
+    assert response.status_code == 404
+
+def test_compare_both_include_raw():
+    svn = {"data": [{"File": "module_1.c", "Last Changed Revision": "1"}]}
+    checklist = {"data": [{"filename": "extra.c", "version_closed": "2", "Remarks": "new file"}]}
+    plain = client.post("/api/compare-both", json={"svn": svn, "checklist": checklist}).json()
+    assert "raw" not in plain["only_in_checklist"][0]
+    result = client.post("/api/compare-both", json={"svn": svn, "checklist": checklist, "include_raw": True}).json()
+    assert result["only_in_checklist"][0]["raw"] == checklist["data"][0]
+
+def test_compare_both_falls_back_to_preview_rows():
+    svn_blob = {
+        "dataset_id": "0" * 64, "nrows": 150,
+        "preview": [{"File": f"module_{i}.c", "Last Changed Revision": str(i)} for i in range(100)]
+    }
+    checklist = {"data": [{"filename": "module_1.c", "version_closed": "1"}]}
+    response = client.post("/api/compare-both", json={"svn": svn_blob, "checklist": checklist})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["svn_truncated"] is True
+    assert result["summary"]["matches"] == 1
+    assert result["summary"]["only_in_svn"] == 99
+
+def _checklist_xlsx(filenames) -> bytes:
+    wb = Workbook()
+    ts = wb.active
+    ts.title = "Test Scenario Remarks"
+    ts['B2'] = "Filename"
+    ts['C2'] = "Version on which the review is closed"
+    for i, filename in enumerate(filenames, start=3):
+        ts[f'B{i}'] = filename
+        ts[f'C{i}'] = filename.split("_")[1].split(".")[0]
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+def test_compare_both_batch():
+    files = [
+        ("checklist_files", ("a.xlsx", _checklist_xlsx(["module_1.c", "module_2.c"]), "application/octet-stream")),
+        ("checklist_files", ("b.xlsx", _checklist_xlsx(["module_3.c"]), "application/octet-stream")),
+        ("svn_file", ("svn.csv", _svn_csv(4), "text/csv")),
+    ]
+    response = client.post("/api/compare-both-batch", files=files)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["summary"]["checklists"] == 2
+    assert result["summary"]["matches"] == 3
+    assert [r["filename"] for r in result["only_in_svn"]] == ["module_0.c"]
+
+    response = client.post("/api/compare-both-batch", files=files[:1], data={"svn_dataset_id": "missing"})
+    assert response.status_code == 404
+
+def test_compare_both_incremental():
+    svn = {"data": [{"File": f"module_{i}.c", "Last Changed Revision": str(i)} for i in range(1, 6)]}
+    checklist = {"data": [{"filename": f"module_{i}.c", "version_closed": str(i)} for i in range(1, 5)]}
+    checklist["data"][0]["version_closed"] = "7"
+
+    first = client.post("/api/compare-both", json={"svn": svn, "checklist": checklist, "incremental": True}).json()
+    assert first["summary"] == {"matches": 3, "mismatches": 1, "only_in_svn": 1, "only_in_checklist": 0}
+    assert first["delta"] is None
+
+    # Fix the mismatching row: only its name is compared again
+    checklist["data"][0]["version_closed"] = "1"
+    second = client.post("/api/compare-both", json={"svn": svn, "checklist": checklist, "previous_run_id": first["run_id"]}).json()
+    plain = client.post("/api/compare-both", json={"svn": svn, "checklist": checklist}).json()
+    assert {k: second[k] for k in plain} == plain
+    assert second["evaluated"]["exact_keys"] == 1
+    assert second["evaluated"]["reused_exact_keys"] == 3
+    assert second["delta"]["checklist"]["changed"] == ["module 1 c"]
+    assert [m["filename"] for m in second["delta"]["added"]["matches"]] == ["module_1.c"]
+    assert [m["filename"] for m in second["delta"]["removed"]["mismatches"]] == ["module_1.c"]
@@ -1,5 +1,6 @@
 import pytest
 import os
+import zipfile
 from openpyxl import Workbook
 from app.services.excel_processor import ExcelHyperlinkProcessor
 
@@ -82,3 +83,41 @@ def test_invalid_sheet(tmp_path):
     assert result['status'] == 'partial_success' # Or success with errors, depending on implementation details. Code says partial_success if errors.
     assert result['errors'] is not None
     assert len(result['errors']) == 2 # Both required sheets missing
+
+def test_extract_hyperlinks_skips_cell_model(sample_excel_file):
+    processor = ExcelHyperlinkProcessor(sample_excel_file)
+    result = processor.extract_hyperlinks()
+    
+    # Read straight from the .xlsx parts, the workbook itself is never loaded
+    assert processor.workbook is None
+    assert [link['cell_reference'] for link in result['hyperlinks']] == ['A1', 'B2']
+    
+    # Once loaded and modified, extraction reflects the in-memory workbook
+    processor.load_workbook()
+    processor.workbook['Test Case Remarks']['C3'].hyperlink = "http://example.com/new_0999.txt"
+    result = processor.extract_hyperlinks()
+    processor.close()
+    
+    assert result['total_hyperlinks'] == 3
+
+def test_update_build_numbers_rewrites_only_rels_parts(sample_excel_file, tmp_path):
+    # Add a part openpyxl knows nothing about; a full round-trip would drop it
+    with zipfile.ZipFile(sample_excel_file, 'a') as archive:
+        archive.writestr('customXml/item1.xml', '<root>keep me</root>')
+    
+    output_file = tmp_path / "updated.xlsx"
+    processor = ExcelHyperlinkProcessor(sample_excel_file)
+    result = processor.update_build_numbers("0789", str(output_file))
+    processor.close()
+    
+    assert result['status'] == 'success'
+    assert [u['cell'] for u in result['updates']] == ['A1', 'B2']
+    assert result['updates'][0]['old_build'] == '123'
+    assert result['updates'][0]['new_address'] == "http://example.com/file_0789.txt"
+    
+    with zipfile.ZipFile(sample_excel_file) as src, zipfile.ZipFile(output_file) as out:
+        assert src.namelist() == out.namelist()
+        changed = [name for name in src.namelist() if src.read(name) != out.read(name)]
+    
+    assert changed and all(name.endswith('.rels') for name in changed)
+    assert 'customXml/item1.xml' not in changed
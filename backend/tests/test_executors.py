@@ -0,0 +1,99 @@
+import asyncio
+import os
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from app.core import warmup
+from app.core.executors import BatchPools, WorkerPool
+from app.services.extractor import extract_hyperlinks_with_versions_from_path
+
+def test_worker_pool_rejects_when_queue_is_full():
+    pool = WorkerPool("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.pending == 2
+        with pytest.raises(HTTPException) as excinfo:
+            await pool.run(release.wait)
+        assert excinfo.value.status_code == 503
+        release.set()
+        await asyncio.gather(*running)
+        assert pool.pending == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+def test_worker_pool_keeps_no_slot_when_executor_fails(monkeypatch):
+    pool = WorkerPool("test", max_workers=1, max_queue=0)
+
+    def broken():
+        raise OSError("can't start workers")
+
+    monkeypatch.setattr(pool, "_get_executor", broken)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            asyncio.run(pool.run(print))
+    assert pool.pending == 0
+
+def test_process_pool_propagates_http_errors():
+    pool = WorkerPool("test", max_workers=1, max_queue=0, use_processes=True)
+
+    async def scenario():
+        with pytest.raises(HTTPException) as excinfo:
+            await pool.run(extract_hyperlinks_with_versions_from_path, "/nonexistent/checklist.xlsx")
+        assert excinfo.value.status_code == 404
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+def test_process_pool_waits_for_warmup_off_the_event_loop():
+    pool = WorkerPool("test", max_workers=1, max_queue=0, use_processes=True)
+    warmup._done.clear()
+    # Ends the fake warm-up even if the event loop is stuck
+    finish = threading.Timer(2.0, warmup._done.set)
+
+    async def scenario():
+        call = asyncio.create_task(pool.run(os.getpid))
+        start = time.perf_counter()
+        await asyncio.sleep(0.1)
+        assert time.perf_counter() - start < 1.0
+        assert not call.done()
+        warmup._done.set()
+        assert await call != os.getpid()
+
+    finish.start()
+    try:
+        asyncio.run(scenario())
+    finally:
+        finish.cancel()
+        warmup._done.set()
+        pool.shutdown()
+
+def _batch_workers(tasks, max_workers):
+    return BatchPools(max_processes=4).workers_for(tasks, max_workers)
+
+def test_batch_pools_share_a_process_budget():
+    pools = BatchPools(max_processes=4)
+    assert pools.workers_for(10, max_workers=3) == 3
+    assert pools.workers_for(2) == min(os.cpu_count() or 1, 2)
+
+    first = pools.create(3)
+    with pools.create(3) as second:
+        # Only one process left in the budget
+        assert second.submit(os.getpid).result() != os.getpid()
+        assert pools.used == 4
+        with pytest.raises(HTTPException) as excinfo:
+            pools.create(1)
+        assert excinfo.value.status_code == 503
+        # Batches inside a worker process run there instead of nesting a pool
+        assert second.submit(_batch_workers, 10, 3).result() == 1
+    first.shutdown()
+    first.shutdown()
+    assert pools.used == 0
@@ -0,0 +1,59 @@
+import pytest
+from openpyxl import Workbook
+from openpyxl.styles import PatternFill
+from app.services.extractor import extract_hyperlinks_with_versions_from_path
+from app.services.workbook_reader import read_sheet_hyperlinks
+
+@pytest.fixture
+def checklist_file(tmp_path):
+    wb = Workbook()
+    
+    ts = wb.active
+    ts.title = "Test Scenario Remarks"
+    ts['B2'] = "Filename"
+    ts['C2'] = "Version on which the review is closed"
+    ts['B3'] = "module_a.c"
+    ts['B3'].hyperlink = "http://svn/repo/module_a.c"
+    ts['C3'] = "101"
+    ts['B4'] = "module_b.c"
+    ts['C4'] = "r102"
+    # Green fill marks the end of the artifact list
+    ts['B5'].fill = PatternFill(start_color="FF00B050", end_color="FF00B050", fill_type="solid")
+    ts['B6'] = "after_marker.c"
+    
+    tc = wb.create_sheet("Test Case Remarks")
+    tc['A1'] = "Filename"
+    tc['B1'] = "Version on which closed"
+    tc['A2'] = "module_b.c"
+    tc['B2'] = "105"
+    tc['A3'].fill = PatternFill(start_color="FF00B050", end_color="FF00B050", fill_type="solid")
+    tc['A4'] = "Items"
+    tc['A5'] = "helper.h"
+    tc['A5'].hyperlink = "http://svn/repo/helper_0212.h"
+    
+    file_path = tmp_path / "checklist.xlsx"
+    wb.save(file_path)
+    return str(file_path)
+
+def test_extract_hyperlinks_with_versions(checklist_file):
+    results = extract_hyperlinks_with_versions_from_path(checklist_file)
+    by_name = {r['filename']: r for r in results}
+    
+    assert set(by_name) == {"module_a.c", "module_b.c", "helper.h"}
+    assert by_name["module_a.c"]['hyperlink'] == "http://svn/repo/module_a.c"
+    assert by_name["module_a.c"]['version_closed'] == "101"
+    
+    # Present in both sheets with different versions -> max wins, flagged as conflict
+    assert by_name["module_b.c"]['version_closed'] == "105"
+    assert by_name["module_b.c"]['inter_sheet_conflict'] is True
+    
+    assert by_name["helper.h"]['source_sheet'] == "Test Case Remarks"
+    assert by_name["helper.h"]['hyperlink'] == "http://svn/repo/helper_0212.h"
+
+def test_read_sheet_hyperlinks(checklist_file):
+    links = read_sheet_hyperlinks(checklist_file, ["Test Scenario Remarks", "Test Case Remarks", "Missing"])
+    
+    assert links == {
+        "Test Scenario Remarks": {"B3": "http://svn/repo/module_a.c"},
+        "Test Case Remarks": {"A5": "http://svn/repo/helper_0212.h"},
+    }
@@ -0,0 +1,49 @@
+import io
+import json
+import zipfile
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def test_update_build_batch(checklist_bytes):
+    packed = io.BytesIO()
+    with zipfile.ZipFile(packed, "w") as archive:
+        archive.writestr("nested/b.xlsx", checklist_bytes("http://svn/b_0100.c"))
+        archive.writestr("readme.txt", "ignored")
+    
+    response = client.post(
+        "/api/hyperlinks/update-build-batch/",
+        data={"new_build": "300"},
+        files=[
+            ("files", ("a.xlsx", checklist_bytes("http://svn/a_0200.c"))),
+            ("files", ("bundle.zip", packed.getvalue())),
+        ],
+    )
+    assert response.status_code == 200
+    
+    with zipfile.ZipFile(io.BytesIO(response.content)) as bundle:
+        assert sorted(bundle.namelist()) == ["a_build_300.xlsx", "b_build_300.xlsx", "manifest.json"]
+        manifest = json.loads(bundle.read("manifest.json"))
+    
+    assert manifest["succeeded"] == 2
+    details = {f["filename"]: f["update_details"] for f in manifest["files"]}
+    assert details["a.xlsx"][0]["new_address"] == "http://svn/a_0300.c"
+    assert details["b.xlsx"][0]["old_build"] == "100"
+
+def test_update_build_batch_rejects_other_files():
+    response = client.post(
+        "/api/hyperlinks/update-build-batch/",
+        data={"new_build": "300"},
+        files=[("files", ("notes.txt", b"hello"))],
+    )
+    assert response.status_code == 400
+
+def test_update_build_rejects_non_numeric_build(checklist_bytes):
+    for new_build in ("../300", "3/00", "300\n"):
+        response = client.post(
+            "/api/hyperlinks/update-build-batch/",
+            data={"new_build": new_build},
+            files=[("files", ("a.xlsx", checklist_bytes("http://svn/a_0200.c")))],
+        )
+        assert response.status_code == 400
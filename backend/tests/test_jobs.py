@@ -0,0 +1,70 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.jobs import JobCancelled, JobStore, ProgressReporter, job_status, process_owner
+
+SVN_ROWS = [{"File": "module_a.c", "Last Changed Revision": "101"}, {"File": "orphan.c", "Last Changed Revision": "3"}]
+CHECKLIST = {"data": [{"filename": "module_a.c", "version_closed": "101"}]}
+
+def _wait_for(client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+def test_compare_both_job_matches_synchronous_endpoint():
+    payload = {"svn": SVN_ROWS, "checklist": CHECKLIST}
+    with TestClient(app) as client:
+        submitted = client.post("/api/jobs/compare-both", json=payload).json()
+        assert submitted["status"] == "queued"
+        assert "result" not in submitted
+
+        job = _wait_for(client, submitted["id"])
+        assert job["status"] == "succeeded"
+        assert job["progress"] == {"done": 1, "total": 1, "stage": "Fuzzy matching"}
+
+        result = client.get(f"/api/jobs/{submitted['id']}/result").json()
+        assert result == client.post("/api/compare-both", json=payload).json()
+
+        assert client.get("/api/jobs/unknown").status_code == 404
+        assert client.delete("/api/jobs/unknown").status_code == 404
+
+def test_progress_reporter_stops_on_cancel(tmp_path):
+    reporter = ProgressReporter(str(tmp_path))
+    reporter(1, 2, "Checking requirements")
+    assert (tmp_path / "progress.json").exists()
+
+    (tmp_path / "cancel").touch()
+    with pytest.raises(JobCancelled):
+        reporter(2, 2, "Checking requirements")
+
+def test_sqlite_store_marks_interrupted_jobs(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(db_path)
+    store.save({"id": "a", "status": "running", "error": None, "finished_at": None})
+    store.save({"id": "b", "status": "succeeded", "error": None, "result": {"ok": True}, "finished_at": 1.0})
+
+    reloaded = JobStore(db_path)
+    assert reloaded.get("a")["status"] == "failed"
+    assert reloaded.get("b")["result"] == {"ok": True}
+
+def test_sqlite_store_shares_jobs_between_processes(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    worker = JobStore(db_path)
+    running = {"id": "a", "status": "running", "error": None, "finished_at": None, "owner": process_owner()}
+    worker.save(running)
+    worker.save({"id": "b", "status": "running", "error": None, "finished_at": None, "owner": [2 ** 22 + 1, None]})
+
+    other = JobStore(db_path)
+    assert other.get("a")["status"] == "running"
+    assert other.get("b")["status"] == "failed"
+    assert "owner" not in job_status(other.get("a"))
+
+    worker.save(dict(running, status="succeeded", result={"ok": True}, finished_at=1.0))
+    assert other.get("a")["result"] == {"ok": True}
+    other.purge(2.0)
+    assert other.get("a") is None
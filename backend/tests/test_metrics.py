@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+from app.core import metrics
+from app.core.metrics import Histogram, phase
+from app.main import app
+
+client = TestClient(app)
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("demo_seconds", "Demo.", ("phase",), (0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        h.observe(value, "parse")
+    assert h.render() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{phase="parse",le="0.1"} 1',
+        'demo_seconds_bucket{phase="parse",le="1.0"} 2',
+        'demo_seconds_bucket{phase="parse",le="+Inf"} 3',
+        'demo_seconds_sum{phase="parse"} 5.55',
+        'demo_seconds_count{phase="parse"} 3',
+    ]
+
+def test_metrics_endpoint_reports_routes_and_worker_phases():
+    metrics.reset()
+    svn = [{"File": f"module_{i}.c", "Last Changed Revision": i} for i in range(1, 4)]
+    checklist = [{"filename": f"module_{i}.c", "version_closed": str(i)} for i in range(1, 3)]
+    assert client.post("/api/compare-both", json={"svn": svn, "checklist": checklist}).status_code == 200
+    client.get("/no-such-page")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/compare-both",status="200"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in text
+    assert 'http_request_size_bytes_count{method="POST",route="/api/compare-both"} 1' in text
+    # Rows and phases of the comparison come back from the worker process
+    assert 'http_request_rows_sum{method="POST",route="/api/compare-both"} 5' in text
+    assert 'phase_duration_seconds_count{phase="compare.fuzzy"} 1' in text
+
+def test_phase_is_shared_no_op_when_disabled(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+    assert phase("a") is phase("b")
+    assert client.get("/metrics").status_code == 404
@@ -0,0 +1,54 @@
+import os
+from app.services import parse_cache as parse_cache_module
+from app.services.parse_cache import ParseCache, cached_parse
+
+def test_cached_parse_keys_on_content_and_arguments(tmp_path, monkeypatch):
+    monkeypatch.setattr(parse_cache_module, "parse_cache", ParseCache(1 << 20))
+    calls = []
+
+    @cached_parse
+    def parse(path, sheet_name="Sheet1"):
+        calls.append((str(path), sheet_name))
+        return {"rows": [sheet_name]}
+
+    first = tmp_path / "a.csv"
+    same_content = tmp_path / "b.csv"
+    first.write_text("x,y\n1,2\n")
+    same_content.write_text("x,y\n1,2\n")
+
+    result = parse(first)
+    result["rows"].append("mutated")
+    assert parse(same_content) == {"rows": ["Sheet1"]}
+    assert parse(first, sheet_name="Sheet1") == {"rows": ["Sheet1"]}
+    assert len(calls) == 1
+
+    parse(first, "Other")
+    first.write_text("x,y\n1,3\n")
+    parse(first)
+    assert len(calls) == 3
+
+def test_parse_cache_bounds_and_disk_tier(tmp_path):
+    cache = ParseCache(max_bytes=10, disk_dir=tmp_path, disk_max_bytes=12)
+    cache.put("a", b"123456")
+    os.utime(tmp_path / "a.pkl", (0, 0))
+    cache.put("b", b"abcdef")
+    # Memory holds 10 bytes, so "a" is already gone from there
+    assert cache._entries.keys() == {"b"}
+    # The disk tier holds 12 bytes: "c" pushes out the least recently used file
+    cache.put("c", b"xyz")
+    assert sorted(p.name for p in tmp_path.glob("*.pkl")) == ["b.pkl", "c.pkl"]
+
+    # A fresh process finds the disk entries
+    reloaded = ParseCache(max_bytes=10, disk_dir=tmp_path, disk_max_bytes=12)
+    assert reloaded.get("b") == b"abcdef"
+    assert reloaded.get("a") is None
+
+def test_parse_cache_disk_tier_trusts_only_own_files(tmp_path, monkeypatch):
+    cache = ParseCache(max_bytes=0, disk_dir=tmp_path / "cache", disk_max_bytes=100)
+    assert (tmp_path / "cache").stat().st_mode & 0o777 == 0o700
+    cache.put("a", b"123")
+
+    # Files (and directories) of another user are never unpickled
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(tmp_path).st_uid + 1)
+    assert cache.get("a") is None
+    assert ParseCache(max_bytes=0, disk_dir=tmp_path / "cache", disk_max_bytes=100).disk_dir is None
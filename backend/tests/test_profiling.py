@@ -0,0 +1,44 @@
+import pstats
+from fastapi.testclient import TestClient
+from app.core import profiling
+from app.core.profiling import profile_store
+from app.main import app
+
+client = TestClient(app)
+
+SVN = [{"File": f"module_{i}.c", "Last Changed Revision": i} for i in range(1, 4)]
+CHECKLIST = [{"filename": f"module_{i}.c", "version_closed": str(i)} for i in range(1, 3)]
+
+def test_profiled_request_is_saved_and_served(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "enabled", True)
+    monkeypatch.setattr(profile_store, "root", tmp_path)
+
+    assert "x-profile-id" not in client.post("/api/compare-both", json={"svn": SVN, "checklist": CHECKLIST}).headers
+    response = client.post(
+        "/api/compare-both?profile=1", json={"svn": SVN, "checklist": CHECKLIST}, headers={"X-Request-ID": "slow-checklist"}
+    )
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+    assert profile_id.endswith("-slow-checklist")
+
+    [entry] = client.get("/api/profiles").json()["profiles"]
+    assert entry["profile_id"] == profile_id
+    assert (entry["method"], entry["path"], entry["status"]) == ("POST", "/api/compare-both", 200)
+
+    # compare_data ran in a worker process; its stats are part of the profile
+    summary = client.get(f"/api/profiles/{profile_id}/summary", params={"sort": "tottime", "limit": 10000}).text
+    assert "compare_data" in summary
+
+    download = client.get(f"/api/profiles/{profile_id}")
+    assert download.status_code == 200
+    (tmp_path / "copy.prof").write_bytes(download.content)
+    assert pstats.Stats(str(tmp_path / "copy.prof")).total_calls > 0
+
+    assert client.get("/api/profiles/missing").status_code == 404
+    assert client.get(f"/api/profiles/{profile_id}/summary", params={"sort": "bogus"}).status_code == 400
+
+def test_profiling_disabled_by_default():
+    assert profiling.enabled is False
+    response = client.post("/api/compare-both", json={"svn": SVN, "checklist": CHECKLIST}, headers={"X-Profile": "1"})
+    assert "x-profile-id" not in response.headers
+    assert client.get("/api/profiles").status_code == 404
@@ -0,0 +1,78 @@
+import asyncio
+import io
+import os
+import time
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.sessions import SessionManager
+from app.services.uploads import UploadStore
+
+def test_session_reuses_upload_for_analyses(checklist_bytes):
+    content = checklist_bytes("http://svn/a_0100.c")
+    with TestClient(app) as client:
+        session = client.post("/api/sessions", files={"file": ("c.xlsx", content)}).json()
+        session_id = session["session_id"]
+        assert session["cached_analyses"] == []
+
+        links = client.get(f"/api/sessions/{session_id}/hyperlinks").json()
+        direct = client.post("/api/hyperlinks/extract-hyperlinks/", files={"file": ("c.xlsx", content)}).json()
+        assert links == direct
+        assert client.get(f"/api/sessions/{session_id}/hyperlinks").json() == links
+        assert client.get(f"/api/sessions/{session_id}").json()["cached_analyses"] == ["hyperlinks"]
+
+        response = client.post(f"/api/sessions/{session_id}/update-build", data={"new_build": "200"})
+        assert response.status_code == 200
+
+        assert client.delete(f"/api/sessions/{session_id}").json() == {"status": "ok"}
+        assert client.get(f"/api/sessions/{session_id}/hyperlinks").status_code == 404
+
+def test_sessions_evicted_when_idle_or_over_cap(tmp_path, monkeypatch):
+    store = UploadStore(tmp_path / "blobs", max_bytes=1024)
+    monkeypatch.setattr("app.services.sessions.upload_store", store)
+    manager = SessionManager(tmp_path / "sessions", idle_seconds=60, max_bytes=50)
+
+    stored = store.save(UploadFile(file=io.BytesIO(b"123456"), filename="a.xlsx"))
+    first = manager.create(stored)
+    assert not stored.path.exists()
+    calls = []
+    async def compute():
+        calls.append(1)
+        return {"value": 1}
+    assert asyncio.run(manager.analyze(first, ("x",), compute)) == {"value": 1}
+    assert asyncio.run(manager.analyze(first, ("x",), compute)) == {"value": 1}
+    assert len(calls) == 1
+
+    # Over the cap: the least recently used session goes with its workbook
+    earlier = time.time() - 10
+    os.utime(first.dir / "session.json", (earlier, earlier))
+    second = manager.create(store.save(UploadFile(file=io.BytesIO(b"abcdef" * 4), filename="b.xlsx")))
+    assert manager.get(first.id) is None
+    assert not first.path.exists()
+    assert manager.get(second.id).path.read_bytes() == b"abcdef" * 4
+
+    old = time.time() - 120
+    os.utime(second.dir / "session.json", (old, old))
+    assert manager.get(second.id) is None
+
+def test_sessions_shared_between_processes(tmp_path, monkeypatch):
+    store = UploadStore(tmp_path / "blobs", max_bytes=1024)
+    monkeypatch.setattr("app.services.sessions.upload_store", store)
+    session = SessionManager(tmp_path / "sessions", 60, 1024).create(
+        store.save(UploadFile(file=io.BytesIO(b"123456"), filename="a.xlsx"))
+    )
+    async def compute():
+        return {"value": 1}
+    asyncio.run(SessionManager(tmp_path / "sessions", 60, 1024).analyze(session, ("x",), compute))
+
+    # Another process only has the directory to go by
+    other = SessionManager(tmp_path / "sessions", 60, 1024)
+    assert other.get(session.id).info()["cached_analyses"] == ["x"]
+    assert other.get("../blobs") is None
+    assert other.close(session.id)
+    assert other.get(session.id) is None
+
+def test_session_rejects_xls():
+    with TestClient(app) as client:
+        response = client.post("/api/sessions", files={"file": ("c.xls", b"legacy")})
+        assert response.status_code == 400
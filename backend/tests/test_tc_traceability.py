@@ -0,0 +1,110 @@
+import json
+import shutil
+import zipfile
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+from app.core.executors import batch_pools
+from app.main import app
+from app.services import traceability_batch
+from app.services.tc_traceability import validate_tc_traceability
+from app.utils.common import MultiPatternMatcher
+
+@pytest.fixture
+def traceability_file(tmp_path):
+    wb = Workbook()
+    
+    general = wb.active
+    general.title = "General"
+    general['A1'] = "Requirements ID"
+    general['B1'] = "Test Case associated"
+    general['A2'] = "REQ_1"
+    general['B2'] = "TC_1"
+    general['A3'] = "REQ_2"
+    general['B3'] = "tc 1, TC_2"
+    general['A4'] = "REQ_3"
+    general['B4'] = "N/A"
+    general['A5'] = "REQ_10"
+    general['B5'] = "TC_2"
+    general['A6'] = "REQ_4"
+    general['B6'] = "TC_1"
+    
+    tc1 = wb.create_sheet("TC_1")
+    tc1['A1'] = "Covers REQ_1 and REQ_2"
+    tc1['B2'] = "REQ_2"
+    tc1['A3'] = "REQ_4"
+    
+    tc2 = wb.create_sheet("TC_2")
+    tc2['A1'] = "REQ_2"
+    tc2['C3'] = "REQ_10"
+    tc2['A5'] = "# Note"
+    tc2['A6'] = "REQ_4 mentioned for reference"
+    
+    file_path = tmp_path / "traceability.xlsx"
+    wb.save(file_path)
+    return str(file_path)
+
+def test_validate_tc_traceability(traceability_file):
+    result = validate_tc_traceability(traceability_file)
+    by_id = {r['requirement_id']: r for r in result['results']}
+    
+    assert result['summary']['total_requirements'] == 5
+    assert [r['requirement_id'] for r in result['results']] == ["REQ_1", "REQ_2", "REQ_3", "REQ_10", "REQ_4"]
+    
+    # Substring semantics: "REQ_1" is also found inside "REQ_10" on TC_2
+    assert by_id['REQ_1']['found_in_sheets'] == ['TC_1', 'TC_2']
+    assert by_id['REQ_1']['status'] == 'fail'
+    
+    assert by_id['REQ_2']['expected_tcs'] == ['TC_1', 'TC_2']
+    assert by_id['REQ_2']['found_in_sheets'] == ['TC_1', 'TC_2']
+    assert by_id['REQ_2']['status'] == 'pass'
+    
+    assert by_id['REQ_3']['status'] == 'fail'
+    
+    assert by_id['REQ_10']['found_in_sheets'] == ['TC_2']
+    assert by_id['REQ_10']['status'] == 'pass'
+    
+    # Only present after the #Note marker of an unexpected sheet -> warning, not failure
+    assert by_id['REQ_4']['found_in_sheets'] == ['TC_1']
+    assert by_id['REQ_4']['status'] == 'pass'
+    assert result['summary']['warnings'] == ["Requirement REQ_4 is present in the note section of sheet TC_2"]
+
+def test_multi_pattern_matcher_substring_semantics():
+    patterns = ["REQ_1", "REQ_10", "Q_1", "he", "she", "hers"]
+    matcher = MultiPatternMatcher(patterns)
+    
+    for text in ["REQ_10 and REQ_2", "ushers", "nothing here", "", "REQ_"]:
+        expected = {p for p in patterns if p in text}
+        assert matcher.find_all(text) == expected
+
+def test_batch_validation_streams_ndjson(traceability_file, tmp_path):
+    matrices = tmp_path / "matrices"
+    (matrices / "nested").mkdir(parents=True)
+    shutil.copy(traceability_file, matrices / "a.xlsx")
+    shutil.copy(traceability_file, matrices / "nested" / "b.xlsm")
+    (matrices / "broken.xlsx").write_bytes(b"not a workbook")
+    (matrices / "notes.txt").write_text("ignored")
+
+    response = TestClient(app).post("/api/validate-tc-traceability-batch", data={"path": str(matrices)})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    files = {entry["filename"]: entry for entry in lines[:-1]}
+    assert sorted(files) == ["a.xlsx", "broken.xlsx", "nested/b.xlsm"]
+    assert files["a.xlsx"]["status"] == "fail"
+    assert files["a.xlsx"]["results"] == validate_tc_traceability(traceability_file)["results"]
+    assert files["broken.xlsx"]["status"] == "error"
+    assert lines[-1] == {
+        "type": "summary", "status": "fail", "total_files": 3, "passed_files": 0, "failed_files": 2,
+        "error_files": 1, "total_requirements": 10, "passed": 6, "failed": 4, "warnings": 2
+    }
+    assert batch_pools.used == 0
+
+def test_batch_validation_cli(traceability_file, tmp_path, capsys):
+    archive_path = tmp_path / "matrices.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.write(traceability_file, "set/one.xlsx")
+    assert traceability_batch.main([str(archive_path), "--workers", "1"]) == 1
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["type"] for line in lines] == ["file", "summary"]
+    assert lines[0]["filename"] == "one.xlsx"
@@ -0,0 +1,39 @@
+import hashlib
+import io
+import pytest
+from fastapi import HTTPException, UploadFile
+from app.services.parse_cache import file_sha256
+from app.services.uploads import UploadStore, copy_stream
+
+def _upload(content: bytes, name: str = "report.csv") -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=name)
+
+def test_copy_stream_enforces_limit():
+    target = io.BytesIO()
+    assert copy_stream(io.BytesIO(b"abc"), target, max_bytes=3) == (hashlib.sha256(b"abc").hexdigest(), 3)
+    with pytest.raises(HTTPException) as excinfo:
+        copy_stream(io.BytesIO(b"abcd"), io.BytesIO(), max_bytes=3)
+    assert excinfo.value.status_code == 413
+
+def test_upload_store_shares_identical_content(tmp_path):
+    store = UploadStore(tmp_path, max_bytes=1024)
+    first = store.save(_upload(b"File,Revision\na.c,1\n", "svn.CSV"))
+    second = store.save(_upload(b"File,Revision\na.c,1\n", "other.csv"))
+
+    assert first.path == second.path
+    assert first.path.name == f"{first.sha256}.csv"
+    assert second.filename == "other.csv"
+    # The digest is known without reading the file again
+    assert file_sha256(first.path) == first.sha256
+
+    store.release(first)
+    assert second.path.exists()
+    store.release(second)
+    assert not second.path.exists()
+    assert list(tmp_path.iterdir()) == []
+
+def test_upload_store_rejects_oversized_upload(tmp_path):
+    store = UploadStore(tmp_path, max_bytes=4)
+    with pytest.raises(HTTPException):
+        store.save(_upload(b"too large"))
+    assert list(tmp_path.iterdir()) == []
@@ -182,6 +182,9 @@ const Tool = () => {
                     };
 
                     const data = await compareBoth(payload);
+                    if (data.warning) {
+                        alert(`⚠️ ${data.warning}`);
+                    }
                     setComparisonData(data);
                     setCompareButtonText('✓ Comparison Complete!');
                 } catch (error) {
@@ -88,6 +88,11 @@ fi
 echo "Running PyInstaller..."
 pyinstaller backend.spec --clean --noconfirm
 
+# Startup report: import times and time until /health answers, for the sources and the executable
+echo "Measuring startup..."
+python -m benchmarks.startup --report build/startup-report.txt || echo "Startup report failed"
+python -m benchmarks.startup --command dist/backend --top 0 --report build/startup-report-exe.txt || echo "Startup report of the executable failed"
+
 # Create dist directory if it doesn't exist
 mkdir -p dist
 